@@ -0,0 +1,2 @@
+# Código compartido por los microservicios Flask del backend (mscv-auth, mscv-employee, mscv-stress).
+# Cada Dockerfile copia esta carpeta junto al app.py del servicio, por lo que se importa como 'common'.
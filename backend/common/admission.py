@@ -0,0 +1,163 @@
+"""
+Control de admisión: rechaza trabajo nuevo con 503 + Retry-After cuando el
+servicio ya está saturado, en lugar de aceptarlo todo y que todos los requests
+se vuelvan lentos.
+
+Dos presupuestos, configurables por entorno:
+    ADMISSION_MAX_IN_FLIGHT  requests protegidos en curso por worker (0 = sin límite)
+    ADMISSION_CPU_BUDGET     núcleos de CPU que puede estar usando el contenedor
+                             (p. ej. 0.45 con limits.cpu=500m; 0 = sin límite)
+    ADMISSION_CPU_WINDOW     segundos sobre los que se mide el uso de CPU (por defecto 1)
+    ADMISSION_RETRY_AFTER    valor de Retry-After en las respuestas 503 (por defecto 2)
+
+La CPU se mide con el contador del cgroup (todo el contenedor, incluidos los
+procesos hijos como los pools de workloads), que es lo mismo que ve el HPA.
+Los rechazos se cuentan por motivo en stats() y, con common/metrics.py, en
+admission_shed_total{reason} de /metrics: el HPA escala sobre saturación real
+(admission_shed_per_second vía prometheus-adapter).
+
+Uso en Flask:
+
+    admission = AdmissionController.from_env()
+
+    @app.errorhandler(Overloaded)
+    def handle_overloaded(e): ...
+
+    @app.route("/heavy")
+    @admission.guard
+    def heavy(): ...
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+
+# Funciones f(motivo) a las que se informa de cada rechazo (ver common/metrics.py)
+shed_observers = []
+
+
+class Overloaded(Exception):
+    def __init__(self, reason, retry_after):
+        super().__init__(f"Service overloaded ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def _read_cgroup_v2():
+    with open("/sys/fs/cgroup/cpu.stat") as f:
+        for line in f:
+            if line.startswith("usage_usec"):
+                return int(line.split()[1]) / 1_000_000
+    raise OSError("usage_usec not found in cpu.stat")
+
+
+def _read_cgroup_v1():
+    with open("/sys/fs/cgroup/cpuacct/cpuacct.usage") as f:
+        return int(f.read()) / 1_000_000_000
+
+
+def _read_process_times():
+    # Sin cgroup legible: CPU de este proceso y de sus hijos ya terminados
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+def cpu_seconds_reader():
+    """Devuelve la función que lee los segundos de CPU consumidos (la primera fuente disponible)."""
+    for reader in (_read_cgroup_v2, _read_cgroup_v1):
+        try:
+            reader()
+            return reader
+        except (OSError, ValueError):
+            continue
+    return _read_process_times
+
+
+class AdmissionController:
+    def __init__(self, *, max_in_flight=0, cpu_budget=0.0, cpu_window=1.0, retry_after=2,
+                 cpu_reader=None, clock=time.monotonic):
+        self.max_in_flight = max_in_flight
+        self.cpu_budget = cpu_budget
+        self.cpu_window = cpu_window
+        self.retry_after = retry_after
+        self.clock = clock
+        self._read_cpu = cpu_reader or cpu_seconds_reader()
+        self._lock = threading.Lock()
+
+        self.in_flight = 0
+        self.cpu_rate = 0.0  # núcleos usados en la última ventana
+        self._sample = (clock(), self._read_cpu())
+
+        # Contadores
+        self.admitted = 0
+        self.shed = {"concurrency": 0, "cpu": 0}
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_in_flight=int(os.environ.get("ADMISSION_MAX_IN_FLIGHT", 0)),
+            cpu_budget=float(os.environ.get("ADMISSION_CPU_BUDGET", 0)),
+            cpu_window=float(os.environ.get("ADMISSION_CPU_WINDOW", 1)),
+            retry_after=int(os.environ.get("ADMISSION_RETRY_AFTER", 2)),
+        )
+
+    def _update_cpu_rate(self, now):
+        # Se recalcula como mucho una vez por ventana, dentro del request (sin hilo aparte)
+        sampled_at, sampled_cpu = self._sample
+        if now - sampled_at >= self.cpu_window:
+            cpu = self._read_cpu()
+            self.cpu_rate = max(0.0, (cpu - sampled_cpu) / (now - sampled_at))
+            self._sample = (now, cpu)
+
+    def try_acquire(self):
+        """Reserva un hueco o lanza Overloaded."""
+        with self._lock:
+            if self.max_in_flight and self.in_flight >= self.max_in_flight:
+                self._shed("concurrency")
+            if self.cpu_budget:
+                self._update_cpu_rate(self.clock())
+                if self.cpu_rate > self.cpu_budget:
+                    self._shed("cpu")
+            self.in_flight += 1
+            self.admitted += 1
+
+    def _shed(self, reason):
+        self.shed[reason] += 1
+        for observer in shed_observers:
+            observer(reason)
+        raise Overloaded(reason, self.retry_after)
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    @contextmanager
+    def admit(self):
+        self.try_acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def guard(self, view):
+        """Decorador de vistas: el request sólo se ejecuta si hay presupuesto."""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            with self.admit():
+                return view(*args, **kwargs)
+        return wrapper
+
+    def stats(self):
+        with self._lock:
+            self._update_cpu_rate(self.clock())
+            return {
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "cpu_rate": round(self.cpu_rate, 3),
+                "cpu_budget": self.cpu_budget,
+                "admitted": self.admitted,
+                "shed": dict(self.shed),
+                "shed_total": sum(self.shed.values()),
+            }
@@ -0,0 +1,144 @@
+"""
+Pool de conexiones MySQL no bloqueante (aiomysql) para el modo ASGI.
+
+Misma configuración y mismas estadísticas que common.db_pool, pero el checkout
+es una corrutina: mientras un request espera a MySQL el event loop atiende a
+los demás, en lugar de ocupar un hilo por consulta en curso.
+
+    async with pool.connection() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            ...
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+import aiomysql
+from pymysql.constants import CLIENT
+
+from .db_pool import PoolExhaustedError, checkout_observers, query_observers
+
+
+class AsyncConnectionPool:
+    def __init__(self, *, size=10, max_lifetime=1800, checkout_timeout=5, **connect_kwargs):
+        self.size = size
+        self.max_lifetime = max_lifetime
+        self.checkout_timeout = checkout_timeout
+        self._connect_kwargs = connect_kwargs
+        self._pool = None
+
+        # Estadísticas
+        self._waiting = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._latencies = deque(maxlen=1024)
+
+    async def open(self):
+        self._pool = await aiomysql.create_pool(
+            minsize=1,
+            maxsize=self.size,
+            # aiomysql descarta al hacer checkout las conexiones más viejas que esto
+            pool_recycle=int(self.max_lifetime),
+            autocommit=False,
+            **self._connect_kwargs
+        )
+
+    async def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            await self._pool.wait_closed()
+            self._pool = None
+
+    @asynccontextmanager
+    async def connection(self):
+        start = time.monotonic()
+        self._waiting += 1
+        error = None
+        try:
+            conn = await asyncio.wait_for(self._pool.acquire(), timeout=self.checkout_timeout)
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            error = PoolExhaustedError(
+                f"No DB connection available after {self.checkout_timeout}s (size={self.size})"
+            )
+            raise error
+        finally:
+            self._waiting -= 1
+            for observer in checkout_observers:
+                observer(time.monotonic() - start, error)
+
+        self._checkouts += 1
+        self._latencies.append(time.monotonic() - start)
+        try:
+            yield conn
+        finally:
+            # No devolver al pool una transacción a medias
+            try:
+                if conn.get_transaction_status():
+                    await conn.rollback()
+            except Exception as e:
+                # Conexión rota: se cierra y release() la descuenta del pool
+                print(f"⚠️ Rollback failed, closing connection: {e}")
+                conn.close()
+            finally:
+                self._pool.release(conn)
+
+    def stats(self):
+        latencies = sorted(self._latencies)
+        open_conns = self._pool.size if self._pool else 0
+        idle = self._pool.freesize if self._pool else 0
+
+        def pct(p):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+        return {
+            "size": self.size,
+            "open": open_conns,
+            "idle": idle,
+            "in_use": open_conns - idle,
+            "waiting": self._waiting,
+            "checkouts": self._checkouts,
+            "timeouts": self._timeouts,
+            "checkout_latency_ms": {
+                "avg": (sum(latencies) / len(latencies) * 1000) if latencies else 0.0,
+                "p50": pct(0.50),
+                "p99": pct(0.99),
+                "max": latencies[-1] * 1000 if latencies else 0.0,
+            },
+        }
+
+
+async def execute(cursor, operation, args=None):
+    """`await cursor.execute(...)` informando a los query_observers de common.db_pool (métricas, trazas)."""
+    if not query_observers:
+        return await cursor.execute(operation, args)
+    start = time.perf_counter()
+    error = None
+    try:
+        return await cursor.execute(operation, args)
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        for observer in query_observers:
+            observer(operation, args, elapsed, error)
+
+
+def create_async_pool():
+    """Pool configurado con las mismas variables de entorno que common.db_pool.get_pool()."""
+    return AsyncConnectionPool(
+        size=int(os.environ.get("DB_POOL_SIZE", 10)),
+        max_lifetime=float(os.environ.get("DB_POOL_MAX_LIFETIME", 1800)),
+        checkout_timeout=float(os.environ.get("DB_POOL_TIMEOUT", 5)),
+        host=os.environ.get("DB_HOST", "mysql"),
+        user=os.environ.get("DB_USER", "myapp_user"),
+        password=os.environ.get("DB_PASSWORD", "mypassword"),
+        db=os.environ.get("DB_NAME", "myapp_db"),
+        # Igual que common.db_pool: rowcount cuenta las filas encontradas, no las cambiadas
+        client_flag=CLIENT.FOUND_ROWS,
+    )
@@ -0,0 +1,279 @@
+"""
+Tokens de sesión firmados (JWT con EdDSA / Ed25519).
+
+mscv-auth firma los tokens con su clave privada al hacer /login y publica las
+claves públicas en /.well-known/jwks.json. El resto de servicios los verifican
+localmente con `TokenVerifier`, que cachea esas claves: validar un request
+cuesta una verificación de firma (microsegundos) y no toca la tabla `users`.
+
+Rotación de claves:
+  1. Añadir la clave nueva al directorio AUTH_KEYS_DIR (`<kid>.pem`, PKCS8).
+  2. Apuntar AUTH_ACTIVE_KID a la nueva: se firma con ella, pero la anterior
+     se sigue publicando y los tokens emitidos con ella siguen siendo válidos.
+  3. Retirar la clave vieja cuando hayan expirado sus refresh tokens.
+Los verificadores recargan el JWKS automáticamente al ver un `kid` desconocido.
+"""
+import base64
+import json
+import os
+import threading
+import time
+import urllib.request
+import uuid
+from pathlib import Path
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+
+from .cache import TTLCache
+
+ALGORITHM = "EdDSA"
+ISSUER = os.environ.get("AUTH_ISSUER", "mscv-auth")
+ACCESS_TOKEN_TTL = int(os.environ.get("AUTH_ACCESS_TOKEN_TTL", 900))
+REFRESH_TOKEN_TTL = int(os.environ.get("AUTH_REFRESH_TOKEN_TTL", 7 * 24 * 3600))
+# Tolerancia de reloj entre pods al validar exp / iat
+CLOCK_SKEW = 30
+
+
+class TokenError(Exception):
+    """Token mal formado, con firma inválida, expirado o de un tipo inesperado."""
+
+
+def b64url_encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def b64url_decode(data):
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _json_segment(obj):
+    return b64url_encode(json.dumps(obj, separators=(",", ":"), sort_keys=True).encode("utf-8"))
+
+
+# ----------------------------------------------------------------------
+# Emisión (mscv-auth)
+# ----------------------------------------------------------------------
+class TokenIssuer:
+    def __init__(self, keys, active_kid):
+        if active_kid not in keys:
+            raise ValueError(f"Active key '{active_kid}' not found")
+        self.keys = keys
+        self.active_kid = active_kid
+
+    @classmethod
+    def from_env(cls):
+        """
+        Carga las claves de AUTH_KEYS_DIR (un `<kid>.pem` por clave) y/o de AUTH_SIGNING_KEY
+        (un PEM, con kid AUTH_ACTIVE_KID; así la inyecta infra desde un Secret). Sin
+        ninguna genera una clave efímera: sólo vale para desarrollo con una única réplica
+        (docker-compose); el despliegue en el clúster exige el Secret.
+        """
+        keys_dir = os.environ.get("AUTH_KEYS_DIR")
+        keys = {}
+        if keys_dir and Path(keys_dir).is_dir():
+            for path in sorted(Path(keys_dir).glob("*.pem")):
+                keys[path.stem] = serialization.load_pem_private_key(path.read_bytes(), password=None)
+        if os.environ.get("AUTH_SIGNING_KEY"):
+            kid = os.environ.get("AUTH_ACTIVE_KID", "primary")
+            keys[kid] = serialization.load_pem_private_key(os.environ["AUTH_SIGNING_KEY"].encode("ascii"), password=None)
+        if not keys:
+            print("⚠️  No signing keys configured: using an ephemeral signing key (dev only)")
+            # kid único por proceso: un token de otra réplica falla con "Unknown signing key", no con firma inválida.
+            # AUTH_ACTIVE_KID se ignora: nombra una clave que no se ha cargado
+            kid = f"dev-{uuid.uuid4().hex[:8]}"
+            return cls({kid: Ed25519PrivateKey.generate()}, kid)
+        active_kid = os.environ.get("AUTH_ACTIVE_KID") or sorted(keys)[-1]
+        return cls(keys, active_kid)
+
+    def issue(self, claims, token_type, ttl):
+        now = int(time.time())
+        header = {"alg": ALGORITHM, "typ": "JWT", "kid": self.active_kid}
+        payload = {
+            **claims,
+            "iss": ISSUER,
+            "typ": token_type,
+            "iat": now,
+            "exp": now + ttl,
+            "jti": uuid.uuid4().hex,
+        }
+        signing_input = f"{_json_segment(header)}.{_json_segment(payload)}"
+        signature = self.keys[self.active_kid].sign(signing_input.encode("ascii"))
+        return f"{signing_input}.{b64url_encode(signature)}"
+
+    def issue_pair(self, user):
+        """Access token corto + refresh token largo para una fila de `users`."""
+        claims = {
+            "sub": str(user["id"]),
+            "email": user["email"],
+            "name": user.get("name"),
+            "role": user.get("role"),
+            "department": user.get("department"),
+        }
+        return {
+            "accessToken": self.issue(claims, "access", ACCESS_TOKEN_TTL),
+            "refreshToken": self.issue({"sub": claims["sub"]}, "refresh", REFRESH_TOKEN_TTL),
+            "tokenType": "Bearer",
+            "expiresIn": ACCESS_TOKEN_TTL,
+        }
+
+    def jwks(self):
+        """Claves públicas en formato JWK (OKP / Ed25519)."""
+        return {"keys": [
+            {
+                "kty": "OKP",
+                "crv": "Ed25519",
+                "alg": ALGORITHM,
+                "use": "sig",
+                "kid": kid,
+                "x": b64url_encode(key.public_key().public_bytes(
+                    serialization.Encoding.Raw, serialization.PublicFormat.Raw
+                )),
+            }
+            for kid, key in sorted(self.keys.items())
+        ]}
+
+    def verifier(self):
+        """Verificador local con las claves propias (para /token/refresh en mscv-auth)."""
+        verifier = TokenVerifier(jwks_url=None)
+        verifier.load_jwks(self.jwks())
+        return verifier
+
+
+# ----------------------------------------------------------------------
+# Verificación (cualquier servicio)
+# ----------------------------------------------------------------------
+class TokenVerifier:
+    def __init__(self, jwks_url, refresh_interval=300, min_refetch_interval=10):
+        self.jwks_url = jwks_url
+        self.refresh_interval = refresh_interval
+        self.min_refetch_interval = min_refetch_interval
+        self._keys = {}
+        self._fetched_at = float("-inf")  # nunca: la primera verificación descarga el JWKS
+        self._lock = threading.Lock()
+        # Tokens ya verificados (por firma): el mismo token repetido no vuelve a verificarse
+        self._verified = TTLCache(maxsize=4096, ttl=60)
+
+    @classmethod
+    def from_env(cls):
+        return cls(jwks_url=os.environ.get("AUTH_JWKS_URL", "http://mscv-auth:5001/.well-known/jwks.json"))
+
+    def load_jwks(self, jwks):
+        keys = {}
+        for jwk in jwks.get("keys", []):
+            if jwk.get("kty") == "OKP" and jwk.get("crv") == "Ed25519":
+                keys[jwk["kid"]] = Ed25519PublicKey.from_public_bytes(b64url_decode(jwk["x"]))
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+
+    def prefetch(self):
+        """Descarga el JWKS por adelantado (calentamiento del worker), sin esperar al primer token."""
+        self._refresh()
+
+    def _refresh(self, force=False):
+        if self.jwks_url is None:
+            return
+        with self._lock:
+            age = time.monotonic() - self._fetched_at
+            # Un kid desconocido fuerza la recarga, pero como mucho cada min_refetch_interval
+            if (force and age < self.min_refetch_interval) or (not force and age < self.refresh_interval):
+                return
+            try:
+                with urllib.request.urlopen(self.jwks_url, timeout=2) as response:
+                    self.load_jwks(json.loads(response.read()))
+            except OSError as e:
+                print(f"⚠️  Could not refresh JWKS from {self.jwks_url}: {e}")
+                self._fetched_at = time.monotonic()
+
+    def _key_for(self, kid):
+        self._refresh()
+        key = self._keys.get(kid)
+        if key is None:
+            self._refresh(force=True)
+            key = self._keys.get(kid)
+        if key is None:
+            raise TokenError(f"Unknown signing key '{kid}'")
+        return key
+
+    def verify(self, token, token_type="access"):
+        """Devuelve los claims si el token es válido; si no, lanza TokenError."""
+        claims = self._verified.get(token)
+        if claims is None:
+            claims = self._verify_signature(token)
+            self._verified.set(token, claims)
+        self._check_claims(claims, token_type)
+        return claims
+
+    def _verify_signature(self, token):
+        try:
+            header_b64, payload_b64, signature_b64 = token.split(".")
+            header = json.loads(b64url_decode(header_b64))
+            signature = b64url_decode(signature_b64)
+            # UnicodeEncodeError es un ValueError: segmentos no ASCII son un token mal formado
+            signing_input = f"{header_b64}.{payload_b64}".encode("ascii")
+        except (ValueError, TypeError):
+            raise TokenError("Malformed token")
+        # JSON válido no implica objeto: "W10" es [] y no tiene .get()
+        if not isinstance(header, dict) or not isinstance(header.get("kid"), str):
+            raise TokenError("Malformed token")
+
+        if header.get("alg") != ALGORITHM:
+            raise TokenError("Unsupported algorithm")
+        try:
+            self._key_for(header["kid"]).verify(signature, signing_input)
+        except InvalidSignature:
+            raise TokenError("Invalid signature")
+
+        try:
+            claims = json.loads(b64url_decode(payload_b64))
+        except (ValueError, TypeError):
+            raise TokenError("Malformed token")
+        if not isinstance(claims, dict):
+            raise TokenError("Malformed token")
+        return claims
+
+    @staticmethod
+    def _check_claims(claims, token_type):
+        now = time.time()
+        if claims.get("iss") != ISSUER:
+            raise TokenError("Invalid issuer")
+        if claims.get("typ") != token_type:
+            raise TokenError(f"Expected a token of type '{token_type}'")
+        exp, iat = claims.get("exp", 0), claims.get("iat", 0)
+        if not isinstance(exp, (int, float)) or not isinstance(iat, (int, float)):
+            raise TokenError("Malformed token")
+        if exp + CLOCK_SKEW < now:
+            raise TokenError("Token expired")
+        if iat - CLOCK_SKEW > now:
+            raise TokenError("Token issued in the future")
+
+
+def bearer_token(authorization_header):
+    if authorization_header and authorization_header.startswith("Bearer "):
+        return authorization_header[len("Bearer "):].strip()
+    return None
+
+
+# AUTH_MODE de los servicios que verifican: off = no se mira la cabecera,
+# optional = se valida si viene (y un token inválido es 401), required = obligatorio
+AUTH_MODES = ("off", "optional", "required")
+
+
+def auth_mode_from_env():
+    mode = os.environ.get("AUTH_MODE", "optional").lower()
+    if mode not in AUTH_MODES:
+        raise ValueError(f"AUTH_MODE must be one of: {', '.join(AUTH_MODES)}")
+    return mode
+
+
+def authenticate(verifier, authorization_header, mode):
+    """Claims del token Bearer, o None si no hay token y el modo lo permite. Lanza TokenError."""
+    if mode == "off":
+        return None
+    token = bearer_token(authorization_header)
+    if token is None:
+        if mode == "required":
+            raise TokenError("Missing bearer token")
+        return None
+    return verifier.verify(token)
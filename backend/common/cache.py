@@ -0,0 +1,81 @@
+"""
+Caché en proceso con TTL y expulsión LRU, compartida por los servicios Flask.
+
+Cada réplica tiene su propia caché: las escrituras invalidan la caché local y
+el resto de réplicas ve el cambio como mucho `ttl` segundos después.
+
+Para evitar guardar un valor leído antes de una invalidación concurrente, el
+lector toma `cache.generation` antes de ir a la base de datos y se lo pasa a
+`set()`: si hubo una invalidación entre medias, el valor se descarta.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    def __init__(self, *, maxsize=1024, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+
+        # Contadores
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, generation=None, ttl=None):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self._data[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def invalidate(self, key=None):
+        """Invalida una clave concreta, o toda la caché si no se indica ninguna."""
+        with self._lock:
+            self.generation += 1
+            if key is None:
+                self.invalidations += len(self._data)
+                self._data.clear()
+            elif self._data.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,371 @@
+"""
+Pool de conexiones MySQL compartido por mscv-auth y mscv-employee.
+
+Evita abrir una conexión TCP + handshake de autenticación por cada request:
+las conexiones se reutilizan, se reciclan por edad y por tiempo ocioso, se
+verifican con un ping al sacarlas del pool y, si el pool está agotado, el
+request espera como máximo `checkout_timeout` segundos antes de fallar.
+
+Los handlers siguen usando el patrón de siempre:
+
+    conn = get_db_connection()
+    try:
+        ...
+    finally:
+        conn.close()   # devuelve la conexión al pool, no la cierra
+"""
+import os
+import threading
+import time
+from collections import deque
+
+import mysql.connector
+from mysql.connector.constants import ClientFlag
+
+
+class PoolExhaustedError(Exception):
+    """No se pudo obtener una conexión del pool dentro del timeout."""
+
+
+class _PoolEntry:
+    __slots__ = ("conn", "created_at", "last_used")
+
+    def __init__(self, conn):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+
+
+# Funciones f(sql, params, segundos, error) a las que se informa de cada consulta
+# (common/metrics.py, common/tracing.py, common/slow_queries.py).
+# Sin observadores, cursor() devuelve el cursor real sin envoltorio.
+query_observers = []
+# Funciones f(segundos, error) a las que se informa de cada checkout del pool (ver common/tracing.py)
+checkout_observers = []
+
+
+class TimedCursor:
+    """Proxy de cursor que mide execute() / executemany() y avisa a los query_observers."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def _timed(self, method, operation, params, args, kwargs):
+        start = time.perf_counter()
+        error = None
+        try:
+            return method(operation, *args, **kwargs)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            for observer in query_observers:
+                observer(operation, params, elapsed, error)
+
+    def execute(self, operation, *args, **kwargs):
+        params = args[0] if args else kwargs.get("params")
+        return self._timed(self._cursor.execute, operation, params, args, kwargs)
+
+    def executemany(self, operation, *args, **kwargs):
+        # Los parámetros de executemany son una secuencia de filas: no se pasan a los observadores
+        return self._timed(self._cursor.executemany, operation, None, args, kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        self._cursor.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._cursor.__exit__(*exc)
+
+
+class PooledConnection:
+    """
+    Envoltorio sobre una conexión real. Delega todo a la conexión subyacente,
+    pero `close()` la devuelve al pool en lugar de cerrarla.
+    """
+
+    def __init__(self, pool, entry):
+        self._pool = pool
+        self._entry = entry
+
+    @property
+    def raw(self):
+        return self._entry.conn
+
+    def close(self):
+        if self._entry is not None:
+            entry, self._entry = self._entry, None
+            self._pool._release(entry)
+
+    def cursor(self, *args, **kwargs):
+        cursor = self.__getattr__("cursor")(*args, **kwargs)
+        return TimedCursor(cursor) if query_observers else cursor
+
+    def discard(self):
+        """Cierra la conexión real en vez de devolverla (p. ej. con resultados sin leer)."""
+        if self._entry is not None:
+            entry, self._entry = self._entry, None
+            self._pool._close_entry(entry)
+
+    def __getattr__(self, name):
+        if self._entry is None:
+            raise mysql.connector.errors.OperationalError("Connection already returned to the pool")
+        return getattr(self._entry.conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ConnectionPool:
+    def __init__(self,
+                 *,
+                 size=5,
+                 max_lifetime=1800,
+                 max_idle=300,
+                 checkout_timeout=5,
+                 ping_on_checkout=True,
+                 connect=None,
+                 **connect_kwargs):
+        if size < 1:
+            raise ValueError("Pool size must be >= 1")
+
+        self.size = size
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.checkout_timeout = checkout_timeout
+        self.ping_on_checkout = ping_on_checkout
+        self._connect = connect or (lambda: mysql.connector.connect(**connect_kwargs))
+
+        self._idle = deque()
+        self._cond = threading.Condition()
+        self._open = 0
+        self._waiting = 0
+
+        # Estadísticas
+        self._checkouts = 0
+        self._timeouts = 0
+        self._recycled = 0
+        self._failed_pings = 0
+        self._latencies = deque(maxlen=1024)
+
+    # ------------------------------------------------------------------
+    # Checkout / release
+    # ------------------------------------------------------------------
+    def get_connection(self, timeout=None):
+        start = time.monotonic()
+        error = None
+        try:
+            return self._checkout(start, self.checkout_timeout if timeout is None else timeout)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            for observer in checkout_observers:
+                observer(time.monotonic() - start, error)
+
+    def _checkout(self, start, timeout):
+        deadline = start + timeout
+
+        while True:
+            entry = self._take_or_reserve(deadline)
+            if entry is None:
+                # Slot reservado: abrir una conexión nueva fuera del lock
+                try:
+                    entry = _PoolEntry(self._connect())
+                except Exception:
+                    self._discard_slot()
+                    raise
+            elif self.ping_on_checkout and not self._is_alive(entry.conn):
+                with self._cond:
+                    self._failed_pings += 1
+                self._close_entry(entry)
+                continue
+
+            elapsed = time.monotonic() - start
+            with self._cond:
+                self._checkouts += 1
+                self._latencies.append(elapsed)
+            return PooledConnection(self, entry)
+
+    def _take_or_reserve(self, deadline):
+        """Devuelve una conexión ociosa válida, o None si se reservó un slot para abrir una nueva."""
+        expired = []
+        try:
+            with self._cond:
+                while True:
+                    while self._idle:
+                        entry = self._idle.pop()
+                        if self._is_expired(entry):
+                            self._open -= 1
+                            self._recycled += 1
+                            expired.append(entry)
+                            continue
+                        return entry
+
+                    if self._open < self.size:
+                        self._open += 1
+                        return None
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolExhaustedError(
+                            f"No DB connection available after {self.checkout_timeout}s "
+                            f"(size={self.size}, waiting={self._waiting})"
+                        )
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+        finally:
+            for entry in expired:
+                self._safe_close(entry.conn)
+
+    def _release(self, entry):
+        conn = entry.conn
+        try:
+            # No devolver al pool una transacción a medias
+            if getattr(conn, "in_transaction", False):
+                conn.rollback()
+        except Exception:
+            self._close_entry(entry)
+            return
+
+        entry.last_used = time.monotonic()
+        if self._is_expired(entry):
+            with self._cond:
+                self._recycled += 1
+            self._close_entry(entry)
+            return
+
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    def _close_entry(self, entry):
+        self._safe_close(entry.conn)
+        self._discard_slot()
+
+    def _discard_slot(self):
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    def _is_expired(self, entry):
+        now = time.monotonic()
+        if self.max_lifetime and now - entry.created_at > self.max_lifetime:
+            return True
+        if self.max_idle and now - entry.last_used > self.max_idle:
+            return True
+        return False
+
+    @staticmethod
+    def _is_alive(conn):
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _safe_close(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    # ------------------------------------------------------------------
+    # Mantenimiento y estadísticas
+    # ------------------------------------------------------------------
+    def prefill(self, count=None):
+        """Abre conexiones por adelantado (p. ej. al arrancar el pod)."""
+        count = self.size if count is None else min(count, self.size)
+        conns = []
+        try:
+            for _ in range(count):
+                conns.append(self.get_connection())
+        finally:
+            for conn in conns:
+                conn.close()
+
+    def close_all(self):
+        with self._cond:
+            entries = list(self._idle)
+            self._idle.clear()
+            self._open -= len(entries)
+        for entry in entries:
+            self._safe_close(entry.conn)
+
+    def stats(self):
+        with self._cond:
+            latencies = sorted(self._latencies)
+            idle = len(self._idle)
+            stats = {
+                "size": self.size,
+                "open": self._open,
+                "idle": idle,
+                "in_use": self._open - idle,
+                "waiting": self._waiting,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "recycled": self._recycled,
+                "failed_pings": self._failed_pings,
+            }
+
+        def pct(p):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+        stats["checkout_latency_ms"] = {
+            "avg": (sum(latencies) / len(latencies) * 1000) if latencies else 0.0,
+            "p50": pct(0.50),
+            "p99": pct(0.99),
+            "max": latencies[-1] * 1000 if latencies else 0.0,
+        }
+        return stats
+
+
+# ----------------------------------------------------------------------
+# Pool por proceso, configurado con variables de entorno
+# ----------------------------------------------------------------------
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    size=int(os.environ.get("DB_POOL_SIZE", 5)),
+                    max_lifetime=float(os.environ.get("DB_POOL_MAX_LIFETIME", 1800)),
+                    max_idle=float(os.environ.get("DB_POOL_MAX_IDLE", 300)),
+                    checkout_timeout=float(os.environ.get("DB_POOL_TIMEOUT", 5)),
+                    ping_on_checkout=os.environ.get("DB_POOL_PING", "true").lower() == "true",
+                    host=os.environ.get("DB_HOST", "mysql"),
+                    user=os.environ.get("DB_USER", "myapp_user"),
+                    password=os.environ.get("DB_PASSWORD", "mypassword"),
+                    database=os.environ.get("DB_NAME", "myapp_db"),
+                    # rowcount = filas encontradas, no cambiadas: un UPDATE que deja
+                    # la fila igual no es un 404
+                    client_flags=[ClientFlag.FOUND_ROWS],
+                )
+    return _pool
+
+
+def get_db_connection():
+    return get_pool().get_connection()
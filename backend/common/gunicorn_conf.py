@@ -0,0 +1,103 @@
+"""
+Configuración de gunicorn compartida por los tres servicios Flask.
+
+Se usa desde el Dockerfile de cada servicio:
+
+    CMD ["gunicorn", "--config", "python:common.gunicorn_conf"]
+
+Todo se ajusta con variables de entorno, que los módulos de infra/microservices/*
+rellenan por servicio (ver ServerConfig en deploy_base.py):
+
+    PORT                   puerto de escucha (lo fija cada Dockerfile)
+    WEB_APP                módulo:objeto a servir (por defecto app:app; asgi_app:app para ASGI)
+    WEB_WORKERS            procesos worker (por defecto 2)
+    WEB_THREADS            hilos por worker con WEB_WORKER_CLASS=threaded (por defecto 4)
+    WEB_WORKER_CLASS       sync | threaded | gevent | asgi (por defecto threaded)
+    WEB_WORKER_CONNECTIONS conexiones simultáneas por worker con gevent (por defecto 100)
+    WEB_TIMEOUT            segundos antes de matar un worker colgado (por defecto 60)
+    WEB_GRACEFUL_TIMEOUT   segundos para terminar requests en curso tras SIGTERM (por defecto 25)
+    WEB_KEEPALIVE          segundos que se mantiene abierta una conexión keep-alive (por defecto 5)
+    WEB_MAX_REQUESTS       reciclar el worker tras N requests, 0 = nunca (por defecto 0)
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+WORKER_CLASSES = {
+    "sync": "sync",
+    "threaded": "gthread",
+    "gthread": "gthread",
+    "gevent": "gevent",
+    # Event loop asyncio (uvicorn) para apps ASGI, p. ej. mscv-employee/asgi_app.py
+    "asgi": "uvicorn.workers.UvicornWorker",
+}
+
+wsgi_app = os.environ.get("WEB_APP", "app:app")
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+worker_class = WORKER_CLASSES[os.environ.get("WEB_WORKER_CLASS", "threaded").lower()]
+workers = int(os.environ.get("WEB_WORKERS", os.environ.get("WEB_CONCURRENCY", 2)))
+threads = int(os.environ.get("WEB_THREADS", 4)) if worker_class == "gthread" else 1
+worker_connections = int(os.environ.get("WEB_WORKER_CONNECTIONS", 100))
+
+# La app se importa una vez en el master y los workers la heredan con fork:
+# arranque más rápido y memoria compartida (copy-on-write). Los pools de conexiones
+# se crean de forma perezosa, así que cada worker abre los suyos tras el fork.
+preload_app = True
+
+timeout = int(os.environ.get("WEB_TIMEOUT", 60))
+# Debe ser menor que terminationGracePeriodSeconds del pod
+graceful_timeout = int(os.environ.get("WEB_GRACEFUL_TIMEOUT", 25))
+# Los workers sync no soportan keep-alive; threaded/gevent sí
+keepalive = int(os.environ.get("WEB_KEEPALIVE", 5))
+
+max_requests = int(os.environ.get("WEB_MAX_REQUESTS", 0))
+max_requests_jitter = max_requests // 10
+
+# Métricas Prometheus compartidas entre workers (ver common/metrics.py). Se fija
+# aquí, antes de cargar la app, y se vacía en cada arranque del master.
+if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = os.path.join(tempfile.gettempdir(), "prometheus-multiproc")
+shutil.rmtree(os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True)
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+# Workers ya calentados (ver common/health.py): /readyz espera a todos los del pod
+if not os.environ.get("HEALTH_READY_DIR"):
+    os.environ["HEALTH_READY_DIR"] = os.path.join(tempfile.gettempdir(), "health-ready")
+shutil.rmtree(os.environ["HEALTH_READY_DIR"], ignore_errors=True)
+os.makedirs(os.environ["HEALTH_READY_DIR"], exist_ok=True)
+# Cuántos deben estar listos: el mismo `workers` de arriba (WEB_WORKERS, WEB_CONCURRENCY o 2)
+os.environ["HEALTH_POD_WORKERS"] = str(workers)
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("WEB_LOG_LEVEL", "info")
+
+
+def post_worker_init(worker):
+    """Prellena el pool y calienta cachés en segundo plano; /readyz da 503 hasta que termine."""
+    health = sys.modules.get("common.health")
+    if health is not None:
+        health.start_warmups()
+
+
+def worker_exit(server, worker):
+    """Cierra las conexiones ociosas del pool al terminar el worker (apagado limpio)."""
+    db_pool = sys.modules.get("common.db_pool")
+    if db_pool is not None and db_pool._pool is not None:
+        db_pool._pool.close_all()
+    # Y los procesos de hashing de contraseñas (mscv-auth)
+    passwords = sys.modules.get("common.passwords")
+    if passwords is not None:
+        passwords.shutdown()
+
+
+def child_exit(server, worker):
+    """Descarta los gauges 'live' del worker muerto en las métricas y su marca de listo."""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+    health = sys.modules.get("common.health")
+    if health is not None:
+        health.mark_worker_dead(worker.pid)
@@ -0,0 +1,173 @@
+"""
+Sondas de Kubernetes y calentamiento de cada worker.
+
+    health = init_health(app)
+
+    @health.warmup("db_pool")
+    def warm_db_pool():
+        get_pool().prefill()
+
+GET /healthz  liveness: el proceso responde. No mira MySQL: una caída de la base
+              de datos no debe hacer que Kubernetes reinicie todos los pods.
+GET /readyz   readiness: 200 sólo cuando los calentamientos de este worker han
+              terminado (pool prellenado, cachés cargadas, pools de procesos
+              arrancados) y, con gunicorn, también los de los demás workers del
+              pod; si no, 503 con el estado de cada paso.
+
+Los calentamientos corren en un hilo de fondo de cada worker, lanzado desde el
+hook post_worker_init de common/gunicorn_conf.py (o en el primer /readyz fuera
+de gunicorn). Si uno obligatorio falla (p. ej. MySQL aún no acepta conexiones)
+se reintenta con backoff y el pod sigue fuera del Service hasta que lo consiga.
+
+Cada worker listo deja un fichero con su pid en HEALTH_READY_DIR y /readyz espera
+a HEALTH_POD_WORKERS ficheros (los dos los fija gunicorn_conf.py): así la sonda,
+que cae en un worker cualquiera, sólo pasa cuando todo el pod está caliente.
+"""
+import os
+import threading
+import time
+
+from flask import jsonify
+
+_instances = []
+
+
+class Health:
+    def __init__(self, *, retry_initial=0.5, retry_max=10):
+        self.retry_initial = retry_initial
+        self.retry_max = retry_max
+        self._warmups = []  # (nombre, función, obligatorio)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._checks = {}
+        self._ready = False
+        self.started_at = time.time()
+
+    def warmup(self, name, required=True):
+        """Decorador: registra un paso de calentamiento. Los opcionales sólo se intentan una vez."""
+        def register(fn):
+            self._warmups.append((name, fn, required))
+            return fn
+        return register
+
+    # ------------------------------------------------------------------
+    # Calentamiento (por worker, tras el fork)
+    # ------------------------------------------------------------------
+    def start(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._ready = False
+            self._checks = {name: {"status": "pending"} for name, _, _ in self._warmups}
+        threading.Thread(target=self._run_warmups, name="warmup", daemon=True).start()
+
+    def _run_warmups(self):
+        for name, fn, required in self._warmups:
+            delay = self.retry_initial
+            attempts = 0
+            while True:
+                attempts += 1
+                start = time.monotonic()
+                try:
+                    fn()
+                except Exception as e:
+                    self._set_check(name, status="retrying" if required else "skipped",
+                                    attempts=attempts, error=f"{type(e).__name__}: {e}")
+                    print(f"⚠️ Warm-up '{name}' failed (attempt {attempts}): {e}")
+                    if not required:
+                        break
+                    time.sleep(delay)
+                    delay = min(delay * 2, self.retry_max)
+                    continue
+                self._set_check(name, status="ok", attempts=attempts,
+                                seconds=round(time.monotonic() - start, 3))
+                break
+
+        with self._lock:
+            self._ready = True
+        _mark_worker_ready()
+        print(f"✅ Worker {os.getpid()} warmed up")
+
+    def _set_check(self, name, **state):
+        with self._lock:
+            self._checks[name] = state
+
+    # ------------------------------------------------------------------
+    # Estado
+    # ------------------------------------------------------------------
+    def status(self):
+        self.start()
+        with self._lock:
+            worker_ready = self._ready
+            checks = {name: dict(state) for name, state in self._checks.items()}
+        ready_workers, expected_workers = _pod_workers()
+        ready = worker_ready and ready_workers >= expected_workers
+        return ready, {
+            "status": "ready" if ready else "warming",
+            "pid": os.getpid(),
+            "worker_ready": worker_ready,
+            "workers_ready": ready_workers,
+            "workers_expected": expected_workers,
+            "checks": checks,
+        }
+
+
+# ----------------------------------------------------------------------
+# Workers listos del pod (ficheros en HEALTH_READY_DIR)
+# ----------------------------------------------------------------------
+def _ready_dir():
+    return os.environ.get("HEALTH_READY_DIR")
+
+
+def _mark_worker_ready():
+    directory = _ready_dir()
+    if directory:
+        with open(os.path.join(directory, str(os.getpid())), "w"):
+            pass
+
+
+def mark_worker_dead(pid):
+    """Desde child_exit del master: el worker que muere deja de contar como listo."""
+    directory = _ready_dir()
+    if directory:
+        try:
+            os.remove(os.path.join(directory, str(pid)))
+        except FileNotFoundError:
+            pass
+
+
+def _pod_workers():
+    directory = _ready_dir()
+    if not directory:
+        return 1, 1
+    try:
+        ready = len(os.listdir(directory))
+    except FileNotFoundError:
+        ready = 0
+    # Lo fija gunicorn_conf.py con el número de workers ya resuelto
+    return ready, int(os.environ.get("HEALTH_POD_WORKERS", 1))
+
+
+def start_warmups():
+    """Desde post_worker_init de gunicorn: arranca los calentamientos de todas las apps del proceso."""
+    for health in _instances:
+        health.start()
+
+
+def init_health(app):
+    """Registra GET /healthz y GET /readyz. Devuelve el Health para añadir calentamientos."""
+    health = Health()
+    _instances.append(health)
+
+    @app.route("/healthz", methods=["GET"])
+    def healthz():
+        return jsonify({"status": "ok", "pid": os.getpid(),
+                        "uptime_seconds": round(time.time() - health.started_at, 1)}), 200
+
+    @app.route("/readyz", methods=["GET"])
+    def readyz():
+        ready, body = health.status()
+        return jsonify(body), 200 if ready else 503
+
+    return health
@@ -0,0 +1,182 @@
+"""
+Métricas Prometheus compartidas por los servicios Flask, servidas en /metrics.
+
+    from common.metrics import init_metrics
+    init_metrics(app)
+
+Registra, por ruta (la plantilla de Flask, p. ej. /employees/<int:id>, para no
+disparar la cardinalidad):
+    http_requests_total{method, route, status}
+    http_request_duration_seconds{method, route}      histograma
+    http_response_size_bytes{route}                   histograma
+    http_requests_in_flight                           gauge
+    http_request_exceptions_total{route, exception}   excepciones no capturadas
+    db_query_duration_seconds{operation}              histograma (SELECT employees, ...)
+    db_query_errors_total{operation}
+    admission_shed_total{reason}                      rechazos de common/admission.py (503)
+
+Con gunicorn hay varios procesos worker: common/gunicorn_conf.py fija
+PROMETHEUS_MULTIPROC_DIR y cada scrape agrega los valores de todos los workers
+del pod. En el camino caliente sólo hay incrementos de contadores en memoria
+compartida (mmap); la agregación se hace al servir /metrics.
+"""
+import os
+import re
+import time
+
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from common import admission, db_pool
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+DB_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUESTS = Counter("http_requests_total", "Requests HTTP atendidos", ["method", "route", "status"])
+LATENCY = Histogram("http_request_duration_seconds", "Duración de los requests HTTP",
+                    ["method", "route"], buckets=LATENCY_BUCKETS)
+RESPONSE_SIZE = Histogram("http_response_size_bytes", "Tamaño del body de respuesta",
+                          ["route"], buckets=SIZE_BUCKETS)
+IN_FLIGHT = Gauge("http_requests_in_flight", "Requests HTTP en curso", multiprocess_mode="livesum")
+EXCEPTIONS = Counter("http_request_exceptions_total", "Excepciones no capturadas en los handlers",
+                     ["route", "exception"])
+DB_LATENCY = Histogram("db_query_duration_seconds", "Duración de las consultas a MySQL",
+                       ["operation"], buckets=DB_BUCKETS)
+DB_ERRORS = Counter("db_query_errors_total", "Consultas a MySQL que fallaron", ["operation"])
+ADMISSION_SHED = Counter("admission_shed_total", "Requests rechazados por el control de admisión",
+                         ["reason"])
+
+_TABLE_RE = re.compile(r"\b(?:FROM|INTO|UPDATE|JOIN)\s+`?(\w+)", re.IGNORECASE)
+
+
+def query_operation(sql):
+    """'SELECT employees', 'INSERT users', ... (verbo + primera tabla: cardinalidad acotada)."""
+    if isinstance(sql, (bytes, bytearray)):
+        sql = sql.decode("utf-8", "replace")
+    verb = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else "?"
+    table = _TABLE_RE.search(sql)
+    return f"{verb} {table.group(1)}" if table else verb
+
+
+def observe_query(sql, params, seconds, error):
+    operation = query_operation(sql)
+    DB_LATENCY.labels(operation).observe(seconds)
+    if error is not None:
+        DB_ERRORS.labels(operation).inc()
+
+
+def observe_shed(reason):
+    ADMISSION_SHED.labels(reason).inc()
+
+
+def metrics_response():
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        # Un registro nuevo por scrape que suma los ficheros de todos los workers
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), 200, {"Content-Type": CONTENT_TYPE_LATEST}
+
+
+def init_metrics(app):
+    """Instrumenta la app Flask y añade GET /metrics. Llamarlo antes de registrar otros before_request."""
+    if observe_query not in db_pool.query_observers:
+        db_pool.query_observers.append(observe_query)
+    if observe_shed not in admission.shed_observers:
+        admission.shed_observers.append(observe_shed)
+
+    def route_label():
+        return request.url_rule.rule if request.url_rule is not None else UNMATCHED_ROUTE
+
+    @app.before_request
+    def start_request_metrics():
+        g._metrics_start = time.perf_counter()
+        IN_FLIGHT.inc()
+
+    @app.after_request
+    def record_response_metrics(response):
+        g._metrics_status = response.status_code
+        if not response.is_streamed and response.content_length is not None:
+            RESPONSE_SIZE.labels(route_label()).observe(response.content_length)
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc):
+        start = g.pop("_metrics_start", None)
+        if start is None:
+            return
+        IN_FLIGHT.dec()
+        route = route_label()
+        if exc is not None:
+            EXCEPTIONS.labels(route, type(exc).__name__).inc()
+        status = g.pop("_metrics_status", 500)
+        REQUESTS.labels(request.method, route, str(status)).inc()
+        LATENCY.labels(request.method, route).observe(time.perf_counter() - start)
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        body, status, headers = metrics_response()
+        return Response(body, status=status, headers=headers)
+
+
+class MetricsASGIMiddleware:
+    """
+    Las mismas métricas HTTP para las rutas Starlette de un app ASGI
+    (mscv-employee/asgi_app.py). Las rutas montadas (la app Flask de fondo) no se
+    cuentan aquí: ya las instrumenta init_metrics.
+    """
+
+    def __init__(self, app, routes):
+        self.app = app
+        self.routes = routes
+
+    def _route_for(self, scope):
+        from starlette.routing import Match, Mount
+
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return None if isinstance(route, Mount) else route.path
+        return UNMATCHED_ROUTE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        route = self._route_for(scope)
+        if route is None:
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                for name, value in message.get("headers", []):
+                    if name.lower() == b"content-length":
+                        RESPONSE_SIZE.labels(route).observe(int(value))
+            await send(message)
+
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            EXCEPTIONS.labels(route, type(e).__name__).inc()
+            raise
+        finally:
+            IN_FLIGHT.dec()
+            REQUESTS.labels(scope["method"], route, str(status["code"])).inc()
+            LATENCY.labels(scope["method"], route).observe(time.perf_counter() - start)
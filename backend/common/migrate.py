@@ -0,0 +1,184 @@
+"""
+Runner de migraciones versionadas para MySQL.
+
+Las migraciones son archivos `V<versión>__<descripción>.sql` (p. ej.
+`V003__hot_query_indexes.sql`) que se aplican en orden de versión. Cada una se
+registra en la tabla `schema_migrations` con su checksum SHA-256:
+
+- las ya aplicadas se omiten (el runner es idempotente),
+- si el contenido de una migración aplicada cambió, el runner falla en vez de
+  aplicar un esquema distinto al registrado,
+- un lock con GET_LOCK evita que dos Jobs migren a la vez.
+
+MySQL hace commit implícito tras cada DDL, así que una migración que falla a
+medias no se puede deshacer; para que el reintento sea seguro se ignoran los
+errores de "columna/índice ya existe".
+
+Uso (desde backend/, o dentro de cualquier imagen de backend):
+
+    python -m common.migrate --dir ../db/migrations
+    python -m common.migrate --dir /migrations --dry-run
+"""
+import argparse
+import hashlib
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+import mysql.connector
+from mysql.connector import errorcode
+
+MIGRATION_FILE_RE = re.compile(r"^V(\d+)__(\w+)\.sql$")
+LOCK_NAME = "schema_migrations"
+
+SCHEMA_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+      version INT PRIMARY KEY,
+      name VARCHAR(200) NOT NULL,
+      checksum CHAR(64) NOT NULL,
+      execution_ms INT NOT NULL,
+      applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+# Errores que indican que la sentencia ya se aplicó en un intento anterior
+ALREADY_APPLIED_ERRORS = {errorcode.ER_DUP_FIELDNAME, errorcode.ER_DUP_KEYNAME}
+
+
+class MigrationError(Exception):
+    pass
+
+
+class Migration:
+    def __init__(self, version, name, path):
+        self.version = version
+        self.name = name
+        self.path = path
+        self.sql = path.read_text(encoding="utf-8")
+        self.checksum = hashlib.sha256(self.sql.encode("utf-8")).hexdigest()
+
+    def statements(self):
+        """
+        Separa el archivo en sentencias por ';'. Suficiente para DDL e INSERTs;
+        no soporta procedimientos almacenados ni ';' dentro de literales.
+        """
+        lines = [l for l in self.sql.splitlines() if not l.strip().startswith("--")]
+        return [s.strip() for s in "\n".join(lines).split(";") if s.strip()]
+
+    def __repr__(self):
+        return f"V{self.version:03d}__{self.name}"
+
+
+def load_migrations(directory):
+    migrations = {}
+    for path in sorted(Path(directory).glob("*.sql")):
+        match = MIGRATION_FILE_RE.match(path.name)
+        if not match:
+            raise MigrationError(f"Invalid migration file name: {path.name}")
+        version = int(match.group(1))
+        if version in migrations:
+            raise MigrationError(f"Duplicate migration version {version}: {path.name}")
+        migrations[version] = Migration(version, match.group(2), path)
+    return [migrations[v] for v in sorted(migrations)]
+
+
+def connect_with_retry(retries=30, delay=2):
+    """MySQL puede tardar en aceptar conexiones cuando el Job arranca junto al pod de la BD."""
+    for attempt in range(1, retries + 1):
+        try:
+            return mysql.connector.connect(
+                host=os.environ.get("DB_HOST", "mysql"),
+                user=os.environ.get("DB_USER", "myapp_user"),
+                password=os.environ.get("DB_PASSWORD", "mypassword"),
+                database=os.environ.get("DB_NAME", "myapp_db"),
+            )
+        except mysql.connector.Error as e:
+            if attempt == retries:
+                raise
+            print(f"⏳ MySQL not ready ({e}), retrying in {delay}s [{attempt}/{retries}]")
+            time.sleep(delay)
+
+
+def applied_migrations(cursor):
+    cursor.execute(SCHEMA_TABLE_SQL)
+    cursor.execute("SELECT version, checksum FROM schema_migrations")
+    return dict(cursor.fetchall())
+
+
+def apply_migration(conn, cursor, migration):
+    start = time.monotonic()
+    for statement in migration.statements():
+        try:
+            cursor.execute(statement)
+        except mysql.connector.Error as e:
+            if e.errno not in ALREADY_APPLIED_ERRORS:
+                raise
+            print(f"   ↪ already applied, skipping: {e.msg}")
+    elapsed_ms = int((time.monotonic() - start) * 1000)
+    cursor.execute(
+        "INSERT INTO schema_migrations (version, name, checksum, execution_ms) VALUES (%s, %s, %s, %s)",
+        (migration.version, migration.name, migration.checksum, elapsed_ms)
+    )
+    conn.commit()
+    return elapsed_ms
+
+
+def migrate(conn, migrations, dry_run=False, lock_timeout=60):
+    """Aplica las migraciones pendientes. Devuelve la lista de migraciones aplicadas (o pendientes en dry-run)."""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT GET_LOCK(%s, %s)", (LOCK_NAME, lock_timeout))
+        if cursor.fetchone()[0] != 1:
+            raise MigrationError(f"Could not acquire migration lock within {lock_timeout}s")
+        try:
+            applied = applied_migrations(cursor)
+            pending = []
+            for migration in migrations:
+                checksum = applied.get(migration.version)
+                if checksum is None:
+                    pending.append(migration)
+                elif checksum != migration.checksum:
+                    raise MigrationError(
+                        f"{migration!r} was modified after being applied "
+                        f"(recorded {checksum[:12]}, found {migration.checksum[:12]})"
+                    )
+
+            for migration in pending:
+                if dry_run:
+                    print(f"• pending: {migration!r}")
+                    continue
+                print(f"▶ applying {migration!r}")
+                elapsed_ms = apply_migration(conn, cursor, migration)
+                print(f"✅ {migration!r} applied in {elapsed_ms} ms")
+            return pending
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+            cursor.fetchall()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aplica las migraciones SQL pendientes.")
+    parser.add_argument("--dir", default=os.environ.get("MIGRATIONS_DIR", "/migrations"),
+                        help="Directorio con los archivos V<version>__<nombre>.sql")
+    parser.add_argument("--dry-run", action="store_true", help="Sólo lista las migraciones pendientes")
+    args = parser.parse_args(argv)
+
+    try:
+        migrations = load_migrations(args.dir)
+        conn = connect_with_retry()
+        try:
+            pending = migrate(conn, migrations, dry_run=args.dry_run)
+        finally:
+            conn.close()
+    except (MigrationError, mysql.connector.Error) as e:
+        print(f"❌ Migration failed: {e}")
+        return 1
+
+    if not pending:
+        print("✅ Schema is up to date")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
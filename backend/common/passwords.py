@@ -0,0 +1,145 @@
+"""
+Hash de contraseñas con argon2id en un pool de procesos acotado.
+
+argon2 es deliberadamente caro en CPU y memoria; calcularlo en el hilo del
+request bloquearía el worker de gunicorn (y con el GIL, a sus otros hilos).
+Aquí se ejecuta en un ProcessPoolExecutor propio de cada worker, creado de
+forma perezosa tras el fork, con un máximo de trabajos pendientes: si se
+llena, `hash_password` / `verify_password` lanzan HashingBusyError (-> 503).
+
+Variables de entorno:
+    PASSWORD_HASH_PROCESSES    procesos del pool por worker (por defecto 2)
+    PASSWORD_HASH_MAX_PENDING  trabajos en cola + en curso antes de rechazar (por defecto 32)
+    PASSWORD_HASH_WAIT         segundos de espera por un hueco en la cola (por defecto 2)
+    PASSWORD_TIME_COST         iteraciones de argon2 (por defecto 2)
+    PASSWORD_MEMORY_COST       memoria de argon2 en KiB (por defecto 19456 = 19 MiB)
+    PASSWORD_PARALLELISM       hilos de argon2 por hash (por defecto 1)
+
+Las filas antiguas guardan la contraseña en claro: `verify_password` las acepta
+y devuelve el hash con el que reemplazarlas (también cuando cambian los costes).
+"""
+import hmac
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+
+HASH_PREFIX = "$argon2"
+
+HASH_PARAMS = {
+    "time_cost": int(os.environ.get("PASSWORD_TIME_COST", 2)),
+    "memory_cost": int(os.environ.get("PASSWORD_MEMORY_COST", 19456)),
+    "parallelism": int(os.environ.get("PASSWORD_PARALLELISM", 1)),
+}
+POOL_PROCESSES = int(os.environ.get("PASSWORD_HASH_PROCESSES", 2))
+MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", 32))
+PENDING_WAIT = float(os.environ.get("PASSWORD_HASH_WAIT", 2))
+
+
+class HashingBusyError(Exception):
+    """El pool de hashing tiene la cola llena."""
+
+
+# ----------------------------------------------------------------------
+# Funciones que corren dentro de los procesos del pool
+# ----------------------------------------------------------------------
+_hasher = None
+
+
+def _get_hasher():
+    global _hasher
+    if _hasher is None:
+        _hasher = PasswordHasher(**HASH_PARAMS)
+    return _hasher
+
+
+def _hash(password):
+    return _get_hasher().hash(password)
+
+
+def _verify(stored, password):
+    """(válida, hash nuevo o None)."""
+    hasher = _get_hasher()
+    if not stored.startswith(HASH_PREFIX):
+        # Fila heredada en texto plano: se migra en el primer login correcto
+        if hmac.compare_digest(stored.encode("utf-8"), password.encode("utf-8")):
+            return True, hasher.hash(password)
+        return False, None
+    try:
+        hasher.verify(stored, password)
+    except (VerificationError, InvalidHashError):
+        return False, None
+    return True, hasher.hash(password) if hasher.check_needs_rehash(stored) else None
+
+
+# ----------------------------------------------------------------------
+# Pool (uno por proceso worker)
+# ----------------------------------------------------------------------
+_executor = None
+_executor_pid = None
+_slots = threading.BoundedSemaphore(MAX_PENDING)
+_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor, _executor_pid
+    with _lock:
+        # Con preload_app el módulo se importa en el master: el pool se crea en cada worker tras el fork
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ProcessPoolExecutor(
+                max_workers=POOL_PROCESSES,
+                # forkserver: no se hace fork de un proceso con hilos (gthread)
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _run(fn, *args):
+    if not _slots.acquire(timeout=PENDING_WAIT):
+        raise HashingBusyError("Password hashing queue is full")
+    try:
+        return _get_executor().submit(fn, *args).result()
+    finally:
+        _slots.release()
+
+
+def hash_password(password):
+    return _run(_hash, password)
+
+
+def hash_passwords(passwords):
+    """Hashea una lista en paralelo en todos los procesos del pool (ocupa un único hueco de la cola)."""
+    if not passwords:
+        return []
+    if not _slots.acquire(timeout=PENDING_WAIT):
+        raise HashingBusyError("Password hashing queue is full")
+    try:
+        chunksize = max(1, len(passwords) // (POOL_PROCESSES * 4))
+        return list(_get_executor().map(_hash, passwords, chunksize=chunksize))
+    finally:
+        _slots.release()
+
+
+def verify_password(stored, password):
+    """
+    Compara `password` con el valor guardado (hash argon2 o texto plano heredado).
+    Devuelve (válida, hash nuevo o None); si hay hash nuevo hay que guardarlo.
+    """
+    return _run(_verify, stored, password)
+
+
+def warm_up():
+    """Arranca los procesos del pool y carga argon2 en cada uno (el primer login no paga el arranque)."""
+    hash_passwords(["warm-up"] * POOL_PROCESSES)
+
+
+def shutdown():
+    global _executor
+    with _lock:
+        if _executor is not None and _executor_pid == os.getpid():
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
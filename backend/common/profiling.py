@@ -0,0 +1,200 @@
+"""
+Endpoints de diagnóstico para pods en producción (desactivados por defecto).
+
+    from common.profiling import init_debug_endpoints
+    init_debug_endpoints(app)
+
+    GET /debug/profile?seconds=10&format=collapsed|top
+        Perfilador por muestreo: cada `interval` ms toma las pilas de todos los
+        hilos del worker (sys._current_frames) y las agrega. No instrumenta
+        llamadas, así que el coste es el de una lectura de pilas por muestra.
+        collapsed -> "hilo;mod:func:línea;... N", entrada de flamegraph.pl/speedscope
+        top       -> tabla estilo pstats (muestras propias y acumuladas por función)
+    GET /debug/heap?limit=25&group_by=lineno|filename|traceback&seconds=10
+        Top de sitios de asignación de tracemalloc. Si tracemalloc no está activo
+        (DEBUG_TRACEMALLOC_FRAMES=0) se activa sólo durante `seconds` y se
+        reportan las asignaciones vivas hechas en esa ventana.
+
+Sólo se registran con DEBUG_ENDPOINTS=true y un DEBUG_TOKEN no vacío, que hay
+que mandar en la cabecera X-Debug-Token. Los datos son del worker de gunicorn
+que atiende el request, no de todo el pod.
+"""
+import hmac
+import linecache
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+from flask import Response, jsonify, request
+
+PROFILE_MAX_SECONDS = float(os.environ.get("DEBUG_PROFILE_MAX_SECONDS", 30))
+PROFILE_INTERVAL_MS = float(os.environ.get("DEBUG_PROFILE_INTERVAL_MS", 10))
+TRACEMALLOC_FRAMES = int(os.environ.get("DEBUG_TRACEMALLOC_FRAMES", 0))
+
+PROFILE_FORMATS = ("collapsed", "top")
+HEAP_GROUPS = ("lineno", "filename", "traceback")
+
+# Un solo perfil/heap a la vez por worker: dos muestreadores se medirían entre sí
+_busy = threading.Lock()
+
+
+def debug_endpoints_enabled():
+    return os.environ.get("DEBUG_ENDPOINTS", "false").lower() in ("1", "true", "yes")
+
+
+def debug_token_valid():
+    """¿Trae el request en X-Debug-Token el DEBUG_TOKEN del despliegue? Sin DEBUG_TOKEN, nunca."""
+    token = os.environ.get("DEBUG_TOKEN", "")
+    # En bytes: con str, compare_digest lanza TypeError (500) si la cabecera trae algo no ASCII
+    return bool(token) and hmac.compare_digest(request.headers.get("X-Debug-Token", "").encode(), token.encode())
+
+
+def _frame_label(code, lineno):
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{code.co_name}:{lineno}"
+
+
+def sample_stacks(seconds, interval=PROFILE_INTERVAL_MS / 1000):
+    """
+    Muestrea las pilas de todos los hilos (salvo el que llama) durante `seconds`.
+    Devuelve (Counter de pilas -> muestras, número de muestras). Cada pila es una
+    tupla de (hilo, *frames) con el frame más externo primero.
+    """
+    me = threading.get_ident()
+    stacks = Counter()
+    samples = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code, frame.f_lineno))
+                frame = frame.f_back
+            stacks[(names.get(ident, str(ident)), *reversed(stack))] += 1
+        samples += 1
+        time.sleep(interval)
+    return stacks, samples
+
+
+def collapsed_output(stacks):
+    return "".join(f"{';'.join(stack)} {count}\n" for stack, count in stacks.most_common())
+
+
+def top_output(stacks, samples, limit=40):
+    """Tabla estilo pstats: muestras en la propia función y en la función o sus llamadas."""
+    own, cumulative = Counter(), Counter()
+    for stack, count in stacks.items():
+        frames = stack[1:]
+        if not frames:
+            continue
+        own[frames[-1]] += count
+        for frame in set(frames):
+            cumulative[frame] += count
+    total = sum(stacks.values()) or 1
+    lines = [f"{samples} muestras, {total} pilas de hilo\n",
+             f"{'own':>8} {'own%':>7} {'cum':>8} {'cum%':>7}  función\n"]
+    for frame, cum in cumulative.most_common(limit):
+        lines.append(f"{own[frame]:>8} {own[frame] / total:>7.1%} {cum:>8} {cum / total:>7.1%}  {frame}\n")
+    return "".join(lines)
+
+
+def heap_top(snapshot, group_by, limit):
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, linecache.__file__),
+        tracemalloc.Filter(False, __file__),
+    ))
+    stats = snapshot.statistics(group_by)
+    return {
+        "total_bytes": sum(s.size for s in stats),
+        "top": [
+            {
+                "site": [f"{f.filename}:{f.lineno}" for f in s.traceback],
+                "size_bytes": s.size,
+                "count": s.count,
+            }
+            for s in stats[:limit]
+        ],
+    }
+
+
+def init_debug_endpoints(app):
+    """Registra /debug/profile y /debug/heap si el despliegue los habilita."""
+    if not debug_endpoints_enabled():
+        return False
+    token = os.environ.get("DEBUG_TOKEN", "")
+    if not token:
+        print("⚠️ DEBUG_ENDPOINTS activo sin DEBUG_TOKEN: no se registran /debug/*")
+        return False
+    if TRACEMALLOC_FRAMES > 0 and not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+
+    def window_seconds(default):
+        try:
+            seconds = float(request.args.get("seconds", default))
+        except ValueError:
+            return None
+        return seconds if 0 < seconds <= PROFILE_MAX_SECONDS else None
+
+    @app.route("/debug/profile", methods=["GET"])
+    def debug_profile():
+        if not debug_token_valid():
+            return jsonify({"error": "Forbidden"}), 403
+        seconds = window_seconds(10)
+        fmt = request.args.get("format", "collapsed")
+        if seconds is None or fmt not in PROFILE_FORMATS:
+            return jsonify({"error": f"seconds must be in (0, {PROFILE_MAX_SECONDS:g}] "
+                                     f"and format one of {', '.join(PROFILE_FORMATS)}"}), 400
+        if not _busy.acquire(blocking=False):
+            return jsonify({"error": "Another profile is running in this worker"}), 409
+        try:
+            stacks, samples = sample_stacks(seconds)
+        finally:
+            _busy.release()
+        body = collapsed_output(stacks) if fmt == "collapsed" else top_output(stacks, samples)
+        return Response(body, mimetype="text/plain", headers={"X-Profile-Samples": str(samples),
+                                                               "X-Profile-Pid": str(os.getpid())})
+
+    @app.route("/debug/heap", methods=["GET"])
+    def debug_heap():
+        if not debug_token_valid():
+            return jsonify({"error": "Forbidden"}), 403
+        group_by = request.args.get("group_by", "lineno")
+        limit = request.args.get("limit", 25, type=int)
+        seconds = window_seconds(10)
+        if group_by not in HEAP_GROUPS or seconds is None or not 0 < limit <= 500:
+            return jsonify({"error": f"group_by must be one of {', '.join(HEAP_GROUPS)}, "
+                                     f"limit in (0, 500] and seconds in (0, {PROFILE_MAX_SECONDS:g}]"}), 400
+        if not _busy.acquire(blocking=False):
+            return jsonify({"error": "Another profile is running in this worker"}), 409
+        try:
+            if tracemalloc.is_tracing():
+                window, snapshot = None, tracemalloc.take_snapshot()
+            else:
+                # Traza sólo durante la ventana: fuera de ella tracemalloc no cuesta nada
+                tracemalloc.start(max(TRACEMALLOC_FRAMES, 10))
+                try:
+                    time.sleep(seconds)
+                    window, snapshot = seconds, tracemalloc.take_snapshot()
+                finally:
+                    tracemalloc.stop()
+        finally:
+            _busy.release()
+        traced_current, traced_peak = (tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (None, None))
+        return jsonify({
+            "pid": os.getpid(),
+            "window_seconds": window,
+            "group_by": group_by,
+            "traced_current_bytes": traced_current,
+            "traced_peak_bytes": traced_peak,
+            **heap_top(snapshot, group_by, limit),
+        })
+
+    print("⚠️ Endpoints de diagnóstico /debug/profile y /debug/heap habilitados")
+    return True
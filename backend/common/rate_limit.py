@@ -0,0 +1,150 @@
+"""
+Limitador token bucket, con estado en proceso o compartido entre réplicas.
+
+Cada clave (p. ej. "login:email:ana@x.com") tiene un cubo de `burst` fichas que
+se rellena a `rate` fichas por segundo. `check()` sólo mira si queda al menos
+una ficha (no gasta) y `hit()` gasta una; así un servicio puede rechazar un
+request antes de tocar la base de datos y cobrar sólo los intentos fallidos.
+
+Backends (RATE_LIMIT_BACKEND):
+  memory  cubos en un dict del proceso (por defecto). Con N réplicas el límite
+          efectivo es N veces el configurado. También sirve de doble en pruebas.
+  redis   cubos en Redis (RATE_LIMIT_REDIS_URL), actualizados con un script Lua
+          atómico: el límite se cumple entre todas las réplicas del HPA.
+"""
+import math
+import os
+import threading
+import time
+
+
+class MemoryBucketStore:
+    """Cubos en memoria del proceso. Thread-safe."""
+
+    def __init__(self, max_keys=100_000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets = {}  # key -> (tokens, last_refill, rate, burst)
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst, cost):
+        """
+        Rellena el cubo y gasta `cost` fichas si hay suficientes (cost=0: sólo consulta
+        si queda al menos una). Devuelve (permitido, segundos hasta la próxima ficha).
+        """
+        now = self.clock()
+        with self._lock:
+            tokens, last, _, _ = self._buckets.get(key, (burst, now, rate, burst))
+            tokens = min(burst, tokens + (now - last) * rate)
+            needed = max(cost, 1)
+            allowed = tokens >= needed
+            if allowed:
+                tokens -= cost
+            if tokens < burst:
+                self._buckets[key] = (tokens, now, rate, burst)
+                if len(self._buckets) > self.max_keys:
+                    self._purge(now)
+            else:
+                # Un cubo lleno equivale a uno inexistente: no hace falta guardarlo
+                self._buckets.pop(key, None)
+        return allowed, 0.0 if allowed else (needed - tokens) / rate
+
+    def _purge(self, now):
+        # Descarta los cubos que ya se habrían rellenado del todo
+        full = [k for k, (tokens, last, rate, burst) in self._buckets.items() if tokens + (now - last) * rate >= burst]
+        for k in full:
+            del self._buckets[k]
+
+    def stats(self):
+        with self._lock:
+            return {"backend": "memory", "keys": len(self._buckets)}
+
+
+# KEYS[1] = clave; ARGV = rate, burst, cost. Usa el reloj de Redis: no depende
+# de que los relojes de las réplicas estén sincronizados.
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local last = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + (now - last) * rate)
+local needed = math.max(cost, 1)
+local allowed = 0
+if tokens >= needed then
+  tokens = tokens - cost
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+local retry_after = 0
+if allowed == 0 then retry_after = (needed - tokens) / rate end
+return {allowed, tostring(retry_after)}
+"""
+
+
+class RedisBucketStore:
+    """Cubos compartidos en Redis. Requiere el paquete `redis`."""
+
+    def __init__(self, url):
+        import redis  # dependencia opcional: sólo con RATE_LIMIT_BACKEND=redis
+
+        self._errors = (redis.RedisError, OSError)
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._take = self.client.register_script(_TAKE_SCRIPT)
+
+    def take(self, key, rate, burst, cost):
+        try:
+            allowed, retry_after = self._take(keys=[key], args=[rate, burst, cost])
+        except self._errors as e:
+            # Si Redis no responde se deja pasar: el limitador no debe tumbar el login
+            print(f"⚠️  Rate limit backend unavailable: {e}")
+            return True, 0.0
+        return bool(allowed), float(retry_after)
+
+    def stats(self):
+        return {"backend": "redis"}
+
+
+def bucket_store_from_env():
+    backend = os.environ.get("RATE_LIMIT_BACKEND", "memory").lower()
+    if backend == "redis":
+        return RedisBucketStore(os.environ.get("RATE_LIMIT_REDIS_URL", "redis://redis:6379/0"))
+    if backend != "memory":
+        raise ValueError("RATE_LIMIT_BACKEND must be one of: memory, redis")
+    return MemoryBucketStore()
+
+
+class TokenBucketLimiter:
+    """`burst` intentos seguidos por clave, recuperando `rate` por segundo."""
+
+    def __init__(self, store, *, name, rate, burst):
+        self.store = store
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.rejected = 0
+
+    def _key(self, key):
+        return f"ratelimit:{self.name}:{key}"
+
+    def check(self, key):
+        """(permitido, retry_after) sin gastar fichas."""
+        allowed, retry_after = self.store.take(self._key(key), self.rate, self.burst, 0)
+        if not allowed:
+            self.rejected += 1
+        return allowed, retry_after
+
+    def hit(self, key):
+        """Gasta una ficha. Devuelve (permitido, retry_after) como check()."""
+        return self.store.take(self._key(key), self.rate, self.burst, 1)
+
+    def stats(self):
+        return {"rate": self.rate, "burst": self.burst, "rejected": self.rejected}
+
+
+def retry_after_header(seconds):
+    return str(max(1, math.ceil(seconds)))
@@ -0,0 +1,206 @@
+"""
+Slow query log a nivel de aplicación, servido en GET /db/slow-queries.
+
+    from common.slow_queries import init_slow_query_log
+    init_slow_query_log(app)
+
+Cada `cursor.execute` de los handlers pasa por el TimedCursor de common/db_pool
+(y por common.async_db_pool.execute en las rutas ASGI). Aquí se agrupa por
+huella (SQL normalizado: literales y listas IN -> ?) con llamadas, tiempo total,
+medio y máximo. Las huellas se guardan en un dict acotado (SLOW_QUERY_MAX_FINGERPRINTS);
+si se llena se descarta la de menor tiempo total.
+
+Una sentencia SELECT/UPDATE/DELETE que supera SLOW_QUERY_THRESHOLD_MS se registra
+en el log y, la primera vez, se le hace un EXPLAIN con los mismos parámetros en un
+hilo aparte (EXPLAIN no ejecuta la sentencia). El plan se guarda junto a la huella
+para ver de un vistazo `type: ALL` / `key: null`, es decir, índices que faltan.
+
+Las estadísticas son del worker de gunicorn que atiende el request. El endpoint
+expone SQL y planes, así que exige la cabecera X-Debug-Token como /debug/*
+(common/profiling.py); sin DEBUG_TOKEN en el despliegue responde siempre 403.
+"""
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import mysql.connector
+
+from common import db_pool
+
+EXPLAINABLE = ("SELECT", "UPDATE", "DELETE")
+SORT_KEYS = ("total_ms", "mean_ms", "max_ms", "calls")
+
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_RE = re.compile(r"%\(\w+\)s|%s|\?")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_RE = re.compile(r"(VALUES\s*\(\?\+?\))(?:\s*,\s*\(\?\+?\))+", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql):
+    """'SELECT * FROM employees WHERE id IN (%s, %s)' -> 'SELECT * FROM employees WHERE id IN (?+)'."""
+    if isinstance(sql, (bytes, bytearray)):
+        sql = sql.decode("utf-8", "replace")
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _PLACEHOLDER_RE.sub("?", sql)
+    sql = _SPACE_RE.sub(" ", sql).strip()
+    sql = _IN_LIST_RE.sub("(?+)", sql)
+    return _VALUES_RE.sub(r"\1, ...", sql)
+
+
+class _QueryStats:
+    __slots__ = ("calls", "errors", "total", "max", "slow", "explain", "explain_state", "last_slow_at")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.slow = 0
+        self.explain = None
+        self.explain_state = None  # None | "pending" | "done" | "failed"
+        self.last_slow_at = None
+
+
+class SlowQueryLog:
+    def __init__(self, *, threshold=0.1, max_fingerprints=500, explain=True, connect=None):
+        self.threshold = threshold
+        self.max_fingerprints = max_fingerprints
+        self.explain_enabled = explain
+        # Conexión para los EXPLAIN: por defecto del mismo pool, con timeout corto
+        self._connect = connect or (lambda: db_pool.get_pool().get_connection(timeout=1))
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._explainer = None
+        self._explainer_pid = None
+        self.evicted = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            threshold=float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", 100)) / 1000,
+            max_fingerprints=int(os.environ.get("SLOW_QUERY_MAX_FINGERPRINTS", 500)),
+            explain=os.environ.get("SLOW_QUERY_EXPLAIN", "true").lower() == "true",
+        )
+
+    def observe(self, sql, params, seconds, error):
+        """Observador para db_pool.query_observers."""
+        key = fingerprint(sql)
+        if key.upper().startswith("EXPLAIN"):
+            return
+        slow = seconds >= self.threshold
+        explain = False
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    del self._stats[min(self._stats, key=lambda k: self._stats[k].total)]
+                    self.evicted += 1
+                stats = self._stats[key] = _QueryStats()
+            stats.calls += 1
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+            if error is not None:
+                stats.errors += 1
+            if slow:
+                stats.slow += 1
+                stats.last_slow_at = time.time()
+                if (self.explain_enabled and error is None and stats.explain_state is None
+                        and key.split(None, 1)[0].upper() in EXPLAINABLE):
+                    stats.explain_state = "pending"
+                    explain = True
+        if slow:
+            print(f"⚠️ Slow query ({seconds * 1000:.1f} ms): {key}")
+        if explain:
+            self._executor().submit(self._capture_explain, key, sql, params)
+
+    def _executor(self):
+        # Un hilo por worker, creado tras el fork de gunicorn
+        if self._explainer_pid != os.getpid():
+            with self._lock:
+                if self._explainer_pid != os.getpid():
+                    self._explainer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+                    self._explainer_pid = os.getpid()
+        return self._explainer
+
+    def _capture_explain(self, key, sql, params):
+        plan, state = None, "done"
+        try:
+            conn = self._connect()
+            try:
+                with conn.cursor(dictionary=True) as cursor:
+                    cursor.execute(f"EXPLAIN {sql}", params)
+                    plan = cursor.fetchall()
+            finally:
+                conn.close()
+        except (mysql.connector.Error, db_pool.PoolExhaustedError) as e:
+            # Se reintenta en la próxima ejecución lenta
+            print(f"⚠️ EXPLAIN failed for slow query: {e}")
+            state = None
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is not None:
+                stats.explain, stats.explain_state = plan, state
+
+    def report(self, limit=20, sort="total_ms"):
+        with self._lock:
+            rows = [
+                {
+                    "fingerprint": key,
+                    "calls": s.calls,
+                    "errors": s.errors,
+                    "slow_calls": s.slow,
+                    "total_ms": round(s.total * 1000, 3),
+                    "mean_ms": round(s.total / s.calls * 1000, 3),
+                    "max_ms": round(s.max * 1000, 3),
+                    "last_slow_at": s.last_slow_at,
+                    "explain": s.explain,
+                }
+                for key, s in self._stats.items()
+            ]
+            tracked, evicted = len(self._stats), self.evicted
+        rows.sort(key=lambda r: r[sort], reverse=True)
+        return {
+            "pid": os.getpid(),
+            "threshold_ms": self.threshold * 1000,
+            "fingerprints": tracked,
+            "evicted": evicted,
+            "queries": rows[:limit],
+        }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.evicted = 0
+
+
+def init_slow_query_log(app):
+    """Registra el observador y GET/DELETE /db/slow-queries?limit=20&sort=total_ms|mean_ms|max_ms|calls."""
+    from flask import jsonify, request
+
+    from common.profiling import debug_token_valid
+
+    slow_log = SlowQueryLog.from_env()
+    db_pool.query_observers.append(slow_log.observe)
+    app.extensions["slow_query_log"] = slow_log
+
+    @app.route("/db/slow-queries", methods=["GET", "DELETE"])
+    def slow_queries():
+        if not debug_token_valid():
+            return jsonify({"error": "Forbidden"}), 403
+        if request.method == "DELETE":
+            slow_log.reset()
+            return jsonify({"message": "Slow query stats reset"})
+        sort = request.args.get("sort", "total_ms")
+        limit = request.args.get("limit", 20, type=int)
+        if sort not in SORT_KEYS or limit < 1:
+            return jsonify({"error": f"sort must be one of {', '.join(SORT_KEYS)} and limit >= 1"}), 400
+        return jsonify(slow_log.report(limit, sort))
+
+    return slow_log
@@ -0,0 +1,517 @@
+"""
+Trazas distribuidas con propagación W3C Trace Context (cabecera `traceparent`).
+
+    from common.tracing import init_tracing
+    init_tracing(app, "mscv-employee")
+
+NGINX (frontend/nginx.conf) crea o reenvía el `traceparent` y decide el muestreo
+en el borde; cada servicio Flask abre un span de servidor por request como hijo
+de ese contexto y, dentro de él, un span por checkout del pool de MySQL
+(`db.checkout`) y otro por `cursor.execute` (`db.query`), ambos a través de los
+observadores de common/db_pool. La respuesta lleva `X-Trace-Id`.
+
+Exportadores (TRACING_EXPORTER):
+    off   (por defecto) no se registra nada: coste cero
+    file  una línea JSON por span en TRACING_FILE (todos los workers añaden al mismo fichero)
+    http  lotes JSON por POST a TRACING_ENDPOINT (p. ej. el colector de abajo)
+
+Los spans se encolan y un hilo por worker los exporta en lotes: el request no
+espera a disco ni a red, y si la cola se llena se descartan (ver dropped_spans).
+
+En las respuestas en streaming (p. ej. /employees/export) el body se genera
+después de teardown_request: el span del request sigue siendo el actual mientras
+se itera y se cierra cuando el servidor cierra la respuesta, así que las
+db.query del generador cuelgan de él.
+
+Colector local y vista en cascada:
+    python -m common.tracing collect --port 4318 --out spans.jsonl
+    python -m common.tracing view spans.jsonl [--trace <trace_id>]
+"""
+import argparse
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from common import db_pool
+
+TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+EXPORTERS = ("off", "file", "http")
+
+_current_span = ContextVar("current_span", default=None)
+
+
+class Span:
+    __slots__ = ("tracer", "trace_id", "span_id", "parent_id", "name", "kind",
+                 "start", "end", "attributes", "error", "sampled")
+
+    def __init__(self, tracer, name, *, trace_id, parent_id, sampled, kind="internal", start=None, attributes=None):
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start = time.time() if start is None else start
+        self.end = None
+        self.attributes = dict(attributes or {})
+        self.error = None
+        self.sampled = sampled
+
+    @property
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def finish(self, error=None, end=None):
+        if self.end is not None:
+            return
+        self.end = time.time() if end is None else end
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        if self.sampled:
+            self.tracer.exporter.export(self.to_dict())
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "service": self.tracer.service,
+            "name": self.name,
+            "kind": self.kind,
+            "start": round(self.start, 6),
+            "duration_ms": round((self.end - self.start) * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+# ----------------------------------------------------------------------
+# Exportadores
+# ----------------------------------------------------------------------
+class BatchExporter(ABC):
+    """
+    Cola acotada + hilo de exportación, creado perezosamente en cada proceso (gunicorn
+    hace fork). Las subclases implementan write(batch) con el destino de los spans.
+    """
+
+    def __init__(self, *, queue_size=10_000, batch_size=256, flush_interval=1.0):
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pid = None
+        self._queue = None
+        self._lock = threading.Lock()
+        self.exported = 0
+        self.dropped = 0
+
+    def _ensure_worker(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self.queue_size)
+                threading.Thread(target=self._run, name="span-exporter", daemon=True).start()
+                self._pid = os.getpid()
+
+    def export(self, span):
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        q = self._queue
+        while True:
+            batch = [q.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(q.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self.write(batch)
+                self.exported += len(batch)
+            except Exception as e:
+                self.dropped += len(batch)
+                print(f"⚠️ No se pudieron exportar {len(batch)} spans: {e}")
+
+    @abstractmethod
+    def write(self, batch):
+        """Envía una lista de spans (dicts); una excepción cuenta el lote como descartado."""
+
+
+class NullExporter:
+    exported = dropped = 0
+
+    def export(self, span):
+        pass
+
+
+class FileExporter(BatchExporter):
+    def __init__(self, path, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+
+    def write(self, batch):
+        data = "".join(json.dumps(span, separators=(",", ":")) + "\n" for span in batch)
+        # O_APPEND: las líneas de varios workers no se pisan
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+
+
+class HttpExporter(BatchExporter):
+    def __init__(self, endpoint, timeout=2.0, **kwargs):
+        super().__init__(**kwargs)
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def write(self, batch):
+        body = json.dumps({"spans": batch}).encode("utf-8")
+        req = urllib.request.Request(self.endpoint, data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            resp.read()
+
+
+def exporter_from_env():
+    kind = os.environ.get("TRACING_EXPORTER", "off").lower()
+    if kind not in EXPORTERS:
+        raise ValueError(f"TRACING_EXPORTER must be one of {', '.join(EXPORTERS)}, got {kind!r}")
+    queue_size = int(os.environ.get("TRACING_QUEUE_SIZE", 10_000))
+    if kind == "file":
+        return FileExporter(os.environ.get("TRACING_FILE", "/tmp/spans.jsonl"), queue_size=queue_size)
+    if kind == "http":
+        return HttpExporter(os.environ.get("TRACING_ENDPOINT", "http://trace-collector:4318/spans"),
+                            queue_size=queue_size)
+    return NullExporter()
+
+
+# ----------------------------------------------------------------------
+# Tracer
+# ----------------------------------------------------------------------
+class Tracer:
+    def __init__(self, service, exporter, sample_ratio=0.1):
+        self.service = service
+        self.exporter = exporter
+        self.sample_ratio = sample_ratio
+
+    @property
+    def enabled(self):
+        return not isinstance(self.exporter, NullExporter)
+
+    def start_server_span(self, name, traceparent=None, attributes=None):
+        """Span raíz del request: hijo del `traceparent` entrante o inicio de una traza nueva."""
+        match = TRACEPARENT_RE.match(traceparent or "")
+        if match and match.group(1) != "0" * 32:
+            trace_id, parent_id = match.group(1), match.group(2)
+            sampled = int(match.group(3), 16) & 1 == 1
+        else:
+            # Sin contexto (llamada directa al pod, sin NGINX): decide el servicio
+            trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+            sampled = random.random() < self.sample_ratio
+        return Span(self, name, trace_id=trace_id, parent_id=parent_id, sampled=sampled,
+                    kind="server", attributes=attributes)
+
+    def start_span(self, name, *, parent=None, start=None, attributes=None):
+        parent = parent or _current_span.get()
+        if parent is None:
+            return None
+        return Span(self, name, trace_id=parent.trace_id, parent_id=parent.span_id, sampled=parent.sampled,
+                    start=start, attributes=attributes)
+
+    @contextmanager
+    def span(self, name, **attributes):
+        span = self.start_span(name, attributes=attributes)
+        if span is None:
+            yield None
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.finish(error=e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.finish()
+
+    def record_span(self, name, seconds, error=None, **attributes):
+        """Span hijo del actual que ya terminó (los observadores sólo conocen la duración)."""
+        end = time.time()
+        span = self.start_span(name, start=end - seconds, attributes=attributes)
+        if span is not None:
+            span.finish(error=error, end=end)
+
+    def stats(self):
+        return {
+            "service": self.service,
+            "exporter": type(self.exporter).__name__,
+            "sample_ratio": self.sample_ratio,
+            "exported_spans": self.exporter.exported,
+            "dropped_spans": self.exporter.dropped,
+        }
+
+
+def current_span():
+    return _current_span.get()
+
+
+def _query_attributes(sql):
+    if isinstance(sql, (bytes, bytearray)):
+        sql = sql.decode("utf-8", "replace")
+    # Sólo la sentencia con placeholders: los valores no salen del servicio
+    return {"db.system": "mysql", "db.statement": " ".join(sql.split())[:500]}
+
+
+def _iter_in_span(iterable, span):
+    """Itera el body de una respuesta en streaming con `span` como span actual en cada chunk."""
+    iterator = iter(iterable)
+    try:
+        while True:
+            token = _current_span.set(span)
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                _current_span.reset(token)
+            yield chunk
+    finally:
+        if hasattr(iterator, "close"):
+            iterator.close()
+
+
+def init_tracing(app, service):
+    """Spans por request, checkout del pool y consulta. No hace nada con TRACING_EXPORTER=off."""
+    tracer = Tracer(
+        os.environ.get("TRACING_SERVICE_NAME", service),
+        exporter_from_env(),
+        sample_ratio=float(os.environ.get("TRACING_SAMPLE_RATIO", 0.1)),
+    )
+    app.extensions["tracer"] = tracer
+    if not tracer.enabled:
+        return tracer
+
+    from flask import g, jsonify, request
+
+    def observe_checkout(seconds, error):
+        tracer.record_span("db.checkout", seconds, error)
+
+    def observe_query(sql, params, seconds, error):
+        tracer.record_span("db.query", seconds, error, **_query_attributes(sql))
+
+    db_pool.checkout_observers.append(observe_checkout)
+    db_pool.query_observers.append(observe_query)
+
+    @app.before_request
+    def start_request_span():
+        route = request.url_rule.rule if request.url_rule is not None else request.path
+        span = tracer.start_server_span(
+            f"{request.method} {route}",
+            request.headers.get("traceparent"),
+            {"http.method": request.method, "http.route": route, "http.target": request.full_path.rstrip("?")},
+        )
+        g._trace = (span, _current_span.set(span))
+
+    @app.after_request
+    def tag_response(response):
+        trace = g.get("_trace")
+        if trace is not None:
+            span = trace[0]
+            span.set_attribute("http.status_code", response.status_code)
+            response.headers["X-Trace-Id"] = span.trace_id
+            if response.is_streamed:
+                # El body se genera tras el teardown: el span se cierra con la respuesta
+                g._trace_streamed = True
+                response.response = _iter_in_span(response.response, span)
+                response.call_on_close(span.finish)
+        return response
+
+    @app.teardown_request
+    def finish_request_span(exc):
+        trace = g.pop("_trace", None)
+        if trace is None:
+            return
+        span, token = trace
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            _current_span.set(None)
+        if exc is not None or not g.pop("_trace_streamed", False):
+            span.finish(error=exc)
+
+    @app.route("/tracing/stats", methods=["GET"])
+    def tracing_stats():
+        return jsonify(tracer.stats())
+
+    return tracer
+
+
+class TracingASGIMiddleware:
+    """
+    Span de servidor para las rutas Starlette de un app ASGI (mscv-employee/asgi_app.py).
+    Las rutas montadas (la app Flask de fondo) ya las traza init_tracing.
+    """
+
+    def __init__(self, app, tracer, routes):
+        self.app = app
+        self.tracer = tracer
+        self.routes = routes
+
+    def _route_for(self, scope):
+        from starlette.routing import Match, Mount
+
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return None if isinstance(route, Mount) else route.path
+        return scope["path"]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.tracer.enabled:
+            return await self.app(scope, receive, send)
+        route = self._route_for(scope)
+        if route is None:
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers", []))
+        span = self.tracer.start_server_span(
+            f"{scope['method']} {route}",
+            headers.get(b"traceparent", b"").decode("latin-1"),
+            {"http.method": scope["method"], "http.route": route, "http.target": scope["path"]},
+        )
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.status_code", message["status"])
+                message["headers"] = [*message.get("headers", []), (b"x-trace-id", span.trace_id.encode())]
+            await send(message)
+
+        token = _current_span.set(span)
+        error = None
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            _current_span.reset(token)
+            span.finish(error=error)
+
+
+# ----------------------------------------------------------------------
+# Colector local (stand-in) y vista en cascada
+# ----------------------------------------------------------------------
+def collect(port, out):
+    """Servidor HTTP mínimo que recibe los lotes de HttpExporter y los añade a `out`."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                spans = json.loads(self.rfile.read(length))["spans"]
+            except (ValueError, KeyError):
+                self.send_response(400)
+                self.end_headers()
+                return
+            with lock, open(out, "a", encoding="utf-8") as f:
+                for span in spans:
+                    f.write(json.dumps(span, separators=(",", ":")) + "\n")
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    print(f"✅ Colector de spans en :{port} -> {out}")
+    ThreadingHTTPServer(("0.0.0.0", port), Handler).serve_forever()
+
+
+def load_spans(path):
+    traces = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                span = json.loads(line)
+                traces.setdefault(span["trace_id"], []).append(span)
+    return traces
+
+
+def waterfall(spans, width=60):
+    """Líneas de texto con los spans de una traza en cascada (padres antes que hijos)."""
+    by_parent = {}
+    ids = {s["span_id"] for s in spans}
+    for span in spans:
+        parent = span["parent_id"] if span["parent_id"] in ids else None
+        by_parent.setdefault(parent, []).append(span)
+    t0 = min(s["start"] for s in spans)
+    total = max(s["start"] - t0 + s["duration_ms"] / 1000 for s in spans) or 1e-9
+
+    lines = []
+
+    def walk(parent, depth):
+        for span in sorted(by_parent.get(parent, []), key=lambda s: s["start"]):
+            offset = (span["start"] - t0) / total
+            length = span["duration_ms"] / 1000 / total
+            begin = int(offset * width)
+            bar = " " * begin + "█" * max(1, int(length * width))
+            label = f"{'  ' * depth}{span['service']} {span['name']}"
+            flag = " ❌" if span.get("error") else ""
+            lines.append(f"{label[:48]:<48} {span['duration_ms']:>9.2f}ms |{bar[:width]:<{width}}|{flag}")
+            walk(span["span_id"], depth + 1)
+
+    walk(None, 0)
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Colector y visor de spans de common.tracing")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_collect = sub.add_parser("collect", help="recibe spans por HTTP y los guarda en JSONL")
+    p_collect.add_argument("--port", type=int, default=4318)
+    p_collect.add_argument("--out", default="spans.jsonl")
+    p_view = sub.add_parser("view", help="muestra las trazas de un fichero JSONL en cascada")
+    p_view.add_argument("file")
+    p_view.add_argument("--trace", help="trace id (por defecto las 10 trazas más lentas)")
+    p_view.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    if args.command == "collect":
+        collect(args.port, args.out)
+        return 0
+
+    traces = load_spans(args.file)
+    if args.trace:
+        selected = [args.trace] if args.trace in traces else []
+    else:
+        duration = lambda spans: max(s["duration_ms"] for s in spans)  # noqa: E731
+        selected = sorted(traces, key=lambda t: duration(traces[t]), reverse=True)[:args.limit]
+    if not selected:
+        print("⚠️ No hay trazas que mostrar")
+        return 1
+    for trace_id in selected:
+        print(f"\ntrace {trace_id}")
+        print("\n".join(waterfall(traces[trace_id])))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
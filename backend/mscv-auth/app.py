@@ -1,18 +1,130 @@
 from flask import Flask, jsonify, request
 import mysql.connector
 from flask_cors import CORS
+import hashlib
+import hmac
+import ipaddress
 import os
 
+from common.auth_tokens import TokenIssuer, TokenError
+from common.cache import TTLCache
+from common.db_pool import get_db_connection, get_pool, PoolExhaustedError
+from common.health import init_health
+from common.metrics import init_metrics
+from common.profiling import init_debug_endpoints
+from common.slow_queries import init_slow_query_log
+from common.tracing import init_tracing
+from common.passwords import hash_password, hash_passwords, verify_password, HashingBusyError
+from common.passwords import warm_up as warm_up_hashing
+from common.rate_limit import TokenBucketLimiter, bucket_store_from_env, retry_after_header
+
 app = Flask(__name__)
 CORS(app)
+init_metrics(app)
+init_debug_endpoints(app)
+init_tracing(app, "mscv-auth")
+init_slow_query_log(app)
+health = init_health(app)
+
+# Firma los tokens de sesión; las claves públicas se sirven en /.well-known/jwks.json
+token_issuer = TokenIssuer.from_env()
+refresh_verifier = token_issuer.verifier()
+
+@app.errorhandler(PoolExhaustedError)
+def handle_pool_exhausted(e):
+    print(f"❌ DB pool exhausted: {e}")
+    return jsonify({"error": "Service busy, try again"}), 503, {"Retry-After": "1"}
+
+
+@app.errorhandler(HashingBusyError)
+def handle_hashing_busy(e):
+    print(f"❌ Password hashing pool busy: {e}")
+    return jsonify({"error": "Service busy, try again"}), 503, {"Retry-After": "1"}
+
+
+@app.route("/pool/stats", methods=["GET"])
+def pool_stats():
+    return jsonify(get_pool().stats()), 200
+
+
+# ===========================================
+# Throttling de logins fallidos
+# ===========================================
+# Cada login fallido gasta una ficha del cubo de su email y del de su IP; sin fichas
+# el intento se rechaza con 429 antes de pedir una conexión a MySQL.
+login_bucket_store = bucket_store_from_env()
+email_limiter = TokenBucketLimiter(
+    login_bucket_store, name="login:email",
+    rate=float(os.environ.get("LOGIN_EMAIL_RATE", 1 / 30)),
+    burst=int(os.environ.get("LOGIN_EMAIL_BURST", 5)),
+)
+ip_limiter = TokenBucketLimiter(
+    login_bucket_store, name="login:ip",
+    rate=float(os.environ.get("LOGIN_IP_RATE", 1)),
+    burst=int(os.environ.get("LOGIN_IP_BURST", 30)),
+)
+
+# Caché negativa: un par email/contraseña que acaba de fallar vuelve a dar 401 sin
+# consultar MySQL. Se guarda un HMAC con sal del proceso, nunca la contraseña.
+failed_logins = TTLCache(
+    maxsize=int(os.environ.get("LOGIN_NEGATIVE_CACHE_SIZE", 10000)),
+    ttl=float(os.environ.get("LOGIN_NEGATIVE_CACHE_TTL", 10)),
+)
+_failed_login_salt = os.urandom(16)
+
+
+def failed_login_key(email, password):
+    return email, hmac.new(_failed_login_salt, password.encode("utf-8"), hashlib.sha256).digest()
+
+
+# Redes (CIDR, separadas por coma) de los proxies cuyo X-Forwarded-For se cree: en el
+# clúster, el rango de pods (el NGINX del frontend). mscv-auth también es accesible
+# directamente por su LoadBalancer, así que a cualquier otro origen no se le cree.
+TRUSTED_PROXIES = [
+    ipaddress.ip_network(cidr.strip())
+    for cidr in os.environ.get("TRUSTED_PROXIES", "").split(",") if cidr.strip()
+]
+
+
+def is_trusted_proxy(addr):
+    try:
+        ip = ipaddress.ip_address(addr)
+    except ValueError:
+        return False
+    return any(ip in network for network in TRUSTED_PROXIES)
+
+
+def client_ip():
+    """
+    IP del cliente para el cubo de login:ip. Se recorre X-Forwarded-For de derecha a
+    izquierda mientras el salto sea un proxy de confianza; el primero que no lo es
+    es el cliente. Lo que un cliente escriba a la izquierda nunca se llega a leer.
+    """
+    addr = request.remote_addr
+    if not is_trusted_proxy(addr):
+        return addr
+    forwarded = [a.strip() for a in request.headers.get("X-Forwarded-For", "").split(",") if a.strip()]
+    for hop in reversed(forwarded):
+        addr = hop
+        if not is_trusted_proxy(hop):
+            break
+    return addr
+
+
+def throttled(retry_after):
+    return jsonify({"error": "Too many failed login attempts, try again later"}), 429, \
+        {"Retry-After": retry_after_header(retry_after)}
+
+
+@app.route("/login/stats", methods=["GET"])
+def login_stats():
+    return jsonify({
+        "store": login_bucket_store.stats(),
+        "email": email_limiter.stats(),
+        "ip": ip_limiter.stats(),
+        "negative_cache": failed_logins.stats(),
+    }), 200
 
-def get_db_connection():
-    return mysql.connector.connect(
-        host=os.environ.get("DB_HOST", "mysql"),
-        user=os.environ.get("DB_USER", "myapp_user"),
-        password=os.environ.get("DB_PASSWORD", "mypassword"),
-        database=os.environ.get("DB_NAME", "myapp_db")
-    )
 
 @app.route("/users", methods=["POST"])
 def add_user():
@@ -25,14 +137,18 @@ def add_user():
     if not all([name, email, password]):
         return jsonify({"error": "Missing fields"}), 400
 
+    # argon2 en el pool de procesos, antes de pedir conexión a MySQL
+    password_hash = hash_password(password)
+
     conn = get_db_connection()
     try:
         with conn.cursor() as cursor:
             cursor.execute(
                 "INSERT INTO users (name, email, password) VALUES (%s, %s, %s)",
-                (name, email, password)
+                (name, email, password_hash)
             )
         conn.commit()
+        failed_logins.invalidate()  # un email que antes no existía puede entrar ya
         return jsonify({"message": "User added!"}), 201
     except mysql.connector.Error as err:
         print(f"❌ MySQL Error: {err}")
@@ -45,6 +161,154 @@ def add_user():
 # trigger build
 
 
+USERS_BATCH_MAX = int(os.environ.get("USERS_BATCH_MAX", 1000))
+USERS_BATCH_CHUNK = int(os.environ.get("USERS_BATCH_CHUNK", 200))
+DUPLICATE_KEY = 1062  # ER_DUP_ENTRY
+
+
+def chunked(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def run_with_savepoint(cursor, statement):
+    """Ejecuta statement() dentro de un SAVEPOINT; si falla, deshace sólo ese tramo y relanza."""
+    cursor.execute("SAVEPOINT batch_chunk")
+    try:
+        statement()
+    except mysql.connector.Error:
+        cursor.execute("ROLLBACK TO SAVEPOINT batch_chunk")
+        raise
+    cursor.execute("RELEASE SAVEPOINT batch_chunk")
+
+
+def user_row(data):
+    """(name, email, password, role, department) validados. Lanza ValueError."""
+    if not isinstance(data, dict):
+        raise ValueError("Each user must be an object")
+    password = data.get("password") or data.get("pass")
+    if not all([data.get("name"), data.get("email"), password]):
+        raise ValueError("Missing fields: name, email and password are required")
+    return (data["name"], str(data["email"]).strip(), password, data.get("role") or "User", data.get("department"))
+
+
+def existing_emails(emails):
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            found = set()
+            for chunk in chunked(emails, USERS_BATCH_CHUNK):
+                cursor.execute(
+                    f"SELECT email FROM users WHERE email IN ({', '.join(['%s'] * len(chunk))})", chunk
+                )
+                found.update(row[0].lower() for row in cursor.fetchall())
+            return found
+    finally:
+        conn.close()
+
+
+def insert_users(cursor, rows, results):
+    """
+    Un INSERT multi-fila por tramo (ids consecutivos desde lastrowid). Si un tramo
+    choca con la clave única de email (alta concurrente), se reintenta fila a fila
+    y sólo las filas en conflicto se marcan como tales.
+    """
+    for chunk in chunked(rows, USERS_BATCH_CHUNK):
+        params = [v for _, values in chunk for v in values]
+        try:
+            run_with_savepoint(cursor, lambda: cursor.execute(
+                "INSERT INTO users (name, email, password, role, department) VALUES "
+                + ", ".join(["(%s, %s, %s, %s, %s)"] * len(chunk)),
+                params
+            ))
+            first_id = cursor.lastrowid
+            for offset, (index, values) in enumerate(chunk):
+                results[index] = {"index": index, "email": values[1], "status": "ok", "id": first_id + offset}
+        except mysql.connector.Error:
+            for index, values in chunk:
+                try:
+                    run_with_savepoint(cursor, lambda: cursor.execute(
+                        "INSERT INTO users (name, email, password, role, department) VALUES (%s, %s, %s, %s, %s)",
+                        values
+                    ))
+                    results[index] = {"index": index, "email": values[1], "status": "ok", "id": cursor.lastrowid}
+                except mysql.connector.Error as e:
+                    status = "conflict" if e.errno == DUPLICATE_KEY else "error"
+                    results[index] = {"index": index, "email": values[1], "status": status, "error": e.msg}
+
+
+@app.route("/users/batch", methods=["POST"])
+def add_users_batch():
+    """
+    Alta masiva: {"users": [{"name", "email", "password", "role"?, "department"?}, ...]}.
+
+    Valida todas las filas y descarta los emails repetidos (en el lote o ya
+    existentes) antes de hashear; hashea en paralelo en el pool de procesos y
+    luego inserta en una única transacción. Las filas inválidas o en conflicto se
+    reportan por índice sin abortar el resto (207 si alguna falló).
+    """
+    body = request.get_json(silent=True) or {}
+    users = body.get("users") if isinstance(body, dict) else None
+    if not isinstance(users, list) or not users:
+        return jsonify({"error": "'users' must be a non-empty array"}), 400
+    if len(users) > USERS_BATCH_MAX:
+        return jsonify({"error": f"Batch too large (max {USERS_BATCH_MAX} users)"}), 413
+
+    # 1. Validar todo y detectar emails repetidos dentro del lote
+    results = [None] * len(users)
+    valid, seen = [], set()
+    for index, data in enumerate(users):
+        try:
+            row = user_row(data)
+        except ValueError as e:
+            results[index] = {"index": index, "status": "error", "error": str(e)}
+            continue
+        email_key = row[1].lower()
+        if email_key in seen:
+            results[index] = {"index": index, "email": row[1], "status": "conflict", "error": "Duplicate email in batch"}
+            continue
+        seen.add(email_key)
+        valid.append((index, row))
+
+    # 2. Descartar los que ya existen: no se gasta un hash argon2 en ellos
+    try:
+        taken = existing_emails([row[1] for _, row in valid]) if valid else set()
+    except mysql.connector.Error as err:
+        print(f"❌ MySQL Error: {err}")
+        return jsonify({"error": "Database query failed"}), 500
+    pending = []
+    for index, row in valid:
+        if row[1].lower() in taken:
+            results[index] = {"index": index, "email": row[1], "status": "conflict", "error": "Email already exists"}
+        else:
+            pending.append((index, row))
+
+    # 3. Hash en paralelo, sin tener ninguna conexión tomada
+    hashes = hash_passwords([row[2] for _, row in pending])
+    rows = [(index, (name, email, password_hash, role, department))
+            for (index, (name, email, _, role, department)), password_hash in zip(pending, hashes)]
+
+    # 4. Insertar en una única transacción
+    if rows:
+        conn = get_db_connection()
+        try:
+            conn.start_transaction()
+            with conn.cursor() as cursor:
+                insert_users(cursor, rows, results)
+            conn.commit()
+            failed_logins.invalidate()
+        except mysql.connector.Error as err:
+            print(f"❌ MySQL Error: {err}")
+            conn.rollback()
+            return jsonify({"error": "Batch failed, no users were created"}), 500
+        finally:
+            conn.close()
+
+    failed = sum(1 for r in results if r["status"] != "ok")
+    summary = {"total": len(results), "succeeded": len(results) - failed, "failed": failed, "results": results}
+    return jsonify(summary), 207 if failed else 201
+
+
 @app.route("/login", methods=["POST"])
 def login():
     data = request.json
@@ -55,25 +319,128 @@ def login():
     if not all([email, password]):
         return jsonify({"error": "Email and password are required"}), 400
 
+    email_key, ip_key = email.strip().lower(), client_ip()
+    for limiter, key in ((email_limiter, email_key), (ip_limiter, ip_key)):
+        allowed, retry_after = limiter.check(key)
+        if not allowed:
+            return throttled(retry_after)
+
+    negative_key = failed_login_key(email_key, password)
+    if failed_logins.get(negative_key) is not None:
+        email_limiter.hit(email_key)
+        ip_limiter.hit(ip_key)
+        return jsonify({"message": "Invalid email or password"}), 401
+
     conn = get_db_connection()
     try:
         # buffered=True consume todos los resultados auto para evitar "Unread result"
         with conn.cursor(dictionary=True, buffered=True) as cursor:
+            # Búsqueda por el índice único de email; la contraseña se comprueba fuera de MySQL
             cursor.execute(
-                "SELECT id, name, email, role, department FROM users WHERE email = %s AND password = %s",
-                (email, password)
+                "SELECT id, name, email, role, department, password FROM users WHERE email = %s",
+                (email,)
             )
             user = cursor.fetchone()
+    except mysql.connector.Error as err:
+        print(f"❌ MySQL Error: {err}")
+        return jsonify({"error": "Database query failed"}), 500
+    finally:
+        # La conexión se devuelve al pool antes del hash, que es lo lento
+        conn.close()
 
-        if user:
-            return jsonify({"message": "Login successful", "user": user}), 200
-        else:
-            return jsonify({"message": "Invalid email or password"}), 401
+    if user:
+        valid, new_hash = verify_password(user.pop("password"), password)
+    else:
+        # Mismo coste que un usuario existente: el tiempo de respuesta no revela qué emails existen
+        verify_password(dummy_password_hash(), password)
+        valid, new_hash = False, None
+
+    if not valid:
+        failed_logins.set(negative_key, True)
+        email_limiter.hit(email_key)
+        ip_limiter.hit(ip_key)
+        return jsonify({"message": "Invalid email or password"}), 401
+
+    if new_hash:
+        rehash_password(user["id"], new_hash)
+    return jsonify({"message": "Login successful", "user": user, **token_issuer.issue_pair(user)}), 200
+
+
+_dummy_hash = None
+
+
+def dummy_password_hash():
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = hash_password(os.urandom(16).hex())
+    return _dummy_hash
+
+
+def rehash_password(user_id, new_hash):
+    """
+    Guarda el hash nuevo (fila en texto plano o con costes antiguos). Es una mejora
+    oportunista: si falla, el login sigue siendo válido y se reintenta en el siguiente.
+    """
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("UPDATE users SET password = %s WHERE id = %s", (new_hash, user_id))
+        conn.commit()
+    except mysql.connector.Error as err:
+        print(f"❌ Could not rehash password for user {user_id}: {err}")
+    finally:
+        conn.close()
+
+@app.route("/token/refresh", methods=["POST"])
+def refresh_token():
+    """Canjea un refresh token válido por un par nuevo, con los datos actuales del usuario."""
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    try:
+        claims = refresh_verifier.verify(data.get("refreshToken") or "", token_type="refresh")
+    except TokenError as e:
+        return jsonify({"error": f"Invalid refresh token: {e}"}), 401
+
+    conn = get_db_connection()
+    try:
+        with conn.cursor(dictionary=True, buffered=True) as cursor:
+            cursor.execute(
+                "SELECT id, name, email, role, department FROM users WHERE id = %s",
+                (int(claims["sub"]),)
+            )
+            user = cursor.fetchone()
     except mysql.connector.Error as err:
         print(f"❌ MySQL Error: {err}")
         return jsonify({"error": "Database query failed"}), 500
     finally:
         conn.close()
 
+    if not user:
+        return jsonify({"error": "User no longer exists"}), 401
+    return jsonify(token_issuer.issue_pair(user)), 200
+
+
+@app.route("/.well-known/jwks.json", methods=["GET"])
+def jwks():
+    # Los verificadores la cachean: se puede servir con max-age
+    return jsonify(token_issuer.jwks()), 200, {"Cache-Control": "public, max-age=300"}
+
+
+# ===========================================
+# Calentamiento del worker (GET /readyz espera a que termine)
+# ===========================================
+@health.warmup("db_pool")
+def warm_db_pool():
+    get_pool().prefill()
+
+
+@health.warmup("password_hashing")
+def warm_password_hashing():
+    # Procesos argon2 arrancados y hash señuelo listo para los emails desconocidos
+    warm_up_hashing()
+    dummy_password_hash()
+
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5001, debug=False)  # Desactiva debug para prod
\ No newline at end of file
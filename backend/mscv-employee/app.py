@@ -1,46 +1,229 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request
 import mysql.connector
 from flask_cors import CORS
 import os
+import csv
+import hashlib
+import io
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from urllib.parse import urlencode
+
+from common.auth_tokens import TokenVerifier, TokenError, authenticate, auth_mode_from_env
+from common.cache import TTLCache
+from common.db_pool import get_db_connection, get_pool, PoolExhaustedError
+from common.health import init_health
+from common.metrics import init_metrics
+from common.profiling import init_debug_endpoints
+from common.slow_queries import init_slow_query_log
+from common.tracing import init_tracing
+from attendance import attendance_bp
+from projects import projects_bp
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=["X-Next-Cursor", "Link"])
+init_metrics(app)
+init_debug_endpoints(app)
+init_tracing(app, "mscv-employee")
+init_slow_query_log(app)
+health = init_health(app)
+app.register_blueprint(projects_bp)
+app.register_blueprint(attendance_bp)
 
 # trigger build
 
 
-def get_db_connection():
-    return mysql.connector.connect(
-        host=os.environ.get("DB_HOST", "mysql"),
-        user=os.environ.get("DB_USER", "myapp_user"),
-        password=os.environ.get("DB_PASSWORD", "mypassword"),
-        database=os.environ.get("DB_NAME", "myapp_db")
-    )
+@app.errorhandler(PoolExhaustedError)
+def handle_pool_exhausted(e):
+    print(f"❌ DB pool exhausted: {e}")
+    return jsonify({"error": "Service busy, try again"}), 503, {"Retry-After": "1"}
+
+
+@app.route("/pool/stats", methods=["GET"])
+def pool_stats():
+    return jsonify(get_pool().stats()), 200
+
+
+# ===========================================
+# Autenticación: tokens firmados por mscv-auth
+# ===========================================
+# La firma se verifica localmente con las claves públicas (JWKS) cacheadas:
+# no hay llamada a mscv-auth ni consulta a 'users' por request.
+AUTH_MODE = auth_mode_from_env()
+# /debug/* y /db/slow-queries tienen su propio token (X-Debug-Token, common/profiling.py)
+AUTH_EXEMPT_PATHS = (
+    "/healthz", "/readyz", "/pool/stats", "/cache/stats", "/metrics", "/tracing/stats", "/db/slow-queries",
+    "/debug/profile", "/debug/heap",
+)
+token_verifier = TokenVerifier.from_env()
+
+
+@app.before_request
+def authenticate_request():
+    g.user = None
+    if request.method == "OPTIONS" or request.path in AUTH_EXEMPT_PATHS:
+        return None
+    try:
+        g.user = authenticate(token_verifier, request.headers.get("Authorization"), AUTH_MODE)
+    except TokenError as e:
+        return jsonify({"error": f"Unauthorized: {e}"}), 401, {"WWW-Authenticate": "Bearer"}
+    return None
+
+
+# ===========================================
+# Caché de lecturas (read-through) con ETag
+# ===========================================
+# Guarda el body ya serializado y su ETag: un hit no toca MySQL ni vuelve a codificar JSON
+employee_cache = TTLCache(
+    maxsize=int(os.environ.get("EMPLOYEE_CACHE_SIZE", 512)),
+    ttl=float(os.environ.get("EMPLOYEE_CACHE_TTL", 30)),
+)
+
+
+class CachedBody:
+    __slots__ = ("body", "etag", "headers")
+
+    def __init__(self, data, headers=None):
+        self.body = app.json.dumps(data).encode("utf-8")
+        self.etag = hashlib.sha1(self.body).hexdigest()
+        self.headers = headers or {}
+
+
+def etag_response(cached):
+    """200 con el body cacheado, o 304 si el cliente ya tiene esa versión (If-None-Match)."""
+    if request.if_none_match.contains(cached.etag):
+        response = Response(status=304)
+    else:
+        response = Response(cached.body, status=200, mimetype="application/json", headers=cached.headers)
+    response.set_etag(cached.etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+@app.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    return jsonify(employee_cache.stats()), 200
+
 # trigger build
 
+# Columnas de la tabla 'employees' (db/migrations) que se pueden pedir con ?fields=
+EMPLOYEE_COLUMNS = ("id", "name", "email", "role", "department", "startDate", "status", "avatarUrl")
+MAX_PAGE_SIZE = int(os.environ.get("EMPLOYEES_MAX_PAGE_SIZE", 500))
+
+
+def build_employee_list_query(args):
+    """
+    Traduce los query params de GET /employees a SQL con paginación keyset sobre 'id'.
+
+    - limit / after: tamaño de página (máx. MAX_PAGE_SIZE) y último id de la página anterior
+    - fields: columnas separadas por coma ('id' siempre se incluye para el cursor)
+    - department, status: filtros exactos (admiten varios valores separados por coma)
+    - startDateFrom / startDateTo: rango inclusivo sobre startDate (YYYY-MM-DD)
+
+    Devuelve (sql, params, limit) o lanza ValueError si algún parámetro es inválido.
+    """
+    limit = int(args.get("limit", MAX_PAGE_SIZE))
+    if limit < 1:
+        raise ValueError("limit must be >= 1")
+    limit = min(limit, MAX_PAGE_SIZE)
+
+    columns = list(EMPLOYEE_COLUMNS)
+    if args.get("fields"):
+        requested = [f.strip() for f in args["fields"].split(",") if f.strip()]
+        unknown = [f for f in requested if f not in EMPLOYEE_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        columns = ["id"] + [f for f in requested if f != "id"]
+
+    where, params = [], []
+    if args.get("after"):
+        where.append("id > %s")
+        params.append(int(args["after"]))
+
+    for column in ("department", "status"):
+        if args.get(column):
+            values = [v.strip() for v in args[column].split(",") if v.strip()]
+            where.append(f"{column} IN ({', '.join(['%s'] * len(values))})")
+            params.extend(values)
+
+    if args.get("startDateFrom"):
+        where.append("startDate >= %s")
+        params.append(date.fromisoformat(args["startDateFrom"]))
+    if args.get("startDateTo"):
+        where.append("startDate <= %s")
+        params.append(date.fromisoformat(args["startDateTo"]))
+
+    sql = f"SELECT {', '.join(columns)} FROM employees"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    # Se pide una fila extra para saber si hay página siguiente
+    sql += " ORDER BY id LIMIT %s"
+    params.append(limit + 1)
+
+    return sql, tuple(params), limit
+
+
+def next_page_query(args, next_cursor):
+    # dict(...items()) sirve tanto para request.args (Flask) como para query_params (ASGI)
+    query = dict(args.items())
+    query["after"] = next_cursor
+    return urlencode(query)
+
+
 @app.route('/employees', methods=['GET'])
 def get_employees():
     try:
-        conn = get_db_connection()
-        with conn.cursor(dictionary=True, buffered=True) as cursor:
-            cursor.execute("SELECT * FROM employees")
+        sql, params, limit = build_employee_list_query(request.args)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query parameters: {e}"}), 400
+
+    cache_key = ("employees", tuple(sorted(request.args.items(multi=True))))
+    cached = employee_cache.get(cache_key)
+    if cached is not None:
+        return etag_response(cached)
+
+    generation = employee_cache.generation
+    conn = get_db_connection()
+    try:
+        with conn.cursor(dictionary=True) as cursor:
+            cursor.execute(sql, params)
             employees = cursor.fetchall()
-        return jsonify(employees), 200
     except mysql.connector.Error as e:
         print(f"❌ Database error: {e}")
         return jsonify({"error": "Database connection failed"}), 500
     finally:
         conn.close()
 
+    # El body sigue siendo una lista; el cursor de la siguiente página va en cabeceras
+    headers = {}
+    if len(employees) > limit:
+        employees = employees[:limit]
+        next_cursor = employees[-1]["id"]
+        headers["X-Next-Cursor"] = str(next_cursor)
+        headers["Link"] = f'<{request.path}?{next_page_query(request.args, next_cursor)}>; rel="next"'
+
+    cached = CachedBody(employees, headers)
+    employee_cache.set(cache_key, cached, generation=generation)
+    return etag_response(cached)
+
 @app.route('/employees/<int:id>', methods=['GET'])
 def get_employee_by_id(id):
+    cache_key = ("employee", id)
+    cached = employee_cache.get(cache_key)
+    if cached is not None:
+        return etag_response(cached)
+
+    generation = employee_cache.generation
+    conn = get_db_connection()
     try:
-        conn = get_db_connection()
         with conn.cursor(dictionary=True, buffered=True) as cursor:
             cursor.execute("SELECT * FROM employees WHERE id = %s", (id,))
             employee = cursor.fetchone()
         if employee:
-            return jsonify(employee), 200
+            cached = CachedBody(employee)
+            employee_cache.set(cache_key, cached, generation=generation)
+            return etag_response(cached)
         else:
             return jsonify({"message": f"Employee with ID {id} not found"}), 404
     except mysql.connector.Error as e:
@@ -50,26 +233,58 @@ def get_employee_by_id(id):
         conn.close()
 
 
+# Campos que aceptan POST/PUT /employees y /employees/batch (en el orden de las columnas)
+EMPLOYEE_WRITE_FIELDS = ('name', 'email', 'role', 'department', 'startDate', 'status')
+EMPLOYEE_REQUIRED_FIELDS = ('name', 'email')
+EMPLOYEE_STATUSES = ('Active', 'OnLeave', 'Terminated')
+INSERT_EMPLOYEE_COLUMNS = ", ".join(EMPLOYEE_WRITE_FIELDS)
+UPDATE_EMPLOYEE_SQL = f"""
+    UPDATE employees
+    SET {", ".join(f"{f}=%s" for f in EMPLOYEE_WRITE_FIELDS)}
+    WHERE id=%s
+"""
+# {rows}: "ROW(id, name, email, ...)" por empleado (VALUES ... AS v (cols) requiere MySQL 8.0.19)
+UPDATE_EMPLOYEES_BATCH_SQL = f"""
+    UPDATE employees e
+    JOIN (VALUES {{rows}}) AS v (id, {INSERT_EMPLOYEE_COLUMNS}) ON e.id = v.id
+    SET {", ".join(f"e.{f}=v.{f}" for f in EMPLOYEE_WRITE_FIELDS)}
+"""
+
+
+def employee_values(data):
+    """Valores de escritura en el orden de EMPLOYEE_WRITE_FIELDS. Lanza ValueError si faltan o son inválidos."""
+    if not isinstance(data, dict) or not all(data.get(field) for field in EMPLOYEE_REQUIRED_FIELDS):
+        raise ValueError("Missing required fields")
+    # El frontend usa 'On Leave' (EmployeeStatus); el ENUM de MySQL es 'OnLeave'
+    status = (data.get('status') or 'Active').replace(' ', '')
+    if status not in EMPLOYEE_STATUSES:
+        raise ValueError(f"status must be one of: {', '.join(EMPLOYEE_STATUSES)}")
+    return (data['name'], data['email'], data.get('role'), data.get('department'),
+            data.get('startDate') or None, status)
+
+
 @app.route('/employees', methods=['POST'])
 def add_employee():
-    data = request.get_json()
-    required_fields = ['firstName', 'lastName', 'email', 'salary', 'date']
-
-    if not all(field in data for field in required_fields):
-        return jsonify({"error": "Missing required fields"}), 400
+    try:
+        values = employee_values(request.get_json())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     conn = get_db_connection()
     try:
-        with conn.cursor(dictionary=True) as cursor:
-            cursor.execute("""
-                INSERT INTO employees (firstName, lastName, email, salary, date)
-                VALUES (%s, %s, %s, %s, %s)
-            """, (data['firstName'], data['lastName'], data['email'], float(data['salary']), data['date']))
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO employees ({INSERT_EMPLOYEE_COLUMNS}) VALUES ({', '.join(['%s'] * len(values))})",
+                values
+            )
+            # lastrowid viene en el paquete OK del INSERT: sin segundo round trip
+            new_id = cursor.lastrowid
             conn.commit()
-
-            cursor.execute("SELECT LAST_INSERT_ID() AS id")
-            new_id = cursor.fetchone()['id']
+            employee_cache.invalidate()
         return jsonify({"message": "Employee added successfully", "id": new_id}), 201
+    except mysql.connector.IntegrityError as e:
+        print(f"❌ Integrity error: {e}")
+        return jsonify({"error": "An employee with this email already exists"}), 409
     except mysql.connector.Error as e:
         print(f"❌ Database error: {e}")
         return jsonify({"error": "Failed to insert employee"}), 500
@@ -79,26 +294,25 @@ def add_employee():
 
 @app.route('/employees/<int:id>', methods=['PUT'])
 def update_employee(id):
-    data = request.get_json()
-    required_fields = ['firstName', 'lastName', 'email', 'salary', 'date']
-
-    if not all(field in data for field in required_fields):
-        return jsonify({"error": "Missing required fields"}), 400
+    try:
+        values = employee_values(request.get_json())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     conn = get_db_connection()
     try:
         with conn.cursor() as cursor:
-            cursor.execute("""
-                UPDATE employees
-                SET firstName=%s, lastName=%s, email=%s, salary=%s, date=%s
-                WHERE id=%s
-            """, (data['firstName'], data['lastName'], data['email'], float(data['salary']), data['date'], id))
+            cursor.execute(UPDATE_EMPLOYEE_SQL, values + (id,))
             conn.commit()
+            employee_cache.invalidate()
 
             if cursor.rowcount == 0:
                 return jsonify({"message": f"Employee with ID {id} not found"}), 404
 
         return jsonify({"message": f"Employee {id} updated successfully"}), 200
+    except mysql.connector.IntegrityError as e:
+        print(f"❌ Integrity error: {e}")
+        return jsonify({"error": "An employee with this email already exists"}), 409
     except mysql.connector.Error as e:
         print(f"❌ Database error: {e}")
         return jsonify({"error": "Failed to update employee"}), 500
@@ -113,6 +327,7 @@ def delete_employee(id):
         with conn.cursor() as cursor:
             cursor.execute("DELETE FROM employees WHERE id=%s", (id,))
             conn.commit()
+            employee_cache.invalidate()
 
             if cursor.rowcount == 0:
                 return jsonify({"message": f"Employee with ID {id} not found"}), 404
@@ -124,5 +339,303 @@ def delete_employee(id):
     finally:
         conn.close()
 
+# ===========================================
+# Operaciones en lote (create / update / delete)
+# ===========================================
+BATCH_MAX_OPERATIONS = int(os.environ.get("EMPLOYEES_BATCH_MAX", 5000))
+BATCH_CHUNK_SIZE = int(os.environ.get("EMPLOYEES_BATCH_CHUNK", 500))
+
+
+def chunked(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def run_with_savepoint(cursor, statement):
+    """Ejecuta statement() dentro de un SAVEPOINT; si falla, deshace sólo ese tramo y relanza."""
+    cursor.execute("SAVEPOINT batch_chunk")
+    try:
+        statement()
+    except mysql.connector.Error:
+        cursor.execute("ROLLBACK TO SAVEPOINT batch_chunk")
+        raise
+    cursor.execute("RELEASE SAVEPOINT batch_chunk")
+
+
+def batch_create(cursor, items, results):
+    """
+    Un INSERT multi-fila por tramo. InnoDB asigna ids consecutivos a un "simple insert"
+    multi-fila y lastrowid es el primero, así que los ids se calculan sin otra consulta.
+    Si el tramo falla, se reintenta fila a fila para aislar las filas culpables.
+    """
+    for chunk in chunked(items, BATCH_CHUNK_SIZE):
+        placeholders = ", ".join(["(" + ", ".join(["%s"] * len(EMPLOYEE_WRITE_FIELDS)) + ")"] * len(chunk))
+        params = [v for _, values in chunk for v in values]
+        try:
+            run_with_savepoint(cursor, lambda: cursor.execute(
+                f"INSERT INTO employees ({INSERT_EMPLOYEE_COLUMNS}) VALUES {placeholders}", params
+            ))
+            first_id = cursor.lastrowid
+            for offset, (index, _) in enumerate(chunk):
+                results[index] = {"index": index, "op": "create", "status": "ok", "id": first_id + offset}
+        except mysql.connector.Error:
+            for index, values in chunk:
+                try:
+                    run_with_savepoint(cursor, lambda: cursor.execute(
+                        f"INSERT INTO employees ({INSERT_EMPLOYEE_COLUMNS}) VALUES ({', '.join(['%s'] * len(values))})",
+                        values
+                    ))
+                    results[index] = {"index": index, "op": "create", "status": "ok", "id": cursor.lastrowid}
+                except mysql.connector.Error as e:
+                    results[index] = {"index": index, "op": "create", "status": "error", "error": e.msg}
+
+
+def batch_update(cursor, items, results):
+    """
+    Un UPDATE multi-fila por tramo (JOIN con una tabla VALUES) sobre los ids que existen,
+    comprobados con SELECT ... FOR UPDATE como en batch_delete. No se usa INSERT ... ON
+    DUPLICATE KEY UPDATE: se resolvería contra cualquier índice único, no sólo la PK.
+    Si el tramo falla, se reintenta fila a fila para aislar las filas culpables.
+    """
+    for chunk in chunked(items, BATCH_CHUNK_SIZE):
+        ids = [emp_id for _, emp_id, _ in chunk]
+        cursor.execute(f"SELECT id FROM employees WHERE id IN ({', '.join(['%s'] * len(ids))}) FOR UPDATE", ids)
+        existing = {row[0] for row in cursor.fetchall()}
+        found = []
+        for index, emp_id, values in chunk:
+            if emp_id in existing:
+                found.append((index, emp_id, values))
+            else:
+                results[index] = {"index": index, "op": "update", "status": "not_found", "id": emp_id}
+        if not found:
+            continue
+
+        # Un id repetido en el lote se queda con su última operación, como al aplicarlas en orden
+        latest = {emp_id: values for _, emp_id, values in found}
+        row = "ROW(" + ", ".join(["%s"] * (len(EMPLOYEE_WRITE_FIELDS) + 1)) + ")"
+        params = [v for emp_id, values in latest.items() for v in (emp_id,) + values]
+        try:
+            run_with_savepoint(cursor, lambda: cursor.execute(
+                UPDATE_EMPLOYEES_BATCH_SQL.format(rows=", ".join([row] * len(latest))), params
+            ))
+            for index, emp_id, _ in found:
+                results[index] = {"index": index, "op": "update", "status": "ok", "id": emp_id}
+        except mysql.connector.Error:
+            for index, emp_id, values in found:
+                try:
+                    run_with_savepoint(cursor, lambda: cursor.execute(UPDATE_EMPLOYEE_SQL, values + (emp_id,)))
+                    results[index] = {"index": index, "op": "update", "status": "ok", "id": emp_id}
+                except mysql.connector.Error as e:
+                    results[index] = {"index": index, "op": "update", "status": "error", "id": emp_id, "error": e.msg}
+
+
+def batch_delete(cursor, items, results):
+    """Un DELETE ... WHERE id IN (...) por tramo; las filas con FKs que lo impiden se aíslan fila a fila."""
+    for chunk in chunked(items, BATCH_CHUNK_SIZE):
+        ids = [emp_id for _, emp_id in chunk]
+        in_clause = ", ".join(["%s"] * len(ids))
+        cursor.execute(f"SELECT id FROM employees WHERE id IN ({in_clause}) FOR UPDATE", ids)
+        existing = {row[0] for row in cursor.fetchall()}
+        try:
+            run_with_savepoint(cursor, lambda: cursor.execute(f"DELETE FROM employees WHERE id IN ({in_clause})", ids))
+            for index, emp_id in chunk:
+                status = "ok" if emp_id in existing else "not_found"
+                results[index] = {"index": index, "op": "delete", "status": status, "id": emp_id}
+        except mysql.connector.Error:
+            for index, emp_id in chunk:
+                if emp_id not in existing:
+                    results[index] = {"index": index, "op": "delete", "status": "not_found", "id": emp_id}
+                    continue
+                try:
+                    run_with_savepoint(cursor, lambda: cursor.execute("DELETE FROM employees WHERE id=%s", (emp_id,)))
+                    results[index] = {"index": index, "op": "delete", "status": "ok", "id": emp_id}
+                except mysql.connector.Error as e:
+                    results[index] = {"index": index, "op": "delete", "status": "error", "id": emp_id, "error": e.msg}
+
+
+@app.route('/employees/batch', methods=['POST'])
+def batch_employees():
+    """
+    Aplica un array de operaciones en una sola transacción:
+
+        {"operations": [
+            {"op": "create", "data": {...}},
+            {"op": "update", "id": 3, "data": {...}},
+            {"op": "delete", "id": 4}
+        ]}
+
+    Se ejecutan agrupadas por tipo (creates, updates, deletes). Las operaciones
+    inválidas o que fallan se reportan por índice sin abortar el resto del lote.
+    """
+    body = request.get_json(silent=True) or {}
+    operations = body.get("operations") if isinstance(body, dict) else None
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"error": "'operations' must be a non-empty array"}), 400
+    if len(operations) > BATCH_MAX_OPERATIONS:
+        return jsonify({"error": f"Batch too large (max {BATCH_MAX_OPERATIONS} operations)"}), 413
+
+    # 1. Validar todo antes de tocar la base de datos
+    results = [None] * len(operations)
+    creates, updates, deletes = [], [], []
+    for index, operation in enumerate(operations):
+        op = operation.get("op") if isinstance(operation, dict) else None
+        try:
+            if op == "create":
+                creates.append((index, employee_values(operation.get("data"))))
+            elif op == "update":
+                updates.append((index, int(operation["id"]), employee_values(operation.get("data"))))
+            elif op == "delete":
+                deletes.append((index, int(operation["id"])))
+            else:
+                raise ValueError("op must be 'create', 'update' or 'delete'")
+        except (KeyError, TypeError, ValueError) as e:
+            message = str(e) if isinstance(e, ValueError) else "Missing or invalid 'id'"
+            results[index] = {"index": index, "op": op, "status": "error", "error": message}
+
+    # 2. Ejecutar en una única transacción
+    conn = get_db_connection()
+    try:
+        conn.start_transaction()
+        with conn.cursor() as cursor:
+            batch_create(cursor, creates, results)
+            batch_update(cursor, updates, results)
+            batch_delete(cursor, deletes, results)
+        conn.commit()
+        employee_cache.invalidate()
+    except mysql.connector.Error as e:
+        print(f"❌ Database error: {e}")
+        conn.rollback()
+        return jsonify({"error": "Batch failed, no changes were applied"}), 500
+    finally:
+        conn.close()
+
+    failed = sum(1 for r in results if r["status"] != "ok")
+    summary = {"total": len(results), "succeeded": len(results) - failed, "failed": failed, "results": results}
+    # 207 Multi-Status cuando sólo una parte del lote se aplicó
+    return jsonify(summary), 207 if failed else 200
+
+
+# ===========================================
+# Exportación en streaming (NDJSON / CSV)
+# ===========================================
+EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", 1000))
+EXPORT_QUERIES = {
+    "employees": f"SELECT {', '.join(EMPLOYEE_COLUMNS)} FROM employees ORDER BY id",
+    "attendance": """
+        SELECT e.id AS employeeId, e.name, e.email, e.department,
+               a.id AS attendanceId, a.date, a.checkIn, a.checkOut, a.status
+        FROM employees e
+        JOIN attendance a ON a.employeeId = e.id
+        ORDER BY e.id, a.date
+    """,
+}
+
+
+def to_export_value(value):
+    """Convierte los tipos que devuelve mysql-connector a algo serializable."""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, timedelta):  # columnas TIME
+        total = int(value.total_seconds())
+        return f"{total // 3600:02d}:{total % 3600 // 60:02d}:{total % 60:02d}"
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def serialize_ndjson(columns, rows):
+    return "".join(
+        json.dumps({c: to_export_value(v) for c, v in zip(columns, row)}, separators=(",", ":")) + "\n"
+        for row in rows
+    )
+
+
+def serialize_csv(columns, rows, header=False):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    writer.writerows([to_export_value(v) for v in row] for row in rows)
+    return buffer.getvalue()
+
+
+@app.route('/employees/export', methods=['GET'])
+def export_employees():
+    """
+    Exporta la tabla completa sin cargarla en memoria: cursor sin buffer en el
+    servidor, lectura por lotes con fetchmany y respuesta chunked desde un generador.
+
+    ?format=ndjson|csv   ?include=attendance  (filas de asistencia unidas a su empleado)
+    """
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in ("ndjson", "csv"):
+        return jsonify({"error": "format must be 'ndjson' or 'csv'"}), 400
+    dataset = "attendance" if request.args.get("include") == "attendance" else "employees"
+
+    def generate():
+        # La conexión se pide al empezar a iterar: close() de un generador sin arrancar
+        # no ejecuta su finally, así que una respuesta que nunca se consume (HEAD,
+        # cliente que se va antes del primer chunk) no debe retener nada del pool
+        try:
+            conn = get_db_connection()
+        except PoolExhaustedError as e:
+            print(f"❌ DB pool exhausted during export: {e}")
+            return
+        finished = False
+        try:
+            # Sin buffered=True: las filas se leen del socket a medida que se consumen
+            cursor = conn.cursor()
+            cursor.execute(EXPORT_QUERIES[dataset])
+            columns = cursor.column_names
+            if fmt == "csv":
+                yield serialize_csv(columns, [], header=True)
+            while True:
+                rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+                if not rows:
+                    break
+                yield serialize_ndjson(columns, rows) if fmt == "ndjson" else serialize_csv(columns, rows)
+            finished = True
+        except mysql.connector.Error as e:
+            # Los headers ya se enviaron: sólo se puede cortar el stream
+            print(f"❌ Database error during export: {e}")
+        finally:
+            if finished:
+                cursor.close()
+                conn.close()
+            else:
+                # Cliente desconectado o error: quedan filas sin leer en el socket
+                conn.discard()
+
+    mimetype = "application/x-ndjson" if fmt == "ndjson" else "text/csv"
+    headers = {
+        "Content-Disposition": f"attachment; filename={dataset}.{fmt}",
+        "X-Accel-Buffering": "no",  # que nginx no acumule la respuesta
+    }
+    return Response(generate(), mimetype=mimetype, headers=headers)
+
+
+# ===========================================
+# Calentamiento del worker (GET /readyz espera a que termine)
+# ===========================================
+@health.warmup("db_pool")
+def warm_db_pool():
+    get_pool().prefill()
+
+
+@health.warmup("employee_cache")
+def warm_employee_cache():
+    # La primera página sin filtros (la que pide el frontend) queda en la caché del worker
+    with app.test_request_context("/employees"):
+        response = get_employees()
+    if isinstance(response, tuple):
+        raise RuntimeError(f"GET /employees returned {response[1]}")
+
+
+@health.warmup("jwks", required=False)
+def warm_jwks():
+    if AUTH_MODE != "off":
+        token_verifier.prefetch()
+
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5002, debug=False)  # Debug off para prod
\ No newline at end of file
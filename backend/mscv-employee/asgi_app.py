@@ -0,0 +1,255 @@
+"""
+Modo ASGI de mscv-employee.
+
+Las rutas CRUD de /employees (las que usa frontend/services/employeeService.ts)
+se sirven con corrutinas sobre un pool aiomysql: mientras una consulta espera a
+MySQL, el mismo worker sigue atendiendo otros requests. URLs, códigos de estado,
+JSON (mismo serializador que Flask), ETags y la caché son los mismos que en app.py.
+
+Cualquier otra ruta (proyectos, asistencia, batch, export, ...) cae en la app
+Flask montada detrás, que se ejecuta en el pool de hilos del worker y comparte
+la misma caché, así que una escritura por cualquiera de los dos caminos invalida
+las lecturas del otro.
+
+Se activa con WEB_WORKER_CLASS=asgi y WEB_APP=asgi_app:app (ver common/gunicorn_conf.py).
+"""
+from contextlib import asynccontextmanager
+from functools import wraps
+
+import aiomysql
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+
+from app import (
+    app as flask_app,
+    employee_cache,
+    CachedBody,
+    build_employee_list_query,
+    next_page_query,
+    employee_values,
+    INSERT_EMPLOYEE_COLUMNS,
+    UPDATE_EMPLOYEE_SQL,
+    AUTH_MODE,
+    token_verifier,
+)
+from common.auth_tokens import TokenError, authenticate
+from common.async_db_pool import create_async_pool, execute
+from common.db_pool import PoolExhaustedError
+from common.metrics import MetricsASGIMiddleware
+from common.tracing import TracingASGIMiddleware
+
+pool = create_async_pool()
+
+
+def json_response(data, status=200, headers=None):
+    # Mismo serializador que jsonify() para no cambiar el contrato (fechas, Decimal, ...)
+    return Response(flask_app.json.dumps(data), status_code=status, headers=headers,
+                    media_type="application/json")
+
+
+def etag_response(request, cached):
+    """200 con el body cacheado, o 304 si el cliente ya tiene esa versión (If-None-Match)."""
+    quoted = f'"{cached.etag}"'
+    if_none_match = request.headers.get("if-none-match", "")
+    matches = if_none_match.strip() == "*" or quoted in [t.strip() for t in if_none_match.split(",")]
+    headers = {"ETag": quoted, "Cache-Control": "no-cache"}
+    if matches:
+        return Response(status_code=304, headers=headers)
+    return Response(cached.body, status_code=200, media_type="application/json",
+                    headers={**cached.headers, **headers})
+
+
+def requires_auth(handler):
+    """Misma verificación que before_request en app.py (las rutas montadas ya la hacen en Flask)."""
+    @wraps(handler)
+    async def wrapper(request):
+        try:
+            request.state.user = authenticate(token_verifier, request.headers.get("authorization"), AUTH_MODE)
+        except TokenError as e:
+            return json_response({"error": f"Unauthorized: {e}"}, 401, {"WWW-Authenticate": "Bearer"})
+        return await handler(request)
+    return wrapper
+
+
+@requires_auth
+async def get_employees(request):
+    try:
+        sql, params, limit = build_employee_list_query(request.query_params)
+    except ValueError as e:
+        return json_response({"error": f"Invalid query parameters: {e}"}, 400)
+
+    cache_key = ("employees", tuple(sorted(request.query_params.multi_items())))
+    cached = employee_cache.get(cache_key)
+    if cached is not None:
+        return etag_response(request, cached)
+
+    generation = employee_cache.generation
+    try:
+        async with pool.connection() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await execute(cursor, sql, params)
+                employees = await cursor.fetchall()
+    except aiomysql.Error as e:
+        print(f"❌ Database error: {e}")
+        return json_response({"error": "Database connection failed"}, 500)
+
+    # El body sigue siendo una lista; el cursor de la siguiente página va en cabeceras
+    headers = {}
+    if len(employees) > limit:
+        employees = employees[:limit]
+        next_cursor = employees[-1]["id"]
+        headers["X-Next-Cursor"] = str(next_cursor)
+        headers["Link"] = f'<{request.url.path}?{next_page_query(request.query_params, next_cursor)}>; rel="next"'
+
+    cached = CachedBody(list(employees), headers)
+    employee_cache.set(cache_key, cached, generation=generation)
+    return etag_response(request, cached)
+
+
+@requires_auth
+async def get_employee_by_id(request):
+    id = request.path_params["id"]
+    cache_key = ("employee", id)
+    cached = employee_cache.get(cache_key)
+    if cached is not None:
+        return etag_response(request, cached)
+
+    generation = employee_cache.generation
+    try:
+        async with pool.connection() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await execute(cursor, "SELECT * FROM employees WHERE id = %s", (id,))
+                employee = await cursor.fetchone()
+    except aiomysql.Error as e:
+        print(f"❌ Database error: {e}")
+        return json_response({"error": "Database query failed"}, 500)
+
+    if not employee:
+        return json_response({"message": f"Employee with ID {id} not found"}, 404)
+    cached = CachedBody(employee)
+    employee_cache.set(cache_key, cached, generation=generation)
+    return etag_response(request, cached)
+
+
+@requires_auth
+async def add_employee(request):
+    try:
+        values = employee_values(await request.json())
+    except ValueError as e:
+        return json_response({"error": str(e)}, 400)
+
+    try:
+        async with pool.connection() as conn:
+            async with conn.cursor() as cursor:
+                await execute(
+                    cursor,
+                    f"INSERT INTO employees ({INSERT_EMPLOYEE_COLUMNS}) VALUES ({', '.join(['%s'] * len(values))})",
+                    values
+                )
+                new_id = cursor.lastrowid
+            await conn.commit()
+        employee_cache.invalidate()
+        return json_response({"message": "Employee added successfully", "id": new_id}, 201)
+    except aiomysql.IntegrityError as e:
+        print(f"❌ Integrity error: {e}")
+        return json_response({"error": "An employee with this email already exists"}, 409)
+    except aiomysql.Error as e:
+        print(f"❌ Database error: {e}")
+        return json_response({"error": "Failed to insert employee"}, 500)
+
+
+@requires_auth
+async def update_employee(request):
+    id = request.path_params["id"]
+    try:
+        values = employee_values(await request.json())
+    except ValueError as e:
+        return json_response({"error": str(e)}, 400)
+
+    try:
+        async with pool.connection() as conn:
+            async with conn.cursor() as cursor:
+                await execute(cursor, UPDATE_EMPLOYEE_SQL, values + (id,))
+                rowcount = cursor.rowcount
+            await conn.commit()
+        employee_cache.invalidate()
+    except aiomysql.IntegrityError as e:
+        print(f"❌ Integrity error: {e}")
+        return json_response({"error": "An employee with this email already exists"}, 409)
+    except aiomysql.Error as e:
+        print(f"❌ Database error: {e}")
+        return json_response({"error": "Failed to update employee"}, 500)
+
+    if rowcount == 0:
+        return json_response({"message": f"Employee with ID {id} not found"}, 404)
+    return json_response({"message": f"Employee {id} updated successfully"}, 200)
+
+
+@requires_auth
+async def delete_employee(request):
+    id = request.path_params["id"]
+    try:
+        async with pool.connection() as conn:
+            async with conn.cursor() as cursor:
+                await execute(cursor, "DELETE FROM employees WHERE id=%s", (id,))
+                rowcount = cursor.rowcount
+            await conn.commit()
+        employee_cache.invalidate()
+    except aiomysql.Error as e:
+        print(f"❌ Database error: {e}")
+        return json_response({"error": "Failed to delete employee"}, 500)
+
+    if rowcount == 0:
+        return json_response({"message": f"Employee with ID {id} not found"}, 404)
+    return json_response({"message": f"Employee {id} deleted successfully"}, 200)
+
+
+async def pool_stats(request):
+    return json_response({"async": pool.stats(), **_sync_pool_stats()}, 200)
+
+
+def _sync_pool_stats():
+    # El pool síncrono sólo existe si alguna ruta Flask ya lo usó en este worker
+    from common import db_pool
+    return {"sync": db_pool._pool.stats()} if db_pool._pool is not None else {}
+
+
+async def handle_pool_exhausted(request, exc):
+    print(f"❌ DB pool exhausted: {exc}")
+    return json_response({"error": "Service busy, try again"}, 503, {"Retry-After": "1"})
+
+
+@asynccontextmanager
+async def lifespan(app):
+    await pool.open()
+    yield
+    await pool.close()
+
+
+routes = [
+    Route("/employees", get_employees, methods=["GET"]),
+    Route("/employees", add_employee, methods=["POST"]),
+    Route("/employees/{id:int}", get_employee_by_id, methods=["GET"]),
+    Route("/employees/{id:int}", update_employee, methods=["PUT"]),
+    Route("/employees/{id:int}", delete_employee, methods=["DELETE"]),
+    Route("/pool/stats", pool_stats, methods=["GET"]),
+    # Resto de rutas: la app Flask (síncrona) en el pool de hilos del worker
+    Mount("/", app=WSGIMiddleware(flask_app)),
+]
+
+app = Starlette(
+    routes=routes,
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"],
+                   expose_headers=["X-Next-Cursor", "Link"]),
+        # Las rutas montadas (Flask) ya se miden con init_metrics en app.py
+        Middleware(MetricsASGIMiddleware, routes=routes),
+        Middleware(TracingASGIMiddleware, tracer=flask_app.extensions["tracer"], routes=routes),
+    ],
+    exception_handlers={PoolExhaustedError: handle_pool_exhausted},
+    lifespan=lifespan,
+)
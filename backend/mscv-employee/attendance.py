@@ -0,0 +1,156 @@
+"""
+Rutas de asistencia (tabla 'attendance' de db/migrations).
+
+Todas las consultas filtran por un rango de fechas acotado y se apoyan en los
+índices compuestos (date, employeeId) y (employeeId, date); los resúmenes se
+calculan con GROUP BY en MySQL en lugar de agregarlos en Python.
+"""
+import os
+from datetime import date, timedelta
+
+from flask import Blueprint, jsonify, request
+import mysql.connector
+
+from common.db_pool import get_db_connection
+
+attendance_bp = Blueprint("attendance", __name__)
+
+MAX_RANGE_DAYS = int(os.environ.get("ATTENDANCE_MAX_RANGE_DAYS", 366))
+
+ATTENDANCE_COLUMNS = "a.id, a.employeeId, a.employeeName, a.date, a.checkIn, a.checkOut, a.status"
+
+SUMMARY_GROUPS = {
+    # groupBy -> (expresión de agrupación, JOIN necesario)
+    "day": ("a.date", ""),
+    "department": ("e.department", "JOIN employees e ON e.id = a.employeeId"),
+}
+
+
+def parse_date_range(args):
+    """
+    Acepta ?date=YYYY-MM-DD o ?from=...&to=... (inclusivo). Lanza ValueError si
+    faltan, son inválidas o el rango supera MAX_RANGE_DAYS.
+    """
+    if args.get("date"):
+        day = date.fromisoformat(args["date"])
+        return day, day
+    if not args.get("from") or not args.get("to"):
+        raise ValueError("Provide 'date' or both 'from' and 'to'")
+    start, end = date.fromisoformat(args["from"]), date.fromisoformat(args["to"])
+    if end < start:
+        raise ValueError("'to' must not be before 'from'")
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise ValueError(f"Date range too large (max {MAX_RANGE_DAYS} days)")
+    return start, end
+
+
+def format_time(value):
+    # mysql-connector devuelve las columnas TIME como timedelta
+    if isinstance(value, timedelta):
+        total = int(value.total_seconds())
+        return f"{total // 3600:02d}:{total % 3600 // 60:02d}"
+    return value
+
+
+def record_from_row(row):
+    record = dict(row)
+    record["date"] = record["date"].isoformat()
+    record["checkIn"] = format_time(record["checkIn"])
+    record["checkOut"] = format_time(record["checkOut"])
+    return record
+
+
+def query_attendance(sql, params):
+    conn = get_db_connection()
+    try:
+        with conn.cursor(dictionary=True) as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+    finally:
+        conn.close()
+
+
+@attendance_bp.route('/attendance', methods=['GET'])
+def get_attendance():
+    """Listado por fecha (o rango): ?date=2024-07-28 o ?from=...&to=..."""
+    try:
+        start, end = parse_date_range(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        rows = query_attendance(
+            f"SELECT {ATTENDANCE_COLUMNS} FROM attendance a "
+            "WHERE a.date BETWEEN %s AND %s ORDER BY a.date, a.employeeId",
+            (start, end)
+        )
+        return jsonify([record_from_row(r) for r in rows]), 200
+    except mysql.connector.Error as e:
+        print(f"❌ Database error: {e}")
+        return jsonify({"error": "Database query failed"}), 500
+
+
+@attendance_bp.route('/employees/<int:id>/attendance', methods=['GET'])
+def get_employee_attendance(id):
+    """Historial de un empleado en un rango: ?from=...&to=..."""
+    try:
+        start, end = parse_date_range(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        rows = query_attendance(
+            f"SELECT {ATTENDANCE_COLUMNS} FROM attendance a "
+            "WHERE a.employeeId = %s AND a.date BETWEEN %s AND %s ORDER BY a.date",
+            (id, start, end)
+        )
+        return jsonify([record_from_row(r) for r in rows]), 200
+    except mysql.connector.Error as e:
+        print(f"❌ Database error: {e}")
+        return jsonify({"error": "Database query failed"}), 500
+
+
+@attendance_bp.route('/attendance/summary', methods=['GET'])
+def get_attendance_summary():
+    """Conteos Present/Late/Absent por día o por departamento: ?from=...&to=...&groupBy=day|department"""
+    group_by = request.args.get("groupBy", "day")
+    if group_by not in SUMMARY_GROUPS:
+        return jsonify({"error": f"groupBy must be one of: {', '.join(SUMMARY_GROUPS)}"}), 400
+    try:
+        start, end = parse_date_range(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    group_expr, join = SUMMARY_GROUPS[group_by]
+    try:
+        rows = query_attendance(
+            f"""
+            SELECT {group_expr} AS groupKey,
+                   SUM(a.status = 'Present') AS present,
+                   SUM(a.status = 'Late') AS late,
+                   SUM(a.status = 'Absent') AS absent,
+                   COUNT(*) AS total
+            FROM attendance a
+            {join}
+            WHERE a.date BETWEEN %s AND %s
+            GROUP BY {group_expr}
+            ORDER BY {group_expr}
+            """,
+            (start, end)
+        )
+    except mysql.connector.Error as e:
+        print(f"❌ Database error: {e}")
+        return jsonify({"error": "Database query failed"}), 500
+
+    summary = []
+    for row in rows:
+        key = row["groupKey"]
+        summary.append({
+            group_by: key.isoformat() if isinstance(key, date) else key,
+            # SUM() devuelve DECIMAL en MySQL
+            "present": int(row["present"] or 0),
+            "late": int(row["late"] or 0),
+            "absent": int(row["absent"] or 0),
+            "total": row["total"],
+        })
+    return jsonify(summary), 200
@@ -0,0 +1,191 @@
+"""
+Rutas de proyectos y equipos (tablas 'projects' y 'project_team' de db/migrations).
+
+El listado devuelve cada proyecto con su 'assignedTeamIds' en una única consulta
+JOIN + GROUP_CONCAT, en lugar de una consulta extra por proyecto.
+"""
+from flask import Blueprint, jsonify, request
+import mysql.connector
+
+from common.db_pool import get_db_connection
+
+projects_bp = Blueprint("projects", __name__)
+
+PROJECT_STATUSES = ("Not Started", "In Progress", "Completed")
+
+# GROUP_CONCAT corta sin avisar en group_concat_max_len (1024 bytes por defecto, unos
+# 150 ids); SET_VAR lo sube sólo para esta consulta (1 MiB: decenas de miles de ids)
+PROJECTS_WITH_TEAM_SQL = """
+    SELECT /*+ SET_VAR(group_concat_max_len = 1048576) */
+           p.id, p.name, p.client, p.deadline, p.status, p.progress,
+           GROUP_CONCAT(pt.employeeId ORDER BY pt.employeeId) AS assignedTeamIds
+    FROM projects p
+    LEFT JOIN project_team pt ON pt.projectId = p.id
+    {where}
+    GROUP BY p.id
+    ORDER BY p.id
+"""
+
+
+def project_from_row(row):
+    project = dict(row)
+    if project["deadline"] is not None:
+        project["deadline"] = project["deadline"].isoformat()
+    team = project["assignedTeamIds"]
+    project["assignedTeamIds"] = team.split(",") if team else []
+    return project
+
+
+def fetch_project(cursor, project_id):
+    cursor.execute(PROJECTS_WITH_TEAM_SQL.format(where="WHERE p.id = %s"), (project_id,))
+    row = cursor.fetchone()
+    return project_from_row(row) if row else None
+
+
+def project_values(data):
+    """(name, client, deadline, status) validados. Lanza ValueError si algo falta o es inválido."""
+    if not isinstance(data, dict) or not data.get("name"):
+        raise ValueError("Missing required field: name")
+    status = data.get("status", "Not Started")
+    if status not in PROJECT_STATUSES:
+        raise ValueError(f"status must be one of: {', '.join(PROJECT_STATUSES)}")
+    return (data["name"], data.get("client"), data.get("deadline") or None, status)
+
+
+@projects_bp.route('/projects', methods=['GET'])
+def get_projects():
+    conn = get_db_connection()
+    try:
+        with conn.cursor(dictionary=True) as cursor:
+            cursor.execute(PROJECTS_WITH_TEAM_SQL.format(where=""))
+            projects = [project_from_row(row) for row in cursor.fetchall()]
+        return jsonify(projects), 200
+    except mysql.connector.Error as e:
+        print(f"❌ Database error: {e}")
+        return jsonify({"error": "Database query failed"}), 500
+    finally:
+        conn.close()
+
+
+@projects_bp.route('/projects/<int:id>', methods=['GET'])
+def get_project_by_id(id):
+    conn = get_db_connection()
+    try:
+        with conn.cursor(dictionary=True) as cursor:
+            project = fetch_project(cursor, id)
+        if project:
+            return jsonify(project), 200
+        return jsonify({"message": f"Project with ID {id} not found"}), 404
+    except mysql.connector.Error as e:
+        print(f"❌ Database error: {e}")
+        return jsonify({"error": "Database query failed"}), 500
+    finally:
+        conn.close()
+
+
+@projects_bp.route('/projects', methods=['POST'])
+def add_project():
+    try:
+        values = project_values(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    conn = get_db_connection()
+    try:
+        with conn.cursor(dictionary=True) as cursor:
+            cursor.execute(
+                "INSERT INTO projects (name, client, deadline, status) VALUES (%s, %s, %s, %s)",
+                values
+            )
+            project = fetch_project(cursor, cursor.lastrowid)
+            conn.commit()
+        return jsonify(project), 201
+    except mysql.connector.Error as e:
+        print(f"❌ Database error: {e}")
+        return jsonify({"error": "Failed to insert project"}), 500
+    finally:
+        conn.close()
+
+
+@projects_bp.route('/projects/<int:id>', methods=['PUT'])
+def update_project(id):
+    try:
+        values = project_values(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    conn = get_db_connection()
+    try:
+        with conn.cursor(dictionary=True) as cursor:
+            cursor.execute(
+                "UPDATE projects SET name=%s, client=%s, deadline=%s, status=%s WHERE id=%s",
+                values + (id,)
+            )
+            project = fetch_project(cursor, id)
+            conn.commit()
+        if project is None:
+            return jsonify({"message": f"Project with ID {id} not found"}), 404
+        return jsonify(project), 200
+    except mysql.connector.Error as e:
+        print(f"❌ Database error: {e}")
+        return jsonify({"error": "Failed to update project"}), 500
+    finally:
+        conn.close()
+
+
+@projects_bp.route('/projects/<int:id>/team', methods=['PUT'])
+def update_project_team(id):
+    """
+    Reemplaza el equipo del proyecto aplicando sólo la diferencia de conjuntos
+    (DELETE de los que salen + INSERT multi-fila de los que entran) en una transacción.
+    """
+    data = request.get_json(silent=True) or {}
+    team_ids = data.get("teamIds", []) if isinstance(data, dict) else None
+    # Sin comprobar el tipo, "123" se iteraría como {1, 2, 3}
+    if not isinstance(team_ids, list):
+        return jsonify({"error": "teamIds must be a list of employee ids"}), 400
+    try:
+        desired = {int(emp_id) for emp_id in team_ids}
+    except (TypeError, ValueError):
+        return jsonify({"error": "teamIds must be a list of employee ids"}), 400
+
+    conn = get_db_connection()
+    try:
+        conn.start_transaction()
+        with conn.cursor(dictionary=True) as cursor:
+            # Bloquea el proyecto para serializar actualizaciones concurrentes del mismo equipo
+            cursor.execute("SELECT id FROM projects WHERE id = %s FOR UPDATE", (id,))
+            if cursor.fetchone() is None:
+                conn.rollback()
+                return jsonify({"message": f"Project with ID {id} not found"}), 404
+
+            cursor.execute("SELECT employeeId FROM project_team WHERE projectId = %s", (id,))
+            current = {row["employeeId"] for row in cursor.fetchall()}
+
+            to_remove = sorted(current - desired)
+            to_add = sorted(desired - current)
+
+            if to_remove:
+                cursor.execute(
+                    f"DELETE FROM project_team WHERE projectId = %s AND employeeId IN ({', '.join(['%s'] * len(to_remove))})",
+                    (id, *to_remove)
+                )
+            if to_add:
+                cursor.execute(
+                    f"INSERT INTO project_team (projectId, employeeId) VALUES {', '.join(['(%s, %s)'] * len(to_add))}",
+                    [v for emp_id in to_add for v in (id, emp_id)]
+                )
+
+            project = fetch_project(cursor, id)
+        conn.commit()
+        return jsonify(project), 200
+    except mysql.connector.IntegrityError as e:
+        conn.rollback()
+        print(f"❌ Integrity error: {e}")
+        return jsonify({"error": "teamIds contains unknown employees"}), 400
+    except mysql.connector.Error as e:
+        conn.rollback()
+        print(f"❌ Database error: {e}")
+        return jsonify({"error": "Failed to update project team"}), 500
+    finally:
+        conn.close()
@@ -1,29 +1,189 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
-import time
-import math
+import json
 import os
+import time
+
+from common.admission import AdmissionController, Overloaded
+from common.health import init_health
+from common.metrics import init_metrics
+from common.profiling import init_debug_endpoints
+from common.tracing import init_tracing
+from jobs import JobManager, JobStoreError, QueueFullError, TERMINAL_STATUSES, job_store_from_env
+import workloads
+from workloads import PROFILES
 
 app = Flask(__name__)
 CORS(app)
+init_metrics(app)
+init_debug_endpoints(app)
+init_tracing(app, "mscv-stress")
+health = init_health(app)
 
 # trigger build
 # trigger build
 
 
+# ===========================================
+# Control de admisión (ver common/admission.py)
+# ===========================================
+# Con el pod saturado se rechaza el trabajo nuevo con 503 en vez de ralentizar todo
+admission = AdmissionController.from_env()
+
+
+@app.errorhandler(Overloaded)
+def handle_overloaded(e):
+    return jsonify({"error": str(e), "reason": e.reason}), 503, {"Retry-After": str(e.retry_after)}
+
+
+@app.route("/admission/stats", methods=["GET"])
+def admission_stats():
+    return jsonify(admission.stats()), 200
+
+
 @app.route("/heavy_task")
+@admission.guard
 def heavy_task():
-    """Simula una carga de CPU por N segundos."""
-    seconds = float(request.args.get("seconds", 3))
-    start = time.time()
-    # Cálculo intensivo para consumir CPU
-    while time.time() - start < seconds:
-        math.sqrt(999999)  # operación tonta pero pesada
-    return jsonify({"message": f"Task done after {seconds} seconds!"})
+    """
+    Carga sintética: ?profile=cpu|memory|disk|latency más los parámetros del perfil
+    (ver workloads.py). Sin profile es CPU en un núcleo durante ?seconds=3, como antes.
+    """
+    profile = request.args.get("profile", "cpu")
+    if profile not in PROFILES:
+        return jsonify({"error": f"profile must be one of: {', '.join(PROFILES)}"}), 400
+    parse, run = PROFILES[profile]
+    try:
+        report = run(parse(request.args))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except OSError as e:
+        print(f"❌ Workload '{profile}' failed: {e}")
+        return jsonify({"error": f"Workload failed: {e}"}), 500
+    return jsonify({"message": f"Task done: {profile}", "profile": profile, **report})
+
+# ===========================================
+# Jobs asíncronos (ver jobs.py)
+# ===========================================
+job_manager = JobManager(job_store_from_env())
+
+SSE_INTERVAL = float(os.environ.get("JOBS_SSE_INTERVAL", 0.5))
+SSE_HEARTBEAT = 15  # segundos: mantiene viva la conexión a través de NGINX / LB
+SSE_MAX_JOBS = 100
+
+
+@app.route("/jobs", methods=["POST"])
+@admission.guard
+def submit_job():
+    """{"profile": "cpu", "params": {"cores": 2, "seconds": 10}} -> 202 con el job encolado."""
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    profile = data.get("profile", "cpu")
+    if profile not in PROFILES:
+        return jsonify({"error": f"profile must be one of: {', '.join(PROFILES)}"}), 400
+    parse, _ = PROFILES[profile]
+    params = data.get("params") or {}
+    if not isinstance(params, dict):
+        return jsonify({"error": "'params' must be a JSON object"}), 400
+    try:
+        params = parse(params)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        job = job_manager.submit(profile, params)
+    except QueueFullError as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "5"}
+    except JobStoreError as e:
+        print(f"❌ {e}")
+        return jsonify({"error": "Job store unavailable, try again"}), 503, {"Retry-After": "5"}
+    return jsonify(job), 202, {"Location": f"{request.script_root}/jobs/{job['id']}"}
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    job = job_manager.store.get(job_id)
+    if job is None:
+        return jsonify({"message": f"Job {job_id} not found"}), 404
+    return jsonify(job), 200
+
+
+@app.route("/jobs/<job_id>", methods=["DELETE"])
+def cancel_job(job_id):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({"message": f"Job {job_id} not found"}), 404
+    if job["status"] in TERMINAL_STATUSES:
+        return jsonify(job), 200
+    # La cancelación es cooperativa: el job termina en 'cancelled' en su siguiente tramo
+    return jsonify({"message": f"Cancellation of job {job_id} requested", "id": job_id}), 202
+
+
+@app.route("/jobs/stats", methods=["GET"])
+def job_stats():
+    return jsonify(job_manager.stats()), 200
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.route("/jobs/events", methods=["GET"])
+def job_events():
+    """
+    Server-Sent Events con el estado de uno o varios jobs: ?ids=a,b,c
+    (un único stream para todos, en lugar de un EventSource por job).
+    Emite 'job' cada vez que cambia uno y 'done' cuando todos han terminado.
+    """
+    ids = [job_id for job_id in request.args.get("ids", "").split(",") if job_id][:SSE_MAX_JOBS]
+    if not ids:
+        return jsonify({"error": "Provide the job ids to follow: ?ids=a,b,c"}), 400
+    store = job_manager.store
+
+    def stream():
+        last_seen, pending = {}, set(ids)
+        last_sent = time.monotonic()
+        while pending:
+            for job_id in list(pending):
+                job = store.get(job_id)
+                if job is None:
+                    pending.discard(job_id)
+                    yield sse_event("missing", {"id": job_id})
+                    continue
+                if job != last_seen.get(job_id):
+                    last_seen[job_id] = job
+                    last_sent = time.monotonic()
+                    yield sse_event("job", job)
+                if job["status"] in TERMINAL_STATUSES:
+                    pending.discard(job_id)
+            if not pending:
+                break
+            if time.monotonic() - last_sent >= SSE_HEARTBEAT:
+                last_sent = time.monotonic()
+                yield ": keep-alive\n\n"
+            time.sleep(SSE_INTERVAL)
+        yield sse_event("done", {"ids": ids})
+
+    return Response(stream(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # NGINX no debe acumular el stream
+    })
+
 
 @app.route("/")
 def home():
     return jsonify({"status": "ok", "message": "mscv-stress running"})
 
+
+# Calentamiento del worker (GET /readyz espera a que termine)
+@health.warmup("workload_pool")
+def warm_workload_pool():
+    workloads.warm_up()
+
+
+@health.warmup("job_store", required=False)
+def warm_job_store():
+    job_manager.store.get("warm-up")
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5003, debug=False)
@@ -0,0 +1,223 @@
+"""
+Modo asíncrono de mscv-stress: los perfiles de workloads.py se ejecutan como jobs.
+
+POST /jobs encola el job en un pool de hilos acotado de este proceso y responde
+al momento con su id; el estado se consulta con GET /jobs/<id>, se sigue por SSE
+en /jobs/events?ids=... y se cancela con DELETE /jobs/<id> (el perfil lo
+comprueba entre tramos de trabajo y se detiene limpiamente).
+
+El estado de los jobs vive en un JobStore (JOBS_BACKEND):
+  memory  dict del proceso: sólo vale con un worker y una réplica (desarrollo).
+  redis   Redis compartido (JOBS_REDIS_URL): cualquier réplica puede consultar,
+          seguir o cancelar un job que se ejecuta en otra.
+Sólo el proceso que ejecuta un job escribe su registro; DELETE únicamente deja
+una marca de cancelación que ese proceso lee.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from workloads import PROFILES, WorkloadCancelled
+
+JOBS_WORKERS = int(os.environ.get("JOBS_WORKERS", 4))
+JOBS_MAX_QUEUE = int(os.environ.get("JOBS_MAX_QUEUE", 32))
+JOBS_TTL = int(os.environ.get("JOBS_TTL", 3600))
+# Mínimo entre escrituras de progreso al store
+PROGRESS_INTERVAL = 0.25
+
+TERMINAL_STATUSES = ("succeeded", "failed", "cancelled")
+
+
+class QueueFullError(Exception):
+    """Hay JOBS_MAX_QUEUE jobs en cola o en curso en este proceso."""
+
+
+class JobStoreError(Exception):
+    """El JobStore (p. ej. Redis) no aceptó el job; no se encoló nada."""
+
+
+# ----------------------------------------------------------------------
+# Stores
+# ----------------------------------------------------------------------
+class MemoryJobStore:
+    def __init__(self, ttl=JOBS_TTL):
+        self.ttl = ttl
+        self._jobs = {}  # id -> (job, expires_at)
+        self._cancelled = set()
+        self._lock = threading.Lock()
+
+    def save(self, job):
+        now = time.monotonic()
+        with self._lock:
+            self._jobs[job["id"]] = (dict(job), now + self.ttl)
+            for job_id in [k for k, (_, expires_at) in self._jobs.items() if expires_at < now]:
+                del self._jobs[job_id]
+                self._cancelled.discard(job_id)
+
+    def get(self, job_id):
+        with self._lock:
+            item = self._jobs.get(job_id)
+            return dict(item[0]) if item and item[1] >= time.monotonic() else None
+
+    def request_cancel(self, job_id):
+        with self._lock:
+            self._cancelled.add(job_id)
+
+    def cancel_requested(self, job_id):
+        with self._lock:
+            return job_id in self._cancelled
+
+
+class RedisJobStore:
+    """Requiere el paquete `redis`."""
+
+    def __init__(self, url, ttl=JOBS_TTL):
+        import redis  # dependencia opcional: sólo con JOBS_BACKEND=redis
+
+        self.ttl = ttl
+        self.client = redis.Redis.from_url(url, decode_responses=True, socket_timeout=2)
+
+    def save(self, job):
+        self.client.set(f"stress:job:{job['id']}", json.dumps(job), ex=self.ttl)
+
+    def get(self, job_id):
+        raw = self.client.get(f"stress:job:{job_id}")
+        return json.loads(raw) if raw else None
+
+    def request_cancel(self, job_id):
+        self.client.set(f"stress:job:{job_id}:cancel", 1, ex=self.ttl)
+
+    def cancel_requested(self, job_id):
+        return bool(self.client.exists(f"stress:job:{job_id}:cancel"))
+
+
+def job_store_from_env():
+    backend = os.environ.get("JOBS_BACKEND", "memory").lower()
+    if backend == "redis":
+        return RedisJobStore(os.environ.get("JOBS_REDIS_URL", "redis://redis:6379/0"))
+    if backend != "memory":
+        raise ValueError("JOBS_BACKEND must be one of: memory, redis")
+    return MemoryJobStore()
+
+
+# ----------------------------------------------------------------------
+# Ejecución
+# ----------------------------------------------------------------------
+class JobProgress:
+    """`progress` que reciben los perfiles: guarda el avance y corta si se pidió cancelar."""
+
+    def __init__(self, store, job):
+        self.store = store
+        self.job = job
+        self._last_write = 0.0
+
+    def check(self, fraction):
+        now = time.monotonic()
+        if now - self._last_write >= PROGRESS_INTERVAL:
+            self._last_write = now
+            if self.store.cancel_requested(self.job["id"]):
+                raise WorkloadCancelled()
+            self.job["progress"] = round(min(fraction, 1.0), 3)
+            self.store.save(self.job)
+
+
+class JobManager:
+    def __init__(self, store, workers=JOBS_WORKERS, max_queue=JOBS_MAX_QUEUE):
+        self.store = store
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._executor_pid = None
+        self._active = 0  # en cola + en curso en este proceso
+        self._lock = threading.Lock()
+        # Contadores
+        self.submitted = 0
+        self.rejected = 0
+        self.finished = {status: 0 for status in TERMINAL_STATUSES}
+
+    def _get_executor(self):
+        # Se crea en cada worker de gunicorn tras el fork (preload_app)
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="stress-job")
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def submit(self, profile, params):
+        """Encola el perfil con sus parámetros ya validados. Lanza QueueFullError o JobStoreError."""
+        with self._lock:
+            if self._active >= self.max_queue:
+                self.rejected += 1
+                raise QueueFullError(f"Job queue is full ({self.max_queue} jobs)")
+            self._active += 1
+            self.submitted += 1
+            executor = self._get_executor()
+
+        job = {
+            "id": uuid.uuid4().hex,
+            "profile": profile,
+            "params": params,
+            "status": "queued",
+            "progress": 0.0,
+            "createdAt": time.time(),
+            "startedAt": None,
+            "finishedAt": None,
+            "result": None,
+            "error": None,
+        }
+        try:
+            self.store.save(job)
+            executor.submit(self._run, job)
+        except Exception as e:
+            # Sin esto, cada fallo del store se quedaría con un hueco de la cola para siempre
+            with self._lock:
+                self._active -= 1
+                self.submitted -= 1
+            raise JobStoreError(f"Could not enqueue job: {e}") from e
+        return job
+
+    def _run(self, job):
+        try:
+            if self.store.cancel_requested(job["id"]):
+                job["status"] = "cancelled"
+                return
+            job["status"], job["startedAt"] = "running", time.time()
+            self.store.save(job)
+
+            _, run = PROFILES[job["profile"]]
+            job["result"] = run(job["params"], JobProgress(self.store, job))
+            job["status"], job["progress"] = "succeeded", 1.0
+        except WorkloadCancelled:
+            job["status"] = "cancelled"
+        except Exception as e:
+            print(f"❌ Job {job['id']} ({job['profile']}) failed: {e}")
+            job["status"], job["error"] = "failed", str(e)
+        finally:
+            job["finishedAt"] = time.time()
+            try:
+                self.store.save(job)
+            except Exception as e:
+                print(f"❌ Could not save job {job['id']}: {e}")
+            with self._lock:
+                self._active -= 1
+                self.finished[job["status"]] += 1
+
+    def cancel(self, job_id):
+        """Pide cancelar un job. Devuelve el job (o None si no existe)."""
+        job = self.store.get(job_id)
+        if job is not None and job["status"] not in TERMINAL_STATUSES:
+            self.store.request_cancel(job_id)
+        return job
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "active": self._active,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "finished": dict(self.finished),
+            }
@@ -0,0 +1,284 @@
+"""
+Perfiles de carga de mscv-stress para validar HPA y VPA.
+
+Cada perfil recibe los parámetros del query string, hace el trabajo y devuelve
+lo que realmente hizo (no sólo lo que se pidió), para comparar con las
+métricas del clúster:
+
+    cpu      ?cores=N&seconds=S        bucle de CPU en N procesos del pool
+    memory   ?mib=X&hold=T             reserva X MiB, toca cada página y las retiene T s
+    disk     ?mib=X&blockKib=B&fsync=1 escribe y relee un fichero temporal de X MiB
+    latency  ?ms=M&jitterMs=J          espera M ms (± J) sin consumir CPU
+
+Los límites (STRESS_MAX_*) evitan que un request tumbe el pod más allá de lo
+que se quiere probar.
+
+Cada perfil se separa en parse (valida el query string o el JSON de un job) y
+run (hace el trabajo). run recibe un `progress` al que informa del avance y que
+lanza WorkloadCancelled si se pidió cancelar el job (ver jobs.py).
+"""
+import multiprocessing
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+MIB = 1024 * 1024
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+MAX_SECONDS = float(os.environ.get("STRESS_MAX_SECONDS", 60))
+MAX_CORES = int(os.environ.get("STRESS_MAX_CORES", os.cpu_count() or 1))
+MAX_MEMORY_MIB = int(os.environ.get("STRESS_MAX_MEMORY_MIB", 1024))
+MAX_DISK_MIB = int(os.environ.get("STRESS_MAX_DISK_MIB", 1024))
+DISK_DIR = os.environ.get("STRESS_DISK_DIR", tempfile.gettempdir())
+
+
+class WorkloadCancelled(Exception):
+    """El job se canceló mientras corría."""
+
+
+class NoProgress:
+    """Progreso de una llamada síncrona a /heavy_task: no informa ni se cancela."""
+
+    def check(self, fraction):
+        pass
+
+
+NO_PROGRESS = NoProgress()
+
+
+def bounded(args, name, default, maximum, cast=float, minimum=0):
+    """Lee un parámetro numérico; lanza ValueError si no es válido o se sale de [minimum, maximum]."""
+    try:
+        value = cast(args.get(name, default))
+    except (TypeError, ValueError):
+        raise ValueError(f"'{name}' must be a number")
+    if not minimum <= value <= maximum:
+        raise ValueError(f"'{name}' must be between {minimum} and {maximum}")
+    return value
+
+
+# ----------------------------------------------------------------------
+# CPU
+# ----------------------------------------------------------------------
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor, _executor_pid
+    with _executor_lock:
+        # Se crea en cada worker de gunicorn tras el fork (preload_app)
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ProcessPoolExecutor(
+                max_workers=MAX_CORES,
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+            _executor_pid = os.getpid()
+        return _executor
+
+
+# Tramo de trabajo por envío al pool: cada cuánto se informa el progreso y se mira si cancelar
+SLICE_SECONDS = 0.5
+
+
+def _burn(seconds):
+    """Corre en un proceso del pool: aritmética en bucle, mirando el reloj cada 10k iteraciones."""
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    deadline = start_wall + seconds
+    iterations, x = 0, 0.0
+    while time.perf_counter() < deadline:
+        for i in range(10_000):
+            x += (i * i) ** 0.5
+        iterations += 10_000
+    return {
+        "iterations": iterations,
+        "wall_time": time.perf_counter() - start_wall,
+        "cpu_time": time.process_time() - start_cpu,
+    }
+
+
+def parse_cpu(args):
+    return {
+        "cores": bounded(args, "cores", 1, MAX_CORES, int, minimum=1),
+        "seconds": bounded(args, "seconds", 3, MAX_SECONDS),
+    }
+
+
+def run_cpu(params, progress=NO_PROGRESS):
+    cores, seconds = params["cores"], params["seconds"]
+    executor = _get_executor()
+    per_core = [{"iterations": 0, "wall_time": 0.0, "cpu_time": 0.0} for _ in range(cores)]
+
+    start = time.perf_counter()
+    done = 0.0
+    while done < seconds:
+        # Los N núcleos trabajan el mismo tramo en paralelo; entre tramos se informa y se puede cancelar
+        slice_seconds = min(SLICE_SECONDS, seconds - done)
+        futures = [executor.submit(_burn, slice_seconds) for _ in range(cores)]
+        for totals, future in zip(per_core, futures):
+            for key, value in future.result().items():
+                totals[key] += value
+        done += slice_seconds
+        progress.check(done / seconds if seconds else 1.0)
+    wall = time.perf_counter() - start
+
+    iterations = sum(r["iterations"] for r in per_core)
+    cpu_time = sum(r["cpu_time"] for r in per_core)
+    return {
+        "cores": cores,
+        "seconds": seconds,
+        "iterations": iterations,
+        "iterations_per_second": iterations / wall if wall else 0.0,
+        "wall_time": wall,
+        "cpu_time": cpu_time,
+        # < 1 si el pod está limitado por cgroups (limits.cpu) o compite con otros pods
+        "cpu_utilization": cpu_time / (wall * cores) if wall else 0.0,
+        "per_core": per_core,
+    }
+
+
+# ----------------------------------------------------------------------
+# Memoria
+# ----------------------------------------------------------------------
+def parse_memory(args):
+    return {
+        "mib": bounded(args, "mib", 64, MAX_MEMORY_MIB, int, minimum=1),
+        "hold": bounded(args, "hold", 5, MAX_SECONDS),
+    }
+
+
+def sleep_with_progress(seconds, progress, start_fraction=0.0):
+    """Duerme en tramos cortos informando del avance de start_fraction a 1."""
+    deadline = time.perf_counter() + seconds
+    while (remaining := deadline - time.perf_counter()) > 0:
+        time.sleep(min(remaining, SLICE_SECONDS))
+        elapsed = seconds - max(0.0, deadline - time.perf_counter())
+        progress.check(start_fraction + (1 - start_fraction) * (elapsed / seconds))
+
+
+def run_memory(params, progress=NO_PROGRESS):
+    mib, hold = params["mib"], params["hold"]
+
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    block = bytearray(mib * MIB)
+    # bytearray() pide memoria a cero, que el kernel no respalda hasta escribirla:
+    # se escribe un byte por página para que cuente en el RSS del contenedor
+    for offset in range(0, len(block), PAGE_SIZE):
+        block[offset] = 1
+    touched = len(block)
+    allocate_time = time.perf_counter() - start_wall
+    progress.check(0.1)
+
+    try:
+        sleep_with_progress(hold, progress, start_fraction=0.1)
+    finally:
+        del block
+    return {
+        "mib": mib,
+        "bytes_allocated": mib * MIB,
+        "bytes_touched": touched,
+        "pages_touched": touched // PAGE_SIZE,
+        "allocate_time": allocate_time,
+        "held_seconds": hold,
+        "wall_time": time.perf_counter() - start_wall,
+        "cpu_time": time.process_time() - start_cpu,
+    }
+
+
+# ----------------------------------------------------------------------
+# Disco
+# ----------------------------------------------------------------------
+def parse_disk(args):
+    return {
+        "mib": bounded(args, "mib", 64, MAX_DISK_MIB, int, minimum=1),
+        "block_kib": bounded(args, "blockKib", 1024, 16 * 1024, int, minimum=4),
+        "fsync": str(args.get("fsync", "1")).lower() not in ("0", "false", "no"),
+    }
+
+
+def run_disk(params, progress=NO_PROGRESS):
+    mib, block_kib, fsync = params["mib"], params["block_kib"], params["fsync"]
+
+    block = os.urandom(block_kib * 1024)
+    total = mib * MIB
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    with tempfile.NamedTemporaryFile(dir=DISK_DIR, prefix="stress-") as f:
+        written = 0
+        while written < total:
+            written += f.write(block[:min(len(block), total - written)])
+            progress.check(0.5 * written / total)
+        f.flush()
+        if fsync:
+            os.fsync(f.fileno())
+        write_time = time.perf_counter() - start_wall
+
+        f.seek(0)
+        read_start = time.perf_counter()
+        read = 0
+        while chunk := f.read(len(block)):
+            read += len(chunk)
+            progress.check(0.5 + 0.5 * read / total)
+        read_time = time.perf_counter() - read_start
+
+    return {
+        "mib": mib,
+        "block_kib": block_kib,
+        "fsync": fsync,
+        "bytes_written": written,
+        "bytes_read": read,
+        "write_mib_per_second": written / MIB / write_time if write_time else 0.0,
+        # La relectura suele salir de la page cache: mide memoria más que disco
+        "read_mib_per_second": read / MIB / read_time if read_time else 0.0,
+        "wall_time": time.perf_counter() - start_wall,
+        "cpu_time": time.process_time() - start_cpu,
+    }
+
+
+# ----------------------------------------------------------------------
+# Latencia
+# ----------------------------------------------------------------------
+def parse_latency(args):
+    ms = bounded(args, "ms", 200, MAX_SECONDS * 1000)
+    return {"ms": ms, "jitter_ms": bounded(args, "jitterMs", 0, ms)}
+
+
+def run_latency(params, progress=NO_PROGRESS):
+    ms, jitter_ms = params["ms"], params["jitter_ms"]
+
+    target = max(0.0, ms + random.uniform(-jitter_ms, jitter_ms))
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    sleep_with_progress(target / 1000, progress)
+    wall = time.perf_counter() - start_wall
+    return {
+        "requested_ms": ms,
+        "target_ms": target,
+        "actual_ms": wall * 1000,
+        "wall_time": wall,
+        "cpu_time": time.process_time() - start_cpu,
+    }
+
+
+# perfil -> (parse, run)
+PROFILES = {
+    "cpu": (parse_cpu, run_cpu),
+    "memory": (parse_memory, run_memory),
+    "disk": (parse_disk, run_disk),
+    "latency": (parse_latency, run_latency),
+}
+
+
+def warm_up():
+    """Arranca los MAX_CORES procesos del pool antes del primer /heavy_task."""
+    list(_get_executor().map(_burn, [0] * MAX_CORES))
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None and _executor_pid == os.getpid():
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,57 @@
+-- ===========================================
+-- V001: Esquema inicial (antes db/init.sql, sin DROP TABLE)
+-- ===========================================
+
+-- 1. Usuarios (login)
+CREATE TABLE IF NOT EXISTS users (
+  id INT AUTO_INCREMENT PRIMARY KEY,
+  name VARCHAR(100) NOT NULL,
+  email VARCHAR(100) UNIQUE NOT NULL,
+  password VARCHAR(255) NOT NULL,
+  role VARCHAR(50) DEFAULT 'User',
+  avatarUrl VARCHAR(255),
+  department VARCHAR(100)
+);
+
+-- 2. Empleados
+CREATE TABLE IF NOT EXISTS employees (
+  id INT AUTO_INCREMENT PRIMARY KEY,
+  name VARCHAR(100) NOT NULL,
+  email VARCHAR(100) NOT NULL,
+  role VARCHAR(100),
+  department VARCHAR(100),
+  startDate DATE,
+  status ENUM('Active', 'OnLeave', 'Terminated') DEFAULT 'Active',
+  avatarUrl VARCHAR(255)
+);
+
+-- 3. Asistencia
+CREATE TABLE IF NOT EXISTS attendance (
+  id INT AUTO_INCREMENT PRIMARY KEY,
+  employeeId INT NOT NULL,
+  employeeName VARCHAR(100),
+  date DATE,
+  checkIn TIME,
+  checkOut TIME,
+  status ENUM('Present', 'Late', 'Absent') DEFAULT 'Present',
+  FOREIGN KEY (employeeId) REFERENCES employees(id)
+);
+
+-- 4. Proyectos
+CREATE TABLE IF NOT EXISTS projects (
+  id INT AUTO_INCREMENT PRIMARY KEY,
+  name VARCHAR(150) NOT NULL,
+  client VARCHAR(100),
+  deadline DATE,
+  status ENUM('Not Started', 'In Progress', 'Completed') DEFAULT 'Not Started',
+  progress INT DEFAULT 0
+);
+
+-- 5. Relación proyecto-empleado
+CREATE TABLE IF NOT EXISTS project_team (
+  projectId INT NOT NULL,
+  employeeId INT NOT NULL,
+  PRIMARY KEY (projectId, employeeId),
+  FOREIGN KEY (projectId) REFERENCES projects(id),
+  FOREIGN KEY (employeeId) REFERENCES employees(id)
+);
@@ -0,0 +1,45 @@
+-- ===========================================
+-- V002: Datos iniciales
+-- Ids explícitos + INSERT IGNORE: re-ejecutarla no duplica filas.
+-- ===========================================
+
+INSERT IGNORE INTO users (id, name, email, password, role, avatarUrl, department)
+VALUES
+  (1, 'Admin User', 'admin@adv.com', 'password', 'Admin', 'https://picsum.photos/id/237/200/200', 'Management'),
+  (2, 'Alice', 'alice@example.com', '1234', 'Employee', 'https://picsum.photos/id/1005/200/200', 'Creative'),
+  (3, 'Bob', 'bob@example.com', '5678', 'Employee', 'https://picsum.photos/id/1011/200/200', 'Technology');
+
+INSERT IGNORE INTO employees (id, name, email, role, department, startDate, status, avatarUrl)
+VALUES
+  (1, 'John Doe', 'john.doe@example.com', 'Creative Director', 'Creative', '2022-01-15', 'Active', 'https://picsum.photos/id/1005/200/200'),
+  (2, 'Jane Smith', 'jane.smith@example.com', 'Account Manager', 'Client Services', '2021-11-20', 'Active', 'https://picsum.photos/id/1011/200/200'),
+  (3, 'Mike Johnson', 'mike.johnson@example.com', 'Senior Developer', 'Technology', '2020-05-10', 'OnLeave', 'https://picsum.photos/id/1025/200/200'),
+  (4, 'Emily Brown', 'emily.brown@example.com', 'Graphic Designer', 'Creative', '2023-02-01', 'Active', 'https://picsum.photos/id/1012/200/200'),
+  (5, 'David Wilson', 'david.wilson@example.com', 'HR Manager', 'Administration', '2019-08-12', 'Active', 'https://picsum.photos/id/1027/200/200'),
+  (6, 'Sarah Clark', 'sarah.clark@example.com', 'Copywriter', 'Creative', '2023-07-22', 'Active', 'https://picsum.photos/id/1013/200/200'),
+  (7, 'Robert Turner', 'robert.turner@example.com', 'Media Buyer', 'Media', '2022-09-05', 'Terminated', 'https://picsum.photos/id/1029/200/200'),
+  (8, 'Olivia Martinez', 'olivia.martinez@example.com', 'Social Media Manager', 'Digital', '2022-03-18', 'Active', 'https://picsum.photos/id/1014/200/200');
+
+INSERT IGNORE INTO attendance (id, employeeId, employeeName, date, checkIn, checkOut, status) VALUES
+  (1, 1, 'John Doe', '2024-07-28', '09:05', '17:30', 'Present'),
+  (2, 2, 'Jane Smith', '2024-07-28', '09:15', '17:45', 'Late'),
+  (3, 3, 'Mike Johnson', '2024-07-28', NULL, NULL, 'Absent'),
+  (4, 4, 'Emily Brown', '2024-07-28', '08:55', '17:20', 'Present'),
+  (5, 1, 'John Doe', '2024-07-27', '09:00', '17:25', 'Present'),
+  (6, 2, 'Jane Smith', '2024-07-27', '09:02', '17:33', 'Present'),
+  (7, 5, 'David Wilson', '2024-07-28', '08:45', '18:00', 'Present'),
+  (8, 6, 'Sarah Clark', '2024-07-28', NULL, NULL, 'Absent');
+
+INSERT IGNORE INTO projects (id, name, client, deadline, status, progress)
+VALUES
+  (1, 'QuantumLeap Campaign', 'Innovate Corp', '2024-09-30', 'In Progress', 75),
+  (2, 'Nebula App Launch', 'TechFrontier', '2024-10-15', 'In Progress', 40),
+  (3, 'EcoConnect Branding', 'GreenSolutions', '2024-08-25', 'Completed', 100),
+  (4, 'Starlight Socials', 'Momentum Media', '2024-11-01', 'Not Started', 0);
+
+-- Asignaciones basadas en MOCK_PROJECTS
+INSERT IGNORE INTO project_team (projectId, employeeId) VALUES
+  (1, 1), (1, 4), (1, 6),
+  (2, 2), (2, 3), (2, 8),
+  (3, 1), (3, 2), (3, 4),
+  (4, 8);
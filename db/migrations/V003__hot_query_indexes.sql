@@ -0,0 +1,19 @@
+-- ===========================================
+-- V003: Índices para las consultas calientes de mscv-employee
+-- InnoDB añade la PK (id) al final de cada índice secundario, así que los
+-- filtros por department/status se sirven ya ordenados para la paginación keyset.
+-- ===========================================
+
+-- Búsquedas por email. No es UNIQUE: en una base con emails repetidos el ALTER
+-- fallaría y con él el Job de migración, del que dependen todos los Deployments.
+-- Hacerlo único exige deduplicar antes los datos, en una migración aparte.
+CREATE INDEX idx_employees_email ON employees (email);
+
+-- GET /employees?department=...&status=...&startDateFrom=...
+CREATE INDEX idx_employees_department ON employees (department);
+CREATE INDEX idx_employees_status ON employees (status);
+CREATE INDEX idx_employees_start_date ON employees (startDate);
+
+-- GET /attendance?date=..., /attendance/summary y /employees/<id>/attendance
+CREATE INDEX idx_attendance_date_employee ON attendance (date, employeeId);
+CREATE INDEX idx_attendance_employee_date ON attendance (employeeId, date);
@@ -1,4 +1,4 @@
-import axios from 'axios';
+import axios, { AxiosError, InternalAxiosRequestConfig } from 'axios';
 
 const api = axios.create({
   // The baseURL is intentionally omitted because NGINX routes based on path prefixes.
@@ -8,4 +8,65 @@ const api = axios.create({
   },
 });
 
+export const ACCESS_TOKEN_KEY = 'accessToken';
+export const REFRESH_TOKEN_KEY = 'refreshToken';
+
+// Sends the signed session token issued by /auth/login on every request.
+api.interceptors.request.use((config) => {
+  const token = sessionStorage.getItem(ACCESS_TOKEN_KEY);
+  if (token) {
+    config.headers.Authorization = `Bearer ${token}`;
+  }
+  return config;
+});
+
+export const clearSession = () => {
+  sessionStorage.removeItem(ACCESS_TOKEN_KEY);
+  sessionStorage.removeItem(REFRESH_TOKEN_KEY);
+  sessionStorage.removeItem('user');
+  localStorage.removeItem('user');
+};
+
+// Concurrent 401s share a single /auth/token/refresh call.
+let refreshInFlight: Promise<string> | null = null;
+
+const refreshAccessToken = (): Promise<string> => {
+  if (!refreshInFlight) {
+    const refreshToken = sessionStorage.getItem(REFRESH_TOKEN_KEY);
+    // Plain axios: the refresh call must not go through these interceptors.
+    refreshInFlight = (refreshToken
+      ? axios.post('/auth/token/refresh', { refreshToken }).then((response) => {
+          sessionStorage.setItem(ACCESS_TOKEN_KEY, response.data.accessToken);
+          sessionStorage.setItem(REFRESH_TOKEN_KEY, response.data.refreshToken);
+          return response.data.accessToken as string;
+        })
+      : Promise.reject(new Error('No refresh token'))
+    ).finally(() => {
+      refreshInFlight = null;
+    });
+  }
+  return refreshInFlight;
+};
+
+// Access tokens expire after 15 minutes: on a 401, refresh once and retry the request.
+// If the refresh fails too, the session is over: clear it and go back to the login page.
+api.interceptors.response.use(undefined, async (error: AxiosError) => {
+  const config = error.config as (InternalAxiosRequestConfig & { _retried?: boolean }) | undefined;
+  const isAuthCall = config?.url?.startsWith('/auth/login') || config?.url?.startsWith('/auth/token/refresh');
+  if (error.response?.status !== 401 || !config || config._retried || isAuthCall) {
+    return Promise.reject(error);
+  }
+  config._retried = true;
+  try {
+    const token = await refreshAccessToken();
+    config.headers.Authorization = `Bearer ${token}`;
+  } catch {
+    clearSession();
+    window.location.hash = '#/login';
+    window.location.reload();
+    return Promise.reject(error);
+  }
+  return api(config);
+});
+
 export default api;
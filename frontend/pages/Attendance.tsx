@@ -1,7 +1,8 @@
 
-import React, { useState, useMemo } from 'react';
+import React, { useState, useEffect } from 'react';
 import { MOCK_ATTENDANCE } from '../constants';
 import { AttendanceRecord } from '../types';
+import * as attendanceService from '../services/attendanceService';
 
 const statusColorMap: Record<AttendanceRecord['status'], string> = {
   Present: 'bg-green-100 text-green-800 dark:bg-green-900 dark:text-green-200',
@@ -10,12 +11,25 @@ const statusColorMap: Record<AttendanceRecord['status'], string> = {
 };
 
 const Attendance: React.FC = () => {
-  const [attendanceRecords] = useState<AttendanceRecord[]>(MOCK_ATTENDANCE);
   const [selectedDate, setSelectedDate] = useState(new Date().toISOString().split('T')[0]);
+  const [filteredRecords, setFilteredRecords] = useState<AttendanceRecord[]>([]);
 
-  const filteredRecords = useMemo(() => {
-    return attendanceRecords.filter(record => record.date === selectedDate);
-  }, [attendanceRecords, selectedDate]);
+  useEffect(() => {
+    let cancelled = false;
+    const loadAttendance = async () => {
+      try {
+        const records = await attendanceService.getAttendanceByDate(selectedDate);
+        if (!cancelled) setFilteredRecords(records);
+      } catch (error) {
+        console.error("Failed to fetch attendance from backend, loading mock data. Error:", error);
+        if (!cancelled) setFilteredRecords(MOCK_ATTENDANCE.filter(record => record.date === selectedDate));
+      }
+    };
+    loadAttendance();
+    return () => {
+      cancelled = true;
+    };
+  }, [selectedDate]);
 
   return (
     <div className="bg-white dark:bg-dark-accent p-6 rounded-lg shadow-md">
@@ -47,8 +61,8 @@ const Attendance: React.FC = () => {
                   {record.employeeName}
                 </td>
                 <td className="px-6 py-4">{new Date(record.date).toLocaleDateString()}</td>
-                <td className="px-6 py-4">{record.checkIn}</td>
-                <td className="px-6 py-4">{record.checkOut}</td>
+                <td className="px-6 py-4">{record.checkIn || '-'}</td>
+                <td className="px-6 py-4">{record.checkOut || '-'}</td>
                 <td className="px-6 py-4 text-center">
                   <span className={`px-3 py-1 text-xs font-semibold rounded-full ${statusColorMap[record.status]}`}>
                     {record.status}
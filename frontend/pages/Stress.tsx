@@ -1,6 +1,8 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Link } from 'react-router-dom';
-import { runStressTest } from '../services/stressService';
+import { StressJob, cancelStressJob, submitStressJob, watchStressJobs } from '../services/stressService';
+
+const JOB_COUNT = 10;
 
 // Simple Toast component for notifications
 const Toast = ({ message, type, onDismiss }: { message: string, type: 'success' | 'error', onDismiss: () => void }) => {
@@ -26,28 +28,66 @@ const Toast = ({ message, type, onDismiss }: { message: string, type: 'success'
 const StressProof = () => {
   const [loading, setLoading] = useState(false);
   const [notification, setNotification] = useState<{ message: string, type: 'success' | 'error' } | null>(null);
+  const [jobs, setJobs] = useState<Record<string, StressJob>>({});
+  const stopWatching = useRef<(() => void) | null>(null);
+
+  useEffect(() => () => stopWatching.current?.(), []);
 
   const simulateStress = async () => {
     setLoading(true);
     setNotification(null);
 
     try {
-      await runStressTest();
-      setNotification({
-        type: 'success',
-        message: '🚀 Stress test completed successfully!',
-      });
+      // Jobs are queued server-side; progress arrives over a single SSE stream
+      const results = await Promise.allSettled(
+        Array.from({ length: JOB_COUNT }, () => submitStressJob('cpu', { cores: 1, seconds: 10 }))
+      );
+      // A saturated service sheds submissions with 503 + Retry-After: keep the accepted ones
+      const submitted = results
+        .filter((r): r is PromiseFulfilledResult<StressJob> => r.status === 'fulfilled')
+        .map((r) => r.value);
+      if (submitted.length === 0) {
+        throw new Error('All stress jobs were rejected by the service');
+      }
+      if (submitted.length < JOB_COUNT) {
+        setNotification({
+          type: 'error',
+          message: `⚠️ Service overloaded: ${JOB_COUNT - submitted.length} of ${JOB_COUNT} jobs were rejected.`,
+        });
+      }
+      setJobs(Object.fromEntries(submitted.map((job) => [job.id, job])));
+      stopWatching.current = watchStressJobs(
+        submitted.map((job) => job.id),
+        (job) => setJobs((current) => ({ ...current, [job.id]: job })),
+        () => {
+          setLoading(false);
+          setNotification({
+            type: 'success',
+            message: '🚀 Stress test completed successfully!',
+          });
+        },
+      );
     } catch (error) {
       console.error("Error during stress simulation:", error);
       setNotification({
         type: 'error',
         message: '❌ An error occurred during the simulation.',
       });
-    } finally {
       setLoading(false);
     }
   };
 
+  const cancelStress = async () => {
+    const active = Object.values(jobs).filter((job) => job.status === 'queued' || job.status === 'running');
+    await Promise.all(active.map((job) => cancelStressJob(job.id)));
+  };
+
+  const jobList = Object.values(jobs);
+  const overallProgress = jobList.length
+    ? jobList.reduce((sum, job) => sum + job.progress, 0) / jobList.length
+    : 0;
+  const finished = jobList.filter((job) => !['queued', 'running'].includes(job.status)).length;
+
   return (
     <div className="min-h-screen bg-gradient-to-br from-gray-900 to-blue-900 text-white">
       {notification && <Toast message={notification.message} type={notification.type} onDismiss={() => setNotification(null)} />}
@@ -62,7 +102,7 @@ const StressProof = () => {
           🧠 Stress Simulator
         </h2>
         <p className="text-lg md:text-xl text-gray-300 max-w-3xl mb-8">
-          This tool sends 50 simultaneous requests to the stress microservice to test system load and concurrency.
+          This tool queues {JOB_COUNT} CPU jobs on the stress microservice to test system load and autoscaling.
         </p>
         <button
           className="bg-red-600 text-white font-bold py-4 px-8 rounded-lg hover:bg-red-700 transition duration-300 text-lg disabled:bg-gray-500 disabled:cursor-not-allowed flex items-center"
@@ -81,6 +121,21 @@ const StressProof = () => {
             'Initiate Stress Test 🚀'
           )}
         </button>
+        {jobList.length > 0 && (
+          <div className="w-full max-w-xl mt-8">
+            <div className="w-full bg-gray-700 rounded-full h-4">
+              <div className="bg-red-600 h-4 rounded-full" style={{ width: `${Math.round(overallProgress * 100)}%` }}></div>
+            </div>
+            <p className="text-gray-300 mt-2">
+              {finished} / {jobList.length} jobs finished ({Math.round(overallProgress * 100)}%)
+            </p>
+            {loading && (
+              <button onClick={cancelStress} className="mt-4 underline text-gray-300 hover:text-white">
+                Cancel
+              </button>
+            )}
+          </div>
+        )}
       </main>
     </div>
   );
@@ -0,0 +1,17 @@
+import api from '../config/axiosConfig';
+import { AttendanceRecord } from '../types';
+
+export const getAttendanceByDate = async (date: string): Promise<AttendanceRecord[]> => {
+  // Filtering happens in MySQL; only the selected day's rows are transferred.
+  const response = await api.get<AttendanceRecord[]>('/employee/attendance', {
+    params: { date },
+  });
+  return response.data;
+};
+
+export const getEmployeeAttendance = async (employeeId: string, from: string, to: string): Promise<AttendanceRecord[]> => {
+  const response = await api.get<AttendanceRecord[]>(`/employee/employees/${employeeId}/attendance`, {
+    params: { from, to },
+  });
+  return response.data;
+};
@@ -1,4 +1,4 @@
-import api from '../config/axiosConfig';
+import api, { ACCESS_TOKEN_KEY, REFRESH_TOKEN_KEY } from '../config/axiosConfig';
 import { User } from '../types';
 
 interface LoginCredentials {
@@ -6,14 +6,28 @@ interface LoginCredentials {
   pass: string;
 }
 
+interface LoginResponse {
+  message: string;
+  user: User;
+  accessToken: string;
+  refreshToken: string;
+  tokenType: string;
+  expiresIn: number;
+}
+
 export const login = async (credentials: LoginCredentials): Promise<User> => {
   // NGINX forwards requests from /auth/... to the auth microservice.
   // The request sent to the microservice will be just '/login'.
-  const response = await api.post<User>('/auth/login', credentials);
-  return response.data;
+  const response = await api.post<LoginResponse>('/auth/login', credentials);
+  // The access token is verified locally by the other services; axiosConfig renews it with the refresh token on a 401.
+  sessionStorage.setItem(ACCESS_TOKEN_KEY, response.data.accessToken);
+  sessionStorage.setItem(REFRESH_TOKEN_KEY, response.data.refreshToken);
+  return response.data.user;
 };
 
 export const logout = async (): Promise<void> => {
+  sessionStorage.removeItem(ACCESS_TOKEN_KEY);
+  sessionStorage.removeItem(REFRESH_TOKEN_KEY);
   // Fire-and-forget is acceptable for logout.
   // The client-side state will be cleared regardless of the API call's success.
   api.post('/auth/logout');
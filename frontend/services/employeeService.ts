@@ -2,8 +2,17 @@ import api from '../config/axiosConfig';
 import { Employee } from '../types';
 
 export const getEmployees = async (): Promise<Employee[]> => {
-  const response = await api.get<Employee[]>('/employee/employees');
-  return response.data;
+  // GET /employees is paginated (keyset on id): follow X-Next-Cursor until the last page.
+  const employees: Employee[] = [];
+  let after: string | undefined;
+  do {
+    const response = await api.get<Employee[]>('/employee/employees', {
+      params: after ? { after } : undefined,
+    });
+    employees.push(...response.data);
+    after = response.headers['x-next-cursor'] as string | undefined;
+  } while (after);
+  return employees;
 };
 
 export const addEmployee = async (employeeData: Omit<Employee, 'id' | 'avatarUrl'>): Promise<Employee> => {
@@ -1,14 +1,65 @@
 import api from '../config/axiosConfig';
 
-export const runStressTest = async (): Promise<void> => {
-  // Create an array of 50 promises for concurrent requests
-  const requests = Array.from({ length: 50 }, () =>
+// Workload profiles served by mscv-stress (see backend/mscv-stress/workloads.py).
+export type StressProfile = 'cpu' | 'memory' | 'disk' | 'latency';
+
+export const runStressTest = async (
+  profile: StressProfile = 'cpu',
+  params: Record<string, number> = { seconds: 2 },
+  concurrency = 50,
+): Promise<void> => {
+  // Create an array of promises for concurrent requests
+  const requests = Array.from({ length: concurrency }, () =>
     // NGINX forwards requests from /stress/ to the stress microservice
     api.get("/stress/heavy_task", {
-      params: { seconds: 2 },
+      params: { profile, ...params },
     })
   );
 
   // Wait for all requests to complete
   await Promise.all(requests);
 };
+
+export interface StressJob {
+  id: string;
+  profile: StressProfile;
+  params: Record<string, number | boolean>;
+  status: 'queued' | 'running' | 'succeeded' | 'failed' | 'cancelled';
+  progress: number;
+  result: Record<string, unknown> | null;
+  error: string | null;
+}
+
+// Async mode: the workload runs in the stress service's job pool and the
+// HTTP request returns immediately with the job id.
+export const submitStressJob = async (
+  profile: StressProfile = 'cpu',
+  params: Record<string, number> = { seconds: 2 },
+): Promise<StressJob> => {
+  const response = await api.post<StressJob>('/stress/jobs', { profile, params });
+  return response.data;
+};
+
+export const cancelStressJob = async (id: string): Promise<void> => {
+  await api.delete(`/stress/jobs/${id}`);
+};
+
+// Follows several jobs over a single Server-Sent Events stream (no polling).
+// Returns a function that closes the stream.
+export const watchStressJobs = (
+  ids: string[],
+  onUpdate: (job: StressJob) => void,
+  onDone: () => void,
+): (() => void) => {
+  const source = new EventSource(`/stress/jobs/events?ids=${ids.join(',')}`);
+  source.addEventListener('job', (event) => onUpdate(JSON.parse((event as MessageEvent).data)));
+  source.addEventListener('done', () => {
+    source.close();
+    onDone();
+  });
+  source.onerror = () => {
+    source.close();
+    onDone();
+  };
+  return () => source.close();
+};
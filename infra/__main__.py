@@ -7,10 +7,10 @@ from pathlib import Path
 from pulumi import ResourceOptions, Config
 from pulumi_gcp import container, compute
 from pulumi_kubernetes import Provider
-from pulumi_kubernetes.core.v1 import ConfigMap
+from pulumi_kubernetes.core.v1 import ConfigMap, Secret
 
 # --- Importar nuestros módulos de despliegue ---
-from stateful_infra import deploy_mysql
+from stateful_infra import deploy_metrics_adapter, deploy_mysql, deploy_redis, run_migrations
 
 # =====================================================================================
 # ==== 1. INFRAESTRUCTURA BASE (CLÚSTER, NODE POOL, FIREWALL) ====
@@ -104,25 +104,75 @@ k8s_provider = Provider(
 # ==== 2. INFRAESTRUCTURA ESTATAL (MYSQL) ====
 # =====================================================================================
 
-# 2.1. Crear ConfigMap de Inicialización (Lectura dinámica del archivo init.sql)
-db_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "db")
-init_sql_path = os.path.join(db_dir, "init.sql")
-try:
-    with open(init_sql_path, "r") as f:
-        init_sql_content = f.read()
-except FileNotFoundError:
-    raise Exception(f"Error: No se encontró el archivo de inicialización SQL en: {init_sql_path}")
-
-mysql_init_config = ConfigMap(
-    "mysql-init-config",
-    metadata={"name": "mysql-init-config"},
-    data={"init.sql": init_sql_content},
+# 2.1. Desplegar MySQL usando nuestro módulo Python
+# Esto reemplaza mysql-deployment.yaml y mysql-pvc.yaml. El esquema ya no se crea con
+# init.sql en el primer arranque: lo gestionan las migraciones versionadas (2.2).
+mysql_service = deploy_mysql(provider=k8s_provider)
+
+# 2.2. Migraciones versionadas (db/migrations) ejecutadas como Job antes de los servicios
+migrations_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "db", "migrations")
+migration_files = sorted(Path(migrations_dir).glob("V*.sql"))
+if not migration_files:
+    raise Exception(f"Error: No se encontraron migraciones SQL en: {migrations_dir}")
+
+migrations_config = ConfigMap(
+    "mysql-migrations",
+    data={f.name: f.read_text(encoding="utf-8") for f in migration_files},
     opts=ResourceOptions(provider=k8s_provider)
 )
 
-# 2.2. Desplegar MySQL usando nuestro módulo Python
-# Esto reemplaza mysql-deployment.yaml y mysql-pvc.yaml
-deploy_mysql(provider=k8s_provider, config_map=mysql_init_config)
+# El runner (backend/common/migrate.py) va dentro de las imágenes de backend
+migrations_image_tag = cfg.get("mscv_employee_image_tag") or "latest"
+migrations_job = run_migrations(
+    provider=k8s_provider,
+    config_map=migrations_config,
+    image=f"gcr.io/k8-clusters-474002/mscv-employee:{migrations_image_tag}",
+    depends_on=[mysql_service],
+)
+
+# 2.3. Redis para el estado efímero compartido entre réplicas (jobs, rate limit)
+redis_service = deploy_redis(provider=k8s_provider)
+
+# 2.4. Clave Ed25519 (PEM PKCS8) con la que mscv-auth firma los tokens de sesión.
+# Todas las réplicas deben compartirla (con claves efímeras por réplica los tokens de
+# una fallan en las demás y en el JWKS que lee mscv-employee), así que es obligatoria:
+#   openssl genpkey -algorithm ed25519 | pulumi config set --secret auth_signing_key
+auth_signing_key = cfg.require_secret("auth_signing_key")
+Secret(
+    "auth-signing-keys",
+    metadata={"name": "auth-signing-keys"},
+    string_data={"private.pem": auth_signing_key},
+    opts=ResourceOptions(provider=k8s_provider)
+)
+
+# 2.5. Token que exigen los endpoints /debug/* de los servicios (X-Debug-Token).
+# Sin él los endpoints no se registran aunque el servicio tenga DEBUG_ENDPOINTS=true:
+#   openssl rand -hex 32 | pulumi config set --secret debug_token
+debug_token = cfg.get_secret("debug_token")
+if debug_token is not None:
+    Secret(
+        "debug-endpoints",
+        metadata={"name": "debug-endpoints"},
+        string_data={"token": debug_token},
+        opts=ResourceOptions(provider=k8s_provider)
+    )
+
+# 2.6. Métricas por pod para los HPA (requests/s y requests en curso). Necesita un
+# Prometheus que ya recoja los pods por sus anotaciones prometheus.io/*:
+#   pulumi config set prometheus_url http://prometheus-server.monitoring.svc:80
+# Sin él los HPA escalan sólo por CPU (ver HpaConfig.metrics).
+prometheus_url = cfg.get("prometheus_url")
+if prometheus_url:
+    deploy_metrics_adapter(provider=k8s_provider, prometheus_url=prometheus_url)
+
+# 2.7. Rango de IPs de los pods: los servicios sólo creen X-Forwarded-For cuando el
+# request llega desde un pod (el NGINX del frontend), no desde su LoadBalancer público.
+ConfigMap(
+    "cluster-network",
+    metadata={"name": "cluster-network"},
+    data={"pod_cidr": cluster.cluster_ipv4_cidr},
+    opts=ResourceOptions(provider=k8s_provider)
+)
 
 # =====================================================================================
 # ==== 3. DESPLIEGUE GENÉRICO DE MICROSERVICIOS ====
@@ -162,7 +212,8 @@ for finder, module_name, is_pkg in pkgutil.iter_modules([SERVICES_DIR]):
         deploy_function(
             provider=k8s_provider,
             docker_service_name=service_name_docker,
-            image_tag=image_tag
+            image_tag=image_tag,
+            depends_on=[migrations_job, redis_service]  # Los servicios arrancan con el esquema ya migrado
         )
     else:
         pulumi.log.warn(f"Omitiendo {module_name}: no se encontró la función 'deploy_service'.")
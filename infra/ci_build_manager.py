@@ -6,6 +6,7 @@ from pathlib import Path
 # --- Configuración ---
 CONFIG_KEY_TEMPLATE = "{service_name}_image_tag"
 IMAGE_NAME_TEMPLATE = "gcr.io/{project_id}/{service_name}:{tag}"
+BACKEND_SHARED_DIR = "common"
 
 def run_command(command, cwd=None):
     """Ejecuta un comando en el shell y maneja errores."""
@@ -44,19 +45,24 @@ def main():
         if not p.parts:
             continue
 
-        # Backend
-        if p.parts[0] == 'backend' and len(p.parts) > 2:
+        # Código compartido del backend: reconstruir todos los servicios backend
+        if p.parts[0] == 'backend' and len(p.parts) > 2 and p.parts[1] == BACKEND_SHARED_DIR:
+            for dockerfile in Path('backend').glob('*/Dockerfile'):
+                services_to_build[dockerfile.parent.name] = (Path('backend'), dockerfile)
+
+        # Backend (el contexto es 'backend/' para poder copiar 'common/')
+        elif p.parts[0] == 'backend' and len(p.parts) > 2:
             service_name = p.parts[1]
-            context_path = Path('backend') / service_name
-            if context_path.exists():
-                services_to_build[service_name] = context_path
+            dockerfile = Path('backend') / service_name / 'Dockerfile'
+            if dockerfile.exists():
+                services_to_build[service_name] = (Path('backend'), dockerfile)
 
         # Frontend
         elif p.parts[0] == 'frontend' and len(p.parts) > 1:
             service_name = 'frontend'
             context_path = Path('frontend')
             if context_path.exists():
-                services_to_build[service_name] = context_path
+                services_to_build[service_name] = (context_path, context_path / 'Dockerfile')
 
     if not services_to_build:
         print("No se modificó el código de ningún servicio. Omitiendo builds.")
@@ -65,7 +71,7 @@ def main():
     print(f"Servicios a construir: {', '.join(services_to_build.keys())}")
 
     # 3. Build & Push solo servicios modificados
-    for service_name, context_path in services_to_build.items():
+    for service_name, (context_path, dockerfile) in services_to_build.items():
         print(f"--- Procesando: {service_name} ---")
 
         image_name = IMAGE_NAME_TEMPLATE.format(
@@ -75,7 +81,7 @@ def main():
         )
 
         # Construir la imagen
-        run_command(["docker", "build", "-t", image_name, "."], cwd=context_path)
+        run_command(["docker", "build", "-f", str(dockerfile), "-t", image_name, str(context_path)])
         
         # Publicar la imagen
         run_command(["docker", "push", image_name])
@@ -1,29 +1,178 @@
-# --- ¡LA IMPORTACIÓN CORRECTA! ---
-# Importamos la clase base genérica de 'pulumi'
-from pulumi import ResourceOptions, CustomResource
+import json
+import os
+
+from pulumi import Config, ResourceOptions, log
+# CustomResource de pulumi_kubernetes: fija apiVersion/kind del objeto (el VPA es un CRD)
+from pulumi_kubernetes.apiextensions import CustomResource
 from pulumi_kubernetes.apps.v1 import Deployment
 from pulumi_kubernetes.core.v1 import Service
 from pulumi_kubernetes.autoscaling.v2 import HorizontalPodAutoscaler
 from pulumi_kubernetes.meta.v1 import ObjectMetaArgs, LabelSelectorArgs
-from pulumi_kubernetes.core.v1 import Service, ServiceSpecArgs, ServicePortArgs, ContainerArgs, PodSpecArgs, PodTemplateSpecArgs, EnvVarArgs
+from pulumi_kubernetes.core.v1 import Service, ServiceSpecArgs, ServicePortArgs, ContainerArgs, PodSpecArgs, PodTemplateSpecArgs, EnvVarArgs, \
+    EnvVarSourceArgs, SecretKeySelectorArgs, ConfigMapKeySelectorArgs, ProbeArgs, HTTPGetActionArgs, ResourceRequirementsArgs
 
 from pulumi_kubernetes.apps.v1 import Deployment, DeploymentSpecArgs
+
+# Recursos, HPA y VPA por servicio: los genera infra/rightsizing.py a partir de pruebas de carga
+SIZING_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sizing.json")
+
+
+def load_sizing(service):
+    """{'resources': {...}, 'hpa': {...}, 'vpa': {...}} de `service` en infra/sizing.json."""
+    with open(SIZING_FILE) as f:
+        services = json.load(f)["services"]
+    if service not in services:
+        raise KeyError(f"'{service}' no está en {SIZING_FILE} (ver infra/rightsizing.py)")
+    return services[service]
+
+
+def env_var(e):
+    """
+    EnvVarArgs de una entrada de env: valor literal, clave de un Secret o clave de un
+    ConfigMap. Las referencias son opcionales salvo que la entrada lleve "optional": False.
+    """
+    if "secret" in e:
+        return EnvVarArgs(name=e["name"], value_from=EnvVarSourceArgs(
+            secret_key_ref=SecretKeySelectorArgs(name=e["secret"][0], key=e["secret"][1], optional=e.get("optional", True))
+        ))
+    if "config_map" in e:
+        return EnvVarArgs(name=e["name"], value_from=EnvVarSourceArgs(
+            config_map_key_ref=ConfigMapKeySelectorArgs(name=e["config_map"][0], key=e["config_map"][1], optional=e.get("optional", True))
+        ))
+    return EnvVarArgs(name=e["name"], value=e["value"])
+
 # Clase de 'Configuración' simple para HPA y VPA para mantener limpio el __init__
 class HpaConfig:
-# ... (código sin cambios) ...
-    def __init__(self, min_replicas=2, max_replicas=10, cpu_utilization=70, memory_utilization=75):
+    # CPU + métricas por pod de common/metrics.py servidas por prometheus-adapter
+    # (sólo si está configurado prometheus_url, ver deploy_metrics_adapter en stateful_infra.py).
+    # Memoria fuera por defecto: en Python no baja tras un pico y la gestiona el VPA.
+    def __init__(self, min_replicas=2, max_replicas=10, cpu_utilization=70, memory_utilization=None,
+                 requests_per_second=None, in_flight=None, shed_per_second=None,
+                 scale_up_stabilization=0, scale_up_max_pods=4,
+                 scale_down_stabilization=300, scale_down_max_percent=50):
         self.min_replicas = min_replicas
         self.max_replicas = max_replicas
         self.cpu = cpu_utilization
         self.memory = memory_utilization
+        self.requests_per_second = requests_per_second  # objetivo medio por pod
+        self.in_flight = in_flight  # requests en curso medios por pod
+        self.shed_per_second = shed_per_second  # 503 del control de admisión por pod y segundo
+        self.scale_up_stabilization = scale_up_stabilization
+        self.scale_up_max_pods = scale_up_max_pods  # pods añadidos como mucho cada 15 s
+        self.scale_down_stabilization = scale_down_stabilization
+        self.scale_down_max_percent = scale_down_max_percent  # % de pods retirados como mucho por minuto
+
+    @property
+    def resource_signals(self):
+        """Recursos cuyo uso mueve al HPA: el VPA no debe tocar sus requests."""
+        return {name for name, target in (("cpu", self.cpu), ("memory", self.memory)) if target}
+
+    def metrics(self, custom_metrics):
+        metrics = [
+            {
+                "type": "Resource",
+                "resource": {"name": name, "target": {"type": "Utilization", "averageUtilization": target}},
+            }
+            for name, target in (("cpu", self.cpu), ("memory", self.memory)) if target
+        ]
+        if custom_metrics:
+            metrics += [
+                {
+                    "type": "Pods",
+                    "pods": {
+                        "metric": {"name": name},
+                        "target": {"type": "AverageValue", "averageValue": str(target)},
+                    },
+                }
+                for name, target in (("http_requests_per_second", self.requests_per_second),
+                                     ("http_requests_in_flight", self.in_flight),
+                                     ("admission_shed_per_second", self.shed_per_second)) if target
+            ]
+        return metrics
+
+    def behavior(self):
+        return {
+            "scaleUp": {
+                "stabilizationWindowSeconds": self.scale_up_stabilization,
+                "selectPolicy": "Max",
+                "policies": [
+                    {"type": "Pods", "value": self.scale_up_max_pods, "periodSeconds": 15},
+                    {"type": "Percent", "value": 100, "periodSeconds": 15},
+                ],
+            },
+            "scaleDown": {
+                "stabilizationWindowSeconds": self.scale_down_stabilization,
+                "selectPolicy": "Min",
+                "policies": [{"type": "Percent", "value": self.scale_down_max_percent, "periodSeconds": 60}],
+            },
+        }
 
 class VpaConfig:
 # ... (código sin cambios) ...
-    def __init__(self, min_cpu="100m", min_memory="128Mi", max_cpu="1000m", max_memory="1Gi"):
+    def __init__(self, min_cpu="100m", min_memory="128Mi", max_cpu="1000m", max_memory="1Gi", update_mode="Auto"):
         self.min_cpu = min_cpu
         self.min_memory = min_memory
         self.max_cpu = max_cpu
         self.max_memory = max_memory
+        self.update_mode = update_mode  # Auto | Initial | Off (sólo recomendaciones)
+
+class ServerConfig:
+    # Ajustes de gunicorn por servicio (ver backend/common/gunicorn_conf.py)
+    def __init__(self, workers=2, threads=4, worker_class="threaded", timeout=60, graceful_timeout=25, keepalive=5,
+                 app="app:app"):
+        self.app = app  # 'asgi_app:app' junto con worker_class="asgi"
+        self.workers = workers
+        self.threads = threads
+        self.worker_class = worker_class  # sync | threaded | gevent | asgi
+        self.timeout = timeout
+        self.graceful_timeout = graceful_timeout
+        self.keepalive = keepalive
+
+    def env(self):
+        return [
+            {"name": "WEB_APP", "value": self.app},
+            {"name": "WEB_WORKERS", "value": str(self.workers)},
+            {"name": "WEB_THREADS", "value": str(self.threads)},
+            {"name": "WEB_WORKER_CLASS", "value": self.worker_class},
+            {"name": "WEB_TIMEOUT", "value": str(self.timeout)},
+            {"name": "WEB_GRACEFUL_TIMEOUT", "value": str(self.graceful_timeout)},
+            {"name": "WEB_KEEPALIVE", "value": str(self.keepalive)},
+        ]
+
+class ProbeConfig:
+    # Sondas HTTP del contenedor (ver backend/common/health.py). La de arranque cubre
+    # el import + calentamiento sin que la de liveness mate el pod mientras tanto.
+    def __init__(self, readiness_path="/readyz", liveness_path="/healthz", startup_timeout=120,
+                 readiness_period=5, liveness_period=10, timeout=2, failure_threshold=3,
+                 readiness_failure_threshold=3):
+        self.readiness_path = readiness_path
+        self.liveness_path = liveness_path
+        self.startup_timeout = startup_timeout  # segundos máximos hasta la primera respuesta de liveness
+        self.readiness_period = readiness_period
+        self.liveness_period = liveness_period
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.readiness_failure_threshold = readiness_failure_threshold
+
+    def _probe(self, path, port, period, failure_threshold):
+        return ProbeArgs(
+            http_get=HTTPGetActionArgs(path=path, port=port),
+            period_seconds=period,
+            timeout_seconds=self.timeout,
+            failure_threshold=failure_threshold,
+        )
+
+    def startup(self, port):
+        period = 2
+        return self._probe(self.liveness_path, port, period, max(1, self.startup_timeout // period))
+
+    def readiness(self, port):
+        # Bajo carga /readyz hace cola tras los hilos ocupados: con un solo fallo los pods
+        # saldrían del Service justo cuando más falta hacen. Volver sigue requiriendo un éxito.
+        return self._probe(self.readiness_path, port, self.readiness_period, self.readiness_failure_threshold)
+
+    def liveness(self, port):
+        return self._probe(self.liveness_path, port, self.liveness_period, self.failure_threshold)
 
 class MicroserviceDeployer:
     def __init__(self,
@@ -35,22 +184,36 @@ class MicroserviceDeployer:
                  provider: str,
                  env: list = None,
                  resources: dict = None,
+                 replicas: int = 2,
+                 metrics_path: str = "/metrics",
                  hpa_config: HpaConfig = None,
-                 vpa_config: VpaConfig = None):
+                 vpa_config: VpaConfig = None,
+                 server_config: ServerConfig = None,
+                 probe_config: ProbeConfig = None,
+                 depends_on: list = None):
         
         self.name = name
 # ... (código sin cambios) ...
         self.image = image
         self.port = port
         self.provider = provider
-        self.env = env or []
+        self.server_config = server_config
+        # Sin probe_config el contenedor no tiene sondas (recibe tráfico en cuanto arranca)
+        self.probe_config = probe_config
+        # Las variables de gunicorn van detrás de las del servicio
+        self.env = (env or []) + (server_config.env() if server_config else [])
         self.labels = {"app": self.name}
         
-        # Usar recursos si se proveen, de lo contrario VPA los manejará
-        self.resources = resources or {} 
+        # {"requests": {...}, "limits": {...}}: sin requests de CPU el objetivo de utilización del HPA no tiene base
+        self.resources = resources or {}
+        self.replicas = replicas
+        # Ruta de Prometheus (common/metrics.py); None si el contenedor no la sirve (p. ej. NGINX)
+        self.metrics_path = metrics_path
         
         self.hpa_config = hpa_config
         self.vpa_config = vpa_config
+        # Recursos que deben existir antes del Deployment (p. ej. el Job de migraciones)
+        self.depends_on = depends_on or []
         self.service = None
         self.deployment = None
 
@@ -64,28 +227,50 @@ class MicroserviceDeployer:
                 labels=self.labels
             ),
             spec=DeploymentSpecArgs(
-                replicas=2,
+                # Con HPA las réplicas son suyas: se fija el mínimo al crear y Pulumi no las vuelve a tocar
+                replicas=self.hpa_config.min_replicas if self.hpa_config else self.replicas,
                 selector=LabelSelectorArgs(
                     match_labels=self.labels
                 ),
                 template=PodTemplateSpecArgs(
-                    metadata=ObjectMetaArgs(labels=self.labels),
+                    metadata=ObjectMetaArgs(
+                        labels=self.labels,
+                        annotations={
+                            "prometheus.io/scrape": "true",
+                            "prometheus.io/port": str(self.port),
+                            "prometheus.io/path": self.metrics_path,
+                        } if self.metrics_path else None,
+                    ),
                     spec=PodSpecArgs(
+                        # Margen para que gunicorn termine los requests en curso tras SIGTERM
+                        termination_grace_period_seconds=(
+                            self.server_config.graceful_timeout + 5 if self.server_config else None
+                        ),
                         containers=[
                             ContainerArgs(
                                 name=self.name,
                                 image=self.image,
                                 ports=[{"containerPort": self.port}],
-                                env=[
-                                    EnvVarArgs(name=e["name"], value=e["value"])
-                                    for e in self.env
-                                ]
+                                resources=ResourceRequirementsArgs(
+                                    requests=self.resources.get("requests"),
+                                    limits=self.resources.get("limits"),
+                                ) if self.resources else None,
+                                startup_probe=self.probe_config.startup(self.port) if self.probe_config else None,
+                                readiness_probe=self.probe_config.readiness(self.port) if self.probe_config else None,
+                                liveness_probe=self.probe_config.liveness(self.port) if self.probe_config else None,
+                                # {"name", "value"}, {"name", "secret": (nombre, clave)} para leer de un
+                                # Secret o {"name", "config_map": (nombre, clave)} para leer de un ConfigMap
+                                env=[env_var(e) for e in self.env]
                             )
                         ]
                     )
                 )
             ),
-            opts=ResourceOptions(provider=self.provider)
+            opts=ResourceOptions(
+                provider=self.provider,
+                depends_on=self.depends_on,
+                ignore_changes=["spec.replicas"] if self.hpa_config else None,
+            )
         )
 
         # ✅ SERVICE CORRECTO
@@ -108,13 +293,13 @@ class MicroserviceDeployer:
             )
         )
 
-        return self.service
-
         # 3. Horizontal Pod Autoscaler (HPA)
         if self.hpa_config:
+            # Las métricas por pod sólo existen si prometheus-adapter está desplegado
+            custom_metrics = bool(Config().get("prometheus_url"))
             HorizontalPodAutoscaler(
-# ... (código sin cambios) ...
                 f"{self.name}-hpa",
+                metadata={"name": f"{self.name}-hpa"},
                 spec={
                     "scaleTargetRef": {
                         "apiVersion": "apps/v1",
@@ -123,57 +308,44 @@ class MicroserviceDeployer:
                     },
                     "minReplicas": self.hpa_config.min_replicas,
                     "maxReplicas": self.hpa_config.max_replicas,
-                    "metrics": [
-                        {
-                            "type": "Resource",
-                            "resource": {
-                                "name": "cpu",
-                                "target": {"type": "Utilization", "averageUtilization": self.hpa_config.cpu}
-                            }
-                        },
-                        {
-                            "type": "Resource",
-                            "resource": {
-                                "name": "memory",
-                                "target": {"type": "Utilization", "averageUtilization": self.hpa_config.memory}
-                            }
-                        }
-                    ]
+                    "metrics": self.hpa_config.metrics(custom_metrics),
+                    "behavior": self.hpa_config.behavior(),
                 },
                 opts=ResourceOptions(provider=self.provider, depends_on=[self.deployment])
             )
 
         # 4. Vertical Pod Autoscaler (VPA)
         if self.vpa_config:
-            
-            vpa_type_string = "kubernetes:autoscaling.k8s.io/v1:VerticalPodAutoscaler"
+            # HPA y VPA no pueden reaccionar a la misma señal: si el HPA escala por CPU,
+            # el VPA sólo ajusta la memoria (y viceversa)
+            hpa_signals = self.hpa_config.resource_signals if self.hpa_config else set()
+            controlled = [r for r in ("cpu", "memory") if r not in hpa_signals]
+            update_mode = self.vpa_config.update_mode if controlled else "Off"
+            if not controlled:
+                log.warn(f"{self.name}: el HPA usa CPU y memoria; el VPA queda en modo recomendación (Off)")
 
-            vpa_props = {
-                "metadata": {"name": f"vpa-{self.name}"},
-                "spec": {
+            CustomResource(
+                f"{self.name}-vpa",
+                api_version="autoscaling.k8s.io/v1",
+                kind="VerticalPodAutoscaler",
+                metadata={"name": f"vpa-{self.name}"},
+                spec={
                     "targetRef": {
                         "apiVersion": "apps/v1",
                         "kind": "Deployment",
                         "name": self.deployment.metadata["name"],
                     },
-                    "updatePolicy": {"updateMode": "Auto"},
+                    "updatePolicy": {"updateMode": update_mode},
                     "resourcePolicy": {
                         "containerPolicies": [{
                             "containerName": "*",
                             "minAllowed": {"cpu": self.vpa_config.min_cpu, "memory": self.vpa_config.min_memory},
                             "maxAllowed": {"cpu": self.vpa_config.max_cpu, "memory": self.vpa_config.max_memory},
-                            "controlledResources": ["cpu", "memory"]
+                            "controlledResources": controlled or ["cpu", "memory"]
                         }]
                     }
-                }
-            }
-            
-            # --- ¡LA CORRECCIÓN FINAL! (Argumentos intercambiados) ---
-            CustomResource(
-                vpa_type_string,     # 1. El 'type_string'
-                f"{self.name}-vpa", # 2. El nombre
-                vpa_props,           # 3. El diccionario 'props'
+                },
                 opts=ResourceOptions(provider=self.provider, depends_on=[self.deployment])
             )
 
-        return self.service
\ No newline at end of file
+        return self.service
@@ -1,9 +1,9 @@
 # infra/microservices/frontend.py
 
-from .deploy_base import MicroserviceDeployer, HpaConfig, VpaConfig
+from .deploy_base import MicroserviceDeployer, load_sizing, HpaConfig, VpaConfig, ProbeConfig
 
 # Nombre de la función POR CONVENCIÓN: 'deploy_service'
-def deploy_service(provider, docker_service_name, image_tag):
+def deploy_service(provider, docker_service_name, image_tag, depends_on=None):
     
     # docker_service_name será 'frontend'
     
@@ -14,21 +14,11 @@ def deploy_service(provider, docker_service_name, image_tag):
     # El 'env' debe estar vacío, tal como en tu YAML.
     env_vars = [] 
 
-    # Configuración de HPA (de autoscaling.yaml para frontend)
-    hpa = HpaConfig(
-        min_replicas=2,
-        max_replicas=8,  # <-- Valor de tu YAML
-        cpu_utilization=60, # <-- Valor de tu YAML
-        memory_utilization=70 # <-- Valor de tu YAML
-    )
-    
-    # Configuración de VPA (de vpa-all.yaml para frontend)
-    vpa = VpaConfig(
-        min_cpu="100m",
-        min_memory="128Mi",
-        max_cpu="1000m",
-        max_memory="1Gi"
-    )
+    # Recursos, HPA y VPA en infra/sizing.json (se recalculan con infra/rightsizing.py)
+    sizing = load_sizing(docker_service_name)
+    resources = sizing["resources"]
+    hpa = HpaConfig(**sizing["hpa"])
+    vpa = VpaConfig(**sizing["vpa"])
 
     deployer = MicroserviceDeployer(
         name=docker_service_name, # 'frontend'
@@ -38,7 +28,11 @@ def deploy_service(provider, docker_service_name, image_tag):
         provider=provider,
         hpa_config=hpa,
         vpa_config=vpa,
-        resources={} # No tiene 'resources' definidos en el YAML
+        resources=resources,
+        metrics_path=None, # NGINX no sirve /metrics
+        # NGINX sirve la SPA en '/': basta con que responda
+        probe_config=ProbeConfig(readiness_path="/", liveness_path="/", startup_timeout=30),
+        depends_on=depends_on
     )
     
     return deployer.deploy()
\ No newline at end of file
@@ -1,8 +1,8 @@
 # Importa la clase base y las clases de configuración
-from .deploy_base import MicroserviceDeployer, HpaConfig, VpaConfig
+from .deploy_base import MicroserviceDeployer, load_sizing, HpaConfig, VpaConfig, ServerConfig, ProbeConfig
 
 # Nombre de la función POR CONVENCIÓN: 'deploy_service'
-def deploy_service(provider, docker_service_name, image_tag):
+def deploy_service(provider, docker_service_name, image_tag, depends_on=None):
     
     # docker_service_name será 'mscv-auth'
     # image_tag vendrá del CI (ej. 'bfa123...')
@@ -15,32 +15,62 @@ def deploy_service(provider, docker_service_name, image_tag):
         {"name": "DB_USER", "value": "myapp_user"},
         {"name": "DB_PASSWORD", "value": "mypassword"},
         {"name": "DB_NAME", "value": "myapp_db"},
+        # Pool por worker de gunicorn (size * workers * max_replicas debe caber en max_connections de MySQL)
+        {"name": "DB_POOL_SIZE", "value": "5"},
+        {"name": "DB_POOL_TIMEOUT", "value": "5"},
+        # Clave Ed25519 con la que se firman los tokens (Secret creado en __main__.py). Obligatoria:
+        # sin ella cada réplica firmaría con su propia clave efímera
+        {"name": "AUTH_SIGNING_KEY", "secret": ("auth-signing-keys", "private.pem"), "optional": False},
+        {"name": "AUTH_ACTIVE_KID", "value": "primary"},
+        # Throttling de logins fallidos en el Redis compartido: el límite es global para todo el HPA
+        {"name": "RATE_LIMIT_BACKEND", "value": "redis"},
+        {"name": "RATE_LIMIT_REDIS_URL", "value": "redis://redis:6379/0"},
+        {"name": "LOGIN_EMAIL_BURST", "value": "5"},
+        {"name": "LOGIN_IP_BURST", "value": "30"},
+        # Sólo se cree el X-Forwarded-For que llega desde un pod (el NGINX del frontend)
+        {"name": "TRUSTED_PROXIES", "config_map": ("cluster-network", "pod_cidr")},
+        # argon2id en un pool de procesos por worker (2 workers x 2 procesos x 19 MiB por hash)
+        {"name": "PASSWORD_HASH_PROCESSES", "value": "2"},
+        {"name": "PASSWORD_TIME_COST", "value": "2"},
+        {"name": "PASSWORD_MEMORY_COST", "value": "19456"},
+        # Diagnóstico /debug/profile y /debug/heap (common/profiling.py): "true" sólo mientras se investiga
+        {"name": "DEBUG_ENDPOINTS", "value": "false"},
+        {"name": "DEBUG_TOKEN", "secret": ("debug-endpoints", "token")},
+        # Trazas (common/tracing.py): "file" o "http" + TRACING_ENDPOINT hacia `python -m common.tracing collect`
+        {"name": "TRACING_EXPORTER", "value": "off"},
+        {"name": "TRACING_SAMPLE_RATIO", "value": "0.1"},
+        # Slow query log + EXPLAIN automático (GET /db/slow-queries)
+        {"name": "SLOW_QUERY_THRESHOLD_MS", "value": "100"},
     ]
 
-    # Configuración de HPA (de autoscaling.yaml)
-    hpa = HpaConfig(
-        min_replicas=2,
-        max_replicas=10,
-        cpu_utilization=70,
-        memory_utilization=75
-    )
-    
-    # Configuración de VPA (de vpa-all.yaml)
-    vpa = VpaConfig(
-        min_cpu="100m",
-        min_memory="128Mi",
-        max_cpu="1000m",
-        max_memory="1Gi"
+    # Recursos, HPA y VPA en infra/sizing.json (se recalculan con infra/rightsizing.py)
+    sizing = load_sizing(docker_service_name)
+    resources = sizing["resources"]
+    hpa = HpaConfig(**sizing["hpa"])
+    vpa = VpaConfig(**sizing["vpa"])
+
+    # Servidor WSGI: login es I/O contra MySQL, threaded basta
+    server = ServerConfig(
+        workers=2,
+        threads=4,
+        worker_class="threaded"
     )
 
+    # /readyz espera al pool prellenado y a los procesos argon2 arrancados
+    probes = ProbeConfig(startup_timeout=120)
+
     deployer = MicroserviceDeployer(
         name=docker_service_name, # 'mscv-auth'
         image=image,
         port=5001, # El puerto de tu app
         env=env_vars,
+        resources=resources,
         provider=provider,
         hpa_config=hpa,
-        vpa_config=vpa
+        vpa_config=vpa,
+        server_config=server,
+        probe_config=probes,
+        depends_on=depends_on
     )
     
     return deployer.deploy()
\ No newline at end of file
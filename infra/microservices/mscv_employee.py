@@ -1,8 +1,8 @@
 # Importa la clase base y las clases de configuración
-from .deploy_base import MicroserviceDeployer, HpaConfig, VpaConfig
+from .deploy_base import MicroserviceDeployer, load_sizing, HpaConfig, VpaConfig, ServerConfig, ProbeConfig
 
 # Nombre de la función POR CONVENCIÓN: 'deploy_service'
-def deploy_service(provider, docker_service_name, image_tag):
+def deploy_service(provider, docker_service_name, image_tag, depends_on=None):
     
     # docker_service_name será 'mscv-employee'
     
@@ -14,33 +14,51 @@ def deploy_service(provider, docker_service_name, image_tag):
         {"name": "DB_USER", "value": "myapp_user"},
         {"name": "DB_PASSWORD", "value": "mypassword"},
         {"name": "DB_NAME", "value": "myapp_db"},
+        # Pool por worker de gunicorn (size * workers * max_replicas debe caber en max_connections de MySQL)
+        {"name": "DB_POOL_SIZE", "value": "10"},
+        {"name": "DB_POOL_TIMEOUT", "value": "5"},
+        # Verificación local de los tokens de mscv-auth (off | optional | required)
+        {"name": "AUTH_MODE", "value": "optional"},
+        {"name": "AUTH_JWKS_URL", "value": "http://mscv-auth:5001/.well-known/jwks.json"},
+        # Diagnóstico /debug/profile y /debug/heap (common/profiling.py): "true" sólo mientras se investiga
+        {"name": "DEBUG_ENDPOINTS", "value": "false"},
+        {"name": "DEBUG_TOKEN", "secret": ("debug-endpoints", "token")},
+        # Trazas (common/tracing.py): "file" o "http" + TRACING_ENDPOINT hacia `python -m common.tracing collect`
+        {"name": "TRACING_EXPORTER", "value": "off"},
+        {"name": "TRACING_SAMPLE_RATIO", "value": "0.1"},
+        # Slow query log + EXPLAIN automático (GET /db/slow-queries)
+        {"name": "SLOW_QUERY_THRESHOLD_MS", "value": "100"},
     ]
 
-    # Configuración de HPA (de autoscaling.yaml) (Correcta)
-    hpa = HpaConfig(
-        min_replicas=2,
-        max_replicas=10,
-        cpu_utilization=70,
-        memory_utilization=75
-    )
-    
-    # --- ¡CORRECCIÓN AQUÍ! ---
-    # Configuración de VPA (debe coincidir con vpa-mscv-employee)
-    vpa = VpaConfig(
-        min_cpu="150m",     # <-- Valor corregido
-        min_memory="256Mi", # <-- Valor corregido
-        max_cpu="1500m",    # <-- Valor corregido
-        max_memory="2Gi"    # <-- Valor corregido
+    # Recursos, HPA y VPA en infra/sizing.json (se recalculan con infra/rightsizing.py)
+    sizing = load_sizing(docker_service_name)
+    resources = sizing["resources"]
+    hpa = HpaConfig(**sizing["hpa"])
+    vpa = VpaConfig(**sizing["vpa"])
+
+    # Servidor ASGI: todas las rutas esperan a MySQL, las de /employees se sirven
+    # con asyncio + aiomysql (el resto cae en la app Flask dentro del mismo worker)
+    server = ServerConfig(
+        workers=2,
+        worker_class="asgi",
+        app="asgi_app:app"
     )
 
+    # /readyz espera al pool prellenado y a la primera página de empleados en caché
+    probes = ProbeConfig(startup_timeout=120)
+
     deployer = MicroserviceDeployer(
         name=docker_service_name, # 'mscv-employee'
         image=image,
         port=5002, # El puerto de tu app
         env=env_vars,
+        resources=resources,
         provider=provider,
         hpa_config=hpa,
-        vpa_config=vpa # Ahora se pasa la configuración de VPA correcta
+        vpa_config=vpa, # Ahora se pasa la configuración de VPA correcta
+        server_config=server,
+        probe_config=probes,
+        depends_on=depends_on
     )
     
     return deployer.deploy()
\ No newline at end of file
@@ -1,49 +1,71 @@
 # infra/microservices/mscv_stress.py
 
-from .deploy_base import MicroserviceDeployer, HpaConfig, VpaConfig
+from .deploy_base import MicroserviceDeployer, load_sizing, HpaConfig, VpaConfig, ServerConfig, ProbeConfig
+
+# RSS del árbol de procesos sin carga, redondeado hacia arriba: master de gunicorn (~40Mi)
+# y, por cada uno de los 2 workers, el worker (~40Mi), el forkserver y el resource
+# tracker de multiprocessing y los 2 procesos del pool de CPU (~13Mi cada uno)
+PROCESS_TREE_MIB = 256
 
 # Nombre de la función POR CONVENCIÓN: 'deploy_service'
-def deploy_service(provider, docker_service_name, image_tag):
+def deploy_service(provider, docker_service_name, image_tag, depends_on=None):
     
     # docker_service_name será 'mscv-stress'
     
     image = f"gcr.io/k8-clusters-474002/{docker_service_name}:{image_tag}"
 
+    # Recursos, HPA y VPA en infra/sizing.json (se recalculan con infra/rightsizing.py)
+    sizing = load_sizing(docker_service_name)
+    resources = sizing["resources"]
+    hpa = HpaConfig(**sizing["hpa"])
+    vpa = VpaConfig(**sizing["vpa"])
+
+    # limits.memory es de todo el contenedor: ?profile=memory sólo puede usar lo que
+    # deja libre el árbol de procesos, o el pod acaba en OOMKill
+    limit_mib = int(resources["limits"]["memory"].removesuffix("Mi"))
+    max_memory_mib = limit_mib - PROCESS_TREE_MIB
+    if max_memory_mib <= 0:
+        raise ValueError(f"{docker_service_name}: limits.memory ({limit_mib}Mi) no cubre el árbol de procesos ({PROCESS_TREE_MIB}Mi)")
+
     # --- ¡CORRECCIÓN! ---
     # Este 'env' debe ser el de tu YAML 'stress-deployment.yaml'
     env_vars = [
-        {"name": "ENVIRONMENT", "value": "production"}
+        {"name": "ENVIRONMENT", "value": "production"},
+        # Límites de los perfiles de carga (ver backend/mscv-stress/workloads.py)
+        {"name": "STRESS_MAX_CORES", "value": "2"},
+        {"name": "STRESS_MAX_MEMORY_MIB", "value": str(max_memory_mib)},
+        {"name": "STRESS_MAX_DISK_MIB", "value": "256"},
+        {"name": "STRESS_MAX_SECONDS", "value": "60"},
+        # Jobs asíncronos: estado en Redis para que cualquier réplica los sirva
+        {"name": "JOBS_BACKEND", "value": "redis"},
+        {"name": "JOBS_REDIS_URL", "value": "redis://redis:6379/0"},
+        {"name": "JOBS_WORKERS", "value": "2"},
+        {"name": "JOBS_MAX_QUEUE", "value": "16"},
+        # Control de admisión: 503 + Retry-After por encima de 4 requests pesados por
+        # worker o de 0.45 núcleos (90% de limits.cpu) en el último segundo
+        {"name": "ADMISSION_MAX_IN_FLIGHT", "value": "4"},
+        {"name": "ADMISSION_CPU_BUDGET", "value": "0.45"},
+        {"name": "ADMISSION_RETRY_AFTER", "value": "2"},
+        # Diagnóstico /debug/profile y /debug/heap (common/profiling.py): "true" sólo mientras se investiga
+        {"name": "DEBUG_ENDPOINTS", "value": "false"},
+        {"name": "DEBUG_TOKEN", "secret": ("debug-endpoints", "token")},
+        # Trazas (common/tracing.py): "file" o "http" + TRACING_ENDPOINT hacia `python -m common.tracing collect`
+        {"name": "TRACING_EXPORTER", "value": "off"},
+        {"name": "TRACING_SAMPLE_RATIO", "value": "0.1"},
     ]
-    
-    # --- ¡CORRECCIÓN! ---
-    # Definimos el bloque 'resources' de tu YAML
-    resources = {
-        "requests": {
-            "cpu": "200m",
-            "memory": "128Mi"
-        },
-        "limits": {
-            "cpu": "500m",
-            "memory": "256Mi"
-        }
-    }
-
-    # Configuración de HPA (de autoscaling.yaml para stress)
-    hpa = HpaConfig(
-        min_replicas=2,
-        max_replicas=10,
-        cpu_utilization=70,
-        memory_utilization=75
-    )
-    
-    # Configuración de VPA (de vpa-all.yaml para stress)
-    vpa = VpaConfig(
-        min_cpu="200m",
-        min_memory="256Mi",
-        max_cpu="2000m",
-        max_memory="3Gi"
+
+    # Servidor WSGI: la CPU se quema en el pool de procesos de workloads.py, así que
+    # los hilos sólo esperan; threaded para que los streams SSE no bloqueen un worker entero
+    server = ServerConfig(
+        workers=2,
+        threads=8,
+        worker_class="threaded",
+        timeout=120
     )
 
+    # /readyz espera a los procesos del pool de CPU (workloads.py)
+    probes = ProbeConfig(startup_timeout=60)
+
     deployer = MicroserviceDeployer(
         name=docker_service_name, # 'mscv-stress'
         image=image,
@@ -52,7 +74,10 @@ def deploy_service(provider, docker_service_name, image_tag):
         resources=resources, # <-- ¡Pasamos los resources!
         provider=provider,
         hpa_config=hpa,
-        vpa_config=vpa
+        vpa_config=vpa,
+        server_config=server,
+        probe_config=probes,
+        depends_on=depends_on
     )
     
     return deployer.deploy()
\ No newline at end of file
@@ -0,0 +1,206 @@
+"""
+Dimensionado de un servicio a partir de pruebas de carga (loadtest/loadgen.py).
+
+    python infra/rightsizing.py mscv-employee loadtest/results/employee-*.json \\
+        --target-qps 400 --slo-p99-ms 250 [--metrics cpu,rps,in_flight] [--dry-run]
+
+Cada resultado debe llevar el bloque "resources" (loadgen.py --kubectl-top / --pods):
+pods que atendieron la prueba y CPU/memoria por pod. Con varias pruebas a distinta
+carga se calcula:
+
+  capacidad por pod  mayor throughput por pod que cumple el SLO (p99 y tasa de errores)
+  CPU por request    recta CPU = base + coste * throughput por pod (mínimos cuadrados)
+  carga segura       capacidad * --headroom: el HPA tiene que escalar antes del codo
+
+y de ahí:
+
+  requests de CPU    tales que a carga segura la utilización sea --cpu-target
+                     (así cpu_utilization del HPA dispara justo en la carga segura)
+  limits de CPU      CPU en la capacidad (o el pico medido) * 1.5
+  memoria            pico medido * 1.2 (requests) y * 1.5 (limits)
+  réplicas           max = QPS objetivo / carga segura * 1.25, min = max(2, --min-qps / carga segura)
+  HPA por pod        requests/s = carga segura; en curso = carga segura * latencia media (Little)
+
+El resultado se escribe en infra/sizing.json, que leen los módulos de
+infra/microservices/* (ver load_sizing en deploy_base.py).
+"""
+import argparse
+import json
+import math
+import os
+import sys
+from datetime import datetime, timezone
+
+SIZING_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sizing.json")
+HPA_METRICS = ("cpu", "rps", "in_flight")
+
+
+class SizingError(Exception):
+    """Los resultados no bastan para dimensionar."""
+
+
+def load_runs(paths):
+    runs = []
+    for path in paths:
+        with open(path) as f:
+            result = json.load(f)
+        resources = result.get("resources") or {}
+        if not resources.get("pods"):
+            raise SizingError(f"{path}: falta resources.pods (loadgen.py --pods o --kubectl-top)")
+        summary = result["summary"]
+        pods = resources["pods"]
+        runs.append({
+            "file": os.path.basename(path),
+            "per_pod_rps": summary["throughput"] / pods,
+            "p99_ms": summary["latency_ms"]["p99"],
+            "mean_ms": summary["latency_ms"]["mean"],
+            "error_rate": summary["error_rate"],
+            "cpu_m": (resources.get("cpu_millicores_per_pod") or {}).get("mean"),
+            "cpu_max_m": (resources.get("cpu_millicores_per_pod") or {}).get("max"),
+            "memory_mib": (resources.get("memory_mib_per_pod") or {}).get("max"),
+        })
+    return runs
+
+
+def fit_cpu(runs):
+    """(base, coste por request/s) en milicores, por mínimos cuadrados sobre las pruebas con CPU medida."""
+    points = [(r["per_pod_rps"], r["cpu_m"]) for r in runs if r["cpu_m"] is not None and r["per_pod_rps"] > 0]
+    if not points:
+        raise SizingError("Ningún resultado trae CPU por pod (loadgen.py --kubectl-top)")
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if n >= 2 and var_x > 0:
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+        base = mean_y - slope * mean_x
+        if slope > 0 and base >= 0:
+            return base, slope
+    # Una sola carga (o un ajuste sin sentido): CPU proporcional al throughput
+    return 0.0, sum(y for _, y in points) / sum(x for x, _ in points)
+
+
+def round_up(value, step):
+    return int(math.ceil(value / step) * step)
+
+
+def compute(runs, *, target_qps, slo_p99_ms, max_error_rate=0.01, cpu_target=0.7, headroom=0.8,
+            min_qps=0.0, metrics=HPA_METRICS):
+    compliant = [r for r in runs if r["p99_ms"] is not None and r["p99_ms"] <= slo_p99_ms
+                 and r["error_rate"] <= max_error_rate]
+    if not compliant:
+        raise SizingError(f"Ningún resultado cumple p99 <= {slo_p99_ms} ms y errores <= {max_error_rate:.1%}")
+    knee = max(compliant, key=lambda r: r["per_pod_rps"])
+    capacity = knee["per_pod_rps"]
+    warnings = []
+    if len(compliant) == len(runs):
+        warnings.append("todas las pruebas cumplen el SLO: la capacidad real puede ser mayor (prueba más carga)")
+
+    base, cost = fit_cpu(runs)
+    safe_rps = capacity * headroom
+    cpu_safe = base + cost * safe_rps
+    cpu_peak = max([base + cost * capacity] + [r["cpu_max_m"] for r in compliant if r["cpu_max_m"] is not None])
+    memory_peak = max((r["memory_mib"] for r in runs if r["memory_mib"] is not None), default=None)
+    if memory_peak is None:
+        raise SizingError("Ningún resultado trae memoria por pod (loadgen.py --kubectl-top)")
+
+    requests_cpu = max(50, round_up(cpu_safe / cpu_target, 10))
+    limits_cpu = max(requests_cpu, round_up(cpu_peak * 1.5, 50))
+    requests_memory = round_up(memory_peak * 1.2, 16)
+    limits_memory = max(requests_memory, round_up(memory_peak * 1.5, 32))
+
+    max_replicas = math.ceil(target_qps / safe_rps * 1.25)
+    min_replicas = max(2, math.ceil(min_qps / safe_rps)) if min_qps else 2
+    max_replicas = max(max_replicas, min_replicas)
+
+    hpa = {"min_replicas": min_replicas, "max_replicas": max_replicas}
+    if "cpu" in metrics:
+        hpa["cpu_utilization"] = round(cpu_target * 100)
+    if "rps" in metrics:
+        hpa["requests_per_second"] = round(safe_rps) if safe_rps >= 10 else round(safe_rps, 1)
+    if "in_flight" in metrics:
+        hpa["in_flight"] = max(1, math.ceil(safe_rps * knee["mean_ms"] / 1000))
+
+    return {
+        "source": "rightsizing",
+        "resources": {
+            "requests": {"cpu": f"{requests_cpu}m", "memory": f"{requests_memory}Mi"},
+            "limits": {"cpu": f"{limits_cpu}m", "memory": f"{limits_memory}Mi"},
+        },
+        "hpa": hpa,
+        # El VPA sólo ajusta la memoria cuando el HPA escala por CPU (ver MicroserviceDeployer)
+        "vpa": {
+            "min_cpu": f"{requests_cpu}m",
+            "max_cpu": f"{limits_cpu * 2}m",
+            "min_memory": f"{round_up(requests_memory / 2, 16)}Mi",
+            "max_memory": f"{limits_memory * 2}Mi",
+        },
+        "basis": {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "runs": [r["file"] for r in runs],
+            "target_qps": target_qps,
+            "slo_p99_ms": slo_p99_ms,
+            "capacity_rps_per_pod": round(capacity, 2),
+            "safe_rps_per_pod": round(safe_rps, 2),
+            "cpu_base_millicores": round(base, 1),
+            "cpu_millicores_per_rps": round(cost, 3),
+            "memory_peak_mib": memory_peak,
+            "warnings": warnings,
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recursos, réplicas y objetivos del HPA a partir de pruebas de carga")
+    parser.add_argument("service", help="nombre del servicio, p. ej. mscv-employee")
+    parser.add_argument("results", nargs="+", help="ficheros JSON de loadgen.py (con bloque resources)")
+    parser.add_argument("--target-qps", type=float, required=True, help="QPS de pico que debe aguantar el servicio")
+    parser.add_argument("--slo-p99-ms", type=float, required=True)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--cpu-target", type=float, default=0.7, help="utilización de CPU objetivo del HPA (0-1)")
+    parser.add_argument("--headroom", type=float, default=0.8, help="fracción de la capacidad por pod a la que escalar")
+    parser.add_argument("--min-qps", type=float, default=0, help="QPS del valle (define min_replicas, mínimo 2)")
+    parser.add_argument("--metrics", default=",".join(HPA_METRICS),
+                        help="señales del HPA: cpu, rps, in_flight (p. ej. cpu,in_flight para mscv-stress)")
+    parser.add_argument("--sizing", default=SIZING_FILE, help="fichero de salida que leen infra/microservices/*")
+    parser.add_argument("--dry-run", action="store_true", help="sólo imprimir, sin escribir --sizing")
+    args = parser.parse_args(argv)
+
+    metrics = tuple(m.strip() for m in args.metrics.split(",") if m.strip())
+    unknown = set(metrics) - set(HPA_METRICS)
+    if unknown:
+        parser.error(f"métricas desconocidas: {', '.join(sorted(unknown))}")
+
+    try:
+        sizing = compute(load_runs(args.results), target_qps=args.target_qps, slo_p99_ms=args.slo_p99_ms,
+                         max_error_rate=args.max_error_rate, cpu_target=args.cpu_target,
+                         headroom=args.headroom, min_qps=args.min_qps, metrics=metrics)
+    except SizingError as e:
+        print(f"❌ {e}")
+        return 1
+
+    print(json.dumps({args.service: sizing}, indent=2))
+    for warning in sizing["basis"]["warnings"]:
+        print(f"⚠️  {warning}")
+    if args.dry_run:
+        return 0
+
+    try:
+        with open(args.sizing) as f:
+            current = json.load(f)
+    except FileNotFoundError:
+        current = {"services": {}}
+    previous = current["services"].get(args.service, {})
+    # Lo que no se calcula (p. ej. el comportamiento de escalado del HPA) se conserva
+    sizing["hpa"] = {**{k: v for k, v in previous.get("hpa", {}).items()
+                        if k not in ("cpu_utilization", "requests_per_second", "in_flight")}, **sizing["hpa"]}
+    current["services"][args.service] = sizing
+    with open(args.sizing, "w") as f:
+        json.dump(current, f, indent=2)
+        f.write("\n")
+    print(f"✅ {args.service} actualizado en {args.sizing}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,22 @@
+from urllib.parse import urlsplit
+
 from pulumi import ResourceOptions
 from pulumi_kubernetes.apps.v1 import Deployment
+from pulumi_kubernetes.batch.v1 import Job
 from pulumi_kubernetes.core.v1 import Service, PersistentVolumeClaim
+from pulumi_kubernetes.helm.v3 import Release, ReleaseArgs, RepositoryOptsArgs
+
+DB_ENV = [
+    {"name": "DB_HOST", "value": "mysql"},
+    {"name": "DB_USER", "value": "myapp_user"},
+    {"name": "DB_PASSWORD", "value": "mypassword"},
+    {"name": "DB_NAME", "value": "myapp_db"},
+]
 
-def deploy_mysql(provider, config_map):
+def deploy_mysql(provider):
     """
     Despliega MySQL como un recurso estatal, traduciendo los YAMLs.
-    Depende del ConfigMap que contiene init.sql.
+    El esquema lo crean las migraciones (ver run_migrations), no un init.sql.
     """
     labels = {"app": "mysql"}
     
@@ -40,32 +51,20 @@ def deploy_mysql(provider, config_map):
                         ],
                         "ports": [{"containerPort": 3306}],
                         "volumeMounts": [
-                            {"mountPath": "/var/lib/mysql", "name": "mysql-storage"},
-                            {
-                                "mountPath": "/docker-entrypoint-initdb.d/init.sql",
-                                "name": "mysql-init-volume",
-                                "subPath": "init.sql"
-                            }
+                            {"mountPath": "/var/lib/mysql", "name": "mysql-storage"}
                         ]
                     }],
                     "volumes": [
-                        {"name": "mysql-storage", "persistentVolumeClaim": {"claimName": pvc.metadata["name"]}},
-                        {
-                            "name": "mysql-init-volume",
-                            "configMap": {
-                                "name": config_map.metadata["name"],
-                                "items": [{"key": "init.sql", "path": "init.sql"}]
-                            }
-                        }
+                        {"name": "mysql-storage", "persistentVolumeClaim": {"claimName": pvc.metadata["name"]}}
                     ]
                 }
             }
         },
-        opts=ResourceOptions(provider=provider, depends_on=[pvc, config_map])
+        opts=ResourceOptions(provider=provider, depends_on=[pvc])
     )
 
     # 3. Headless Service (mysql-deployment.yaml)
-    Service(
+    return Service(
         "mysql-service",
         metadata={"name": "mysql"}, # El nombre que usan tus apps (DB_HOST: mysql)
         spec={
@@ -74,4 +73,133 @@ def deploy_mysql(provider, config_map):
             "clusterIP": "None" # Headless service
         },
         opts=ResourceOptions(provider=provider, depends_on=[mysql_deployment])
-    )
\ No newline at end of file
+    )
+
+
+def deploy_redis(provider):
+    """
+    Redis en memoria (sin persistencia) para el estado compartido entre réplicas:
+    jobs de mscv-stress y cubos del rate limit de mscv-auth. Perderlo sólo borra
+    estado efímero.
+    """
+    labels = {"app": "redis"}
+
+    redis_deployment = Deployment(
+        "redis-deployment",
+        spec={
+            "selector": {"matchLabels": labels},
+            "replicas": 1,
+            "template": {
+                "metadata": {"labels": labels},
+                "spec": {
+                    "containers": [{
+                        "name": "redis",
+                        "image": "redis:7-alpine",
+                        "args": ["--save", "", "--appendonly", "no", "--maxmemory", "128mb",
+                                 "--maxmemory-policy", "volatile-lru"],
+                        "ports": [{"containerPort": 6379}],
+                        "resources": {
+                            "requests": {"cpu": "50m", "memory": "64Mi"},
+                            "limits": {"cpu": "250m", "memory": "192Mi"},
+                        },
+                    }]
+                }
+            }
+        },
+        opts=ResourceOptions(provider=provider)
+    )
+
+    return Service(
+        "redis-service",
+        metadata={"name": "redis"},  # REDIS_URL: redis://redis:6379/0
+        spec={
+            "selector": labels,
+            "ports": [{"port": 6379, "targetPort": 6379}],
+        },
+        opts=ResourceOptions(provider=provider, depends_on=[redis_deployment])
+    )
+
+
+def run_migrations(provider, config_map, image, depends_on=None):
+    """
+    Ejecuta las migraciones versionadas (ConfigMap con los V*.sql) como un Job.
+    Pulumi espera a que el Job termine, así que los recursos que dependan de él
+    (los microservicios) sólo se despliegan con el esquema ya migrado. Si cambia
+    alguna migración, el ConfigMap y el Job se reemplazan y el Job vuelve a correr.
+    """
+    return Job(
+        "schema-migrations",
+        spec={
+            "backoffLimit": 4,
+            "template": {
+                "metadata": {"labels": {"app": "schema-migrations"}},
+                "spec": {
+                    "restartPolicy": "Never",
+                    "containers": [{
+                        "name": "migrate",
+                        "image": image,
+                        "command": ["python", "-m", "common.migrate", "--dir", "/migrations"],
+                        "env": DB_ENV,
+                        "volumeMounts": [{"mountPath": "/migrations", "name": "migrations", "readOnly": True}]
+                    }],
+                    "volumes": [
+                        {"name": "migrations", "configMap": {"name": config_map.metadata["name"]}}
+                    ]
+                }
+            }
+        },
+        opts=ResourceOptions(provider=provider, depends_on=[config_map] + (depends_on or []))
+    )
+
+
+# Métricas por pod de common/metrics.py que usan los HPA (HpaConfig.metrics)
+ADAPTER_RULES = [
+    {
+        # Requests por segundo, sin contar el tráfico de Prometheus y de las sondas
+        "seriesQuery": 'http_requests_total{namespace!="",pod!=""}',
+        "resources": {"overrides": {"namespace": {"resource": "namespace"}, "pod": {"resource": "pod"}}},
+        "name": {"matches": "^http_requests_total$", "as": "http_requests_per_second"},
+        "metricsQuery": 'sum(rate(<<.Series>>{<<.LabelMatchers>>,route!~"/metrics|/healthz|/readyz"}[1m])) '
+                        'by (<<.GroupBy>>)',
+    },
+    {
+        "seriesQuery": 'http_requests_in_flight{namespace!="",pod!=""}',
+        "resources": {"overrides": {"namespace": {"resource": "namespace"}, "pod": {"resource": "pod"}}},
+        "name": {"matches": "^http_requests_in_flight$", "as": "http_requests_in_flight"},
+        "metricsQuery": "sum(<<.Series>>{<<.LabelMatchers>>}) by (<<.GroupBy>>)",
+    },
+    {
+        # Rechazos del control de admisión (503): saturación real, no una estimación
+        "seriesQuery": 'admission_shed_total{namespace!="",pod!=""}',
+        "resources": {"overrides": {"namespace": {"resource": "namespace"}, "pod": {"resource": "pod"}}},
+        "name": {"matches": "^admission_shed_total$", "as": "admission_shed_per_second"},
+        "metricsQuery": "sum(rate(<<.Series>>{<<.LabelMatchers>>}[1m])) by (<<.GroupBy>>)",
+    },
+]
+
+
+def deploy_metrics_adapter(provider, prometheus_url):
+    """
+    prometheus-adapter: publica en custom.metrics.k8s.io las métricas que Prometheus
+    recoge de los pods (anotaciones prometheus.io/* de MicroserviceDeployer), para
+    que los HPA escalen por requests/s, requests en curso y rechazos por
+    saturación además de por CPU.
+    """
+    url = urlsplit(prometheus_url)
+    return Release(
+        "prometheus-adapter",
+        ReleaseArgs(
+            chart="prometheus-adapter",
+            repository_opts=RepositoryOptsArgs(repo="https://prometheus-community.github.io/helm-charts"),
+            namespace="kube-system",
+            values={
+                "prometheus": {
+                    "url": f"{url.scheme}://{url.hostname}",
+                    "port": url.port or (443 if url.scheme == "https" else 80),
+                    "path": url.path,
+                },
+                "rules": {"default": False, "custom": ADAPTER_RULES},
+            },
+        ),
+        opts=ResourceOptions(provider=provider)
+    )
@@ -0,0 +1,94 @@
+"""
+Compara dos resultados de loadgen.py (p. ej. el commit base y el candidato).
+
+    python loadtest/compare.py results/base.json results/candidate.json --max-regression 0.10
+
+Imprime las métricas globales y por operación, y termina con código 1 si la
+latencia p50/p99 o la tasa de errores del candidato empeora más que el umbral
+relativo, o si el throughput cae más que ese mismo umbral.
+"""
+import argparse
+import json
+import sys
+
+# (ruta en el resumen, True si más alto es peor)
+METRICS = [
+    (("latency_ms", "p50"), True),
+    (("latency_ms", "p90"), True),
+    (("latency_ms", "p99"), True),
+    (("latency_ms", "max"), True),
+    (("throughput",), False),
+    (("error_rate",), True),
+]
+# Métricas que deciden el código de salida
+GATED = {("latency_ms", "p50"), ("latency_ms", "p99"), ("throughput",), ("error_rate",)}
+# Por debajo de esta diferencia absoluta en error_rate no se considera regresión
+ERROR_RATE_TOLERANCE = 0.001
+
+
+def lookup(summary, path):
+    value = summary
+    for key in path:
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+
+def compare(base, candidate, max_regression):
+    """Filas (nombre, métrica, base, candidato, cambio relativo, ¿regresión?)."""
+    rows = []
+    sections = [("total", base["summary"], candidate["summary"])]
+    for op in sorted(set(base["operations"]) & set(candidate["operations"])):
+        sections.append((op, base["operations"][op], candidate["operations"][op]))
+
+    for name, b, c in sections:
+        for path, higher_is_worse in METRICS:
+            before, after = lookup(b, path), lookup(c, path)
+            if before is None or after is None:
+                continue
+            change = (after - before) / before if before else (0.0 if after == before else float("inf"))
+            worse = change if higher_is_worse else -change
+            if path == ("error_rate",):
+                regression = after - before > ERROR_RATE_TOLERANCE
+            else:
+                regression = worse > max_regression
+            # El throughput por operación depende del reparto aleatorio del escenario: sólo cuenta el total
+            gated = path in GATED and (path != ("throughput",) or name == "total")
+            rows.append((name, ".".join(path), before, after, change, regression and gated))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara dos resultados de loadgen.py")
+    parser.add_argument("base")
+    parser.add_argument("candidate")
+    parser.add_argument("--max-regression", type=float, default=0.10,
+                        help="empeoramiento relativo tolerado (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    for label, result in (("base", base), ("candidate", candidate)):
+        meta = result["meta"]
+        print(f"{label:>9}: {meta['scenario']} {meta['mode']} commit={meta['commit']} ({meta['timestamp']})")
+    if (base["meta"]["scenario"], base["meta"]["mode"]) != (candidate["meta"]["scenario"], candidate["meta"]["mode"]):
+        print("⚠️  Los resultados no son del mismo escenario/modo")
+
+    rows = compare(base, candidate, args.max_regression)
+    print(f"\n{'operación':<20} {'métrica':<16} {'base':>12} {'candidato':>12} {'cambio':>9}")
+    for name, metric, before, after, change, regression in rows:
+        flag = "  ❌" if regression else ""
+        print(f"{name:<20} {metric:<16} {before:>12.3f} {after:>12.3f} {change:>+8.1%}{flag}")
+
+    regressions = [r for r in rows if r[5]]
+    if regressions:
+        print(f"\n❌ {len(regressions)} regresiones por encima de {args.max_regression:.0%}")
+        return 1
+    print("\n✅ Sin regresiones")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
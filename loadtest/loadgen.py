@@ -0,0 +1,321 @@
+"""
+Generador de carga asyncio para los microservicios.
+
+Modos:
+  closed  --concurrency N: N usuarios virtuales, cada uno lanza el siguiente
+          request cuando termina el anterior (mide capacidad máxima).
+  open    --rate R: R llegadas por segundo pase lo que pase (como tráfico real).
+          La latencia se mide desde el instante programado de llegada, así que
+          un servicio saturado no "ralentiza" al generador y no se esconden colas
+          (coordinated omission). --poisson usa llegadas exponenciales.
+
+Ejemplos:
+  python loadtest/loadgen.py --scenario employees --mode closed --concurrency 20 --duration 30
+  python loadtest/loadgen.py --scenario heavy_task --mode open --rate 10 --param seconds=0.5
+  python loadtest/loadgen.py --stand-ins --scenario mixed --mode open --rate 200 -o results/local.json
+
+Sin --base-url se apunta al frontend (NGINX) de docker-compose, http://localhost:3000.
+Con --stand-ins se levantan en este mismo proceso réplicas falsas de los servicios
+(ver standins.py): no hace falta GKE, MySQL ni Docker.
+
+Para dimensionar (infra/rightsizing.py) hace falta el consumo por pod durante la
+prueba: --kubectl-top app=mscv-employee muestrea `kubectl top pod` cada 15 s y
+guarda CPU y memoria por pod junto al número de pods en el bloque "resources".
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+
+import aiohttp
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from scenarios import SCENARIOS, picker  # noqa: E402
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)  # operación -> [segundos]
+        self.statuses = defaultdict(Counter)  # operación -> {código: n}
+        self.errors = Counter()  # operación -> n
+        self.bytes_received = 0
+        self.dropped = 0  # llegadas que el generador no pudo lanzar (modo open)
+
+    def record(self, name, latency, status, ok, size=0):
+        self.latencies[name].append(latency)
+        self.statuses[name][str(status)] += 1
+        self.bytes_received += size
+        if not ok:
+            self.errors[name] += 1
+
+
+class Client:
+    """Envuelve la sesión aiohttp: cada request queda registrado en el Recorder."""
+
+    def __init__(self, session, base_url, recorder, timeout):
+        self.session = session
+        self.base_url = base_url.rstrip("/")
+        self.recorder = recorder
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.scheduled_at = None  # modo open: instante de llegada programado
+
+    async def request(self, name, method, path, expected=None, **kwargs):
+        start = self.scheduled_at if self.scheduled_at is not None else time.perf_counter()
+        self.scheduled_at = None
+        try:
+            async with self.session.request(method, self.base_url + path, timeout=self.timeout, **kwargs) as resp:
+                raw = await resp.read()
+                status = resp.status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.recorder.record(name, time.perf_counter() - start, type(e).__name__, ok=False)
+            return None
+        ok = status in expected if expected else 200 <= status < 300
+        self.recorder.record(name, time.perf_counter() - start, status, ok, len(raw))
+        try:
+            return json.loads(raw) if raw else None
+        except ValueError:
+            return None
+
+
+async def closed_loop(args, client, state, pick, deadline):
+    async def virtual_user():
+        while time.perf_counter() < deadline:
+            await pick()(client, state, args.params)
+
+    await asyncio.gather(*(virtual_user() for _ in range(args.concurrency)))
+
+
+async def open_loop(args, client, state, pick, deadline):
+    in_flight = set()
+    next_arrival = time.perf_counter()
+    while next_arrival < deadline:
+        delay = next_arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(in_flight) < args.max_in_flight:
+            arrival_client = Client(client.session, client.base_url, client.recorder, client.timeout.total)
+            arrival_client.scheduled_at = next_arrival
+            task = asyncio.create_task(pick()(arrival_client, state, args.params))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        else:
+            # El generador no puede sostener más requests abiertos: se cuenta aparte
+            client.recorder.dropped += 1
+        interval = random.expovariate(args.rate) if args.poisson else 1 / args.rate
+        next_arrival += interval
+    if in_flight:
+        await asyncio.wait(in_flight)
+
+
+def percentile(sorted_values, p):
+    """Nearest rank: el menor valor con al menos el p% de las muestras por debajo o igual."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, math.ceil(p * len(sorted_values) / 100) - 1))
+    return sorted_values[index]
+
+
+def latency_summary(values):
+    values = sorted(values)
+    ms = lambda v: round(v * 1000, 3) if v is not None else None  # noqa: E731
+    return {
+        "p50": ms(percentile(values, 50)),
+        "p90": ms(percentile(values, 90)),
+        "p99": ms(percentile(values, 99)),
+        "max": ms(values[-1] if values else None),
+        "mean": ms(sum(values) / len(values) if values else None),
+    }
+
+
+def summarize(recorder, elapsed):
+    by_operation = {}
+    for name, values in recorder.latencies.items():
+        count = len(values)
+        by_operation[name] = {
+            "requests": count,
+            "errors": recorder.errors[name],
+            "error_rate": recorder.errors[name] / count if count else 0.0,
+            "throughput": count / elapsed,
+            "latency_ms": latency_summary(values),
+            "status_codes": dict(recorder.statuses[name]),
+        }
+    all_values = [v for values in recorder.latencies.values() for v in values]
+    total, errors = len(all_values), sum(recorder.errors.values())
+    return {
+        "requests": total,
+        "errors": errors,
+        "error_rate": errors / total if total else 0.0,
+        "throughput": total / elapsed,
+        "bytes_received": recorder.bytes_received,
+        "dropped_by_generator": recorder.dropped,
+        "latency_ms": latency_summary(all_values),
+    }, by_operation
+
+
+async def sample_pod_resources(selector, interval, stop, samples):
+    """Añade a `samples` lecturas [(pods, [milicores], [MiB])] de `kubectl top pod -l selector`."""
+    while not stop.is_set():
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "kubectl", "top", "pod", "-l", selector, "--no-headers",
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL)
+            out, _ = await proc.communicate()
+        except OSError as e:
+            print(f"⚠️ kubectl no disponible: {e}")
+            return
+        cpu, memory = [], []
+        for line in out.decode().splitlines():
+            # NAME  CPU(cores)  MEMORY(bytes), p. ej. "mscv-employee-7f9c  312m  180Mi"
+            parts = line.split()
+            if len(parts) >= 3 and parts[1].endswith("m") and parts[2].endswith("Mi"):
+                cpu.append(int(parts[1][:-1]))
+                memory.append(int(parts[2][:-2]))
+        if cpu:
+            samples.append((len(cpu), cpu, memory))
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+def resources_summary(samples, pods=None):
+    """Consumo medio y de pico por pod durante la medición."""
+    if not samples:
+        return {"pods": pods} if pods else None
+    per_pod_cpu = [sum(cpu) / n for n, cpu, _ in samples]
+    per_pod_memory = [max(memory) for _, _, memory in samples]
+    return {
+        "pods": pods or round(sum(n for n, _, _ in samples) / len(samples), 2),
+        "samples": len(samples),
+        "cpu_millicores_per_pod": {"mean": round(sum(per_pod_cpu) / len(per_pod_cpu), 1),
+                                   "max": round(max(per_pod_cpu), 1)},
+        "memory_mib_per_pod": {"mean": round(sum(per_pod_memory) / len(per_pod_memory), 1),
+                               "max": max(per_pod_memory)},
+    }
+
+
+def git_commit():
+    try:
+        repo_dir = os.path.dirname(os.path.abspath(__file__))
+        return subprocess.run(["git", "-C", repo_dir, "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args):
+    stand_ins = None
+    base_url = args.base_url
+    if args.stand_ins:
+        from standins import start_stand_ins
+        stand_ins, base_url = await start_stand_ins(latency_ms=args.stand_in_latency_ms)
+
+    recorder = Recorder()
+    connector = aiohttp.TCPConnector(limit=0)  # sin tope de conexiones del cliente
+    try:
+        async with aiohttp.ClientSession(connector=connector) as session:
+            client = Client(session, base_url, recorder, args.timeout)
+            state = {"employee_ids": []}
+            pick = picker(args.scenario)
+
+            if args.warmup:
+                warm_deadline = time.perf_counter() + args.warmup
+                warm_client = Client(session, base_url, Recorder(), args.timeout)
+                while time.perf_counter() < warm_deadline:
+                    await pick()(warm_client, state, args.params)
+
+            samples, stop_sampling, sampler = [], asyncio.Event(), None
+            if args.kubectl_top:
+                sampler = asyncio.create_task(
+                    sample_pod_resources(args.kubectl_top, args.sample_interval, stop_sampling, samples))
+
+            start = time.perf_counter()
+            deadline = start + args.duration
+            if args.mode == "closed":
+                await closed_loop(args, client, state, pick, deadline)
+            else:
+                await open_loop(args, client, state, pick, deadline)
+            elapsed = time.perf_counter() - start
+
+            if sampler is not None:
+                stop_sampling.set()
+                await sampler
+    finally:
+        if stand_ins is not None:
+            await stand_ins.cleanup()
+
+    summary, by_operation = summarize(recorder, elapsed)
+    return {
+        "meta": {
+            "scenario": args.scenario,
+            "mode": args.mode,
+            "rate": args.rate if args.mode == "open" else None,
+            "poisson": args.poisson if args.mode == "open" else None,
+            "concurrency": args.concurrency if args.mode == "closed" else None,
+            "duration": args.duration,
+            "elapsed": round(elapsed, 3),
+            "params": args.params,
+            "target": "stand-ins" if args.stand_ins else base_url,
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        },
+        "summary": summary,
+        "operations": by_operation,
+        "resources": resources_summary(samples, args.pods),
+    }
+
+
+def parse_params(values):
+    params = {}
+    for item in values or []:
+        key, _, value = item.partition("=")
+        params[key] = value
+    return params
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generador de carga para auth / employee / stress")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--mode", choices=("open", "closed"), default="closed")
+    parser.add_argument("--rate", type=float, default=50, help="llegadas por segundo (modo open)")
+    parser.add_argument("--poisson", action="store_true", help="llegadas exponenciales en lugar de fijas (modo open)")
+    parser.add_argument("--max-in-flight", type=int, default=10_000, help="requests abiertos máximos (modo open)")
+    parser.add_argument("--concurrency", type=int, default=10, help="usuarios virtuales (modo closed)")
+    parser.add_argument("--duration", type=float, default=30, help="segundos de medición")
+    parser.add_argument("--warmup", type=float, default=0, help="segundos de calentamiento sin medir")
+    parser.add_argument("--timeout", type=float, default=30, help="timeout por request")
+    parser.add_argument("--base-url", default="http://localhost:3000")
+    parser.add_argument("--param", dest="params", action="append", metavar="CLAVE=VALOR",
+                        help="parámetros del escenario, p. ej. seconds=0.5 o pageSize=100")
+    parser.add_argument("--stand-ins", action="store_true", help="usar servicios falsos en proceso")
+    parser.add_argument("--stand-in-latency-ms", type=float, default=2)
+    parser.add_argument("--pods", type=int, help="pods que atienden la prueba (si no, los que vea --kubectl-top)")
+    parser.add_argument("--kubectl-top", metavar="SELECTOR", help="muestrear CPU/memoria, p. ej. app=mscv-employee")
+    parser.add_argument("--sample-interval", type=float, default=15, help="segundos entre muestras de kubectl top")
+    parser.add_argument("-o", "--output", help="fichero JSON de resultados")
+    args = parser.parse_args(argv)
+    args.params = parse_params(args.params)
+
+    result = asyncio.run(run(args))
+    text = json.dumps(result, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+        s = result["summary"]
+        print(f"✅ {s['requests']} requests, {s['throughput']:.1f} req/s, "
+              f"p50={s['latency_ms']['p50']}ms p99={s['latency_ms']['p99']}ms, "
+              f"errores={s['error_rate']:.2%} -> {args.output}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
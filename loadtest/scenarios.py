@@ -0,0 +1,121 @@
+"""
+Escenarios de carga. Cada escenario es una lista de operaciones con peso; en
+cada iteración el generador elige una al azar según esos pesos.
+
+Una operación es una corrutina `op(client, state, params)` que hace UN request
+HTTP a través de `client.request(nombre, método, ruta, ...)` (que mide la
+latencia y el código de estado). Las rutas llevan el prefijo de NGINX
+(/auth, /employee, /stress), igual que el frontend.
+"""
+import itertools
+import random
+
+# Usuarios de db/migrations/V002__seed_data.sql (y de los stand-ins)
+SEED_USERS = [
+    ("admin@adv.com", "password"),
+    ("alice@example.com", "1234"),
+    ("bob@example.com", "5678"),
+]
+
+_unique = itertools.count()
+
+
+# ----------------------------------------------------------------------
+# Auth
+# ----------------------------------------------------------------------
+async def login(client, state, params):
+    email, password = random.choice(SEED_USERS)
+    await client.request("login", "POST", "/auth/login", json={"email": email, "password": password})
+
+
+async def login_invalid(client, state, params):
+    email, _ = random.choice(SEED_USERS)
+    # 401 esperado (y 429 si salta el throttling): no cuenta como error
+    await client.request("login_invalid", "POST", "/auth/login",
+                         json={"email": email, "password": "wrong"}, expected=(401, 429))
+
+
+# ----------------------------------------------------------------------
+# Empleados
+# ----------------------------------------------------------------------
+def new_employee():
+    n = next(_unique)
+    return {
+        "name": f"Load Test {n}",
+        "email": f"loadtest-{random.getrandbits(48):x}-{n}@example.com",
+        "role": "Tester",
+        "department": "QA",
+        "startDate": "2024-01-01",
+        "status": "Active",
+    }
+
+
+async def list_employees(client, state, params):
+    await client.request("list_employees", "GET", "/employee/employees",
+                         params={"limit": params.get("pageSize", 50)})
+
+
+async def get_employee(client, state, params):
+    emp_id = random.choice(state["employee_ids"]) if state["employee_ids"] else 1
+    await client.request("get_employee", "GET", f"/employee/employees/{emp_id}", expected=(200, 404))
+
+
+async def create_employee(client, state, params):
+    body = await client.request("create_employee", "POST", "/employee/employees",
+                                json=new_employee(), expected=(201,))
+    if isinstance(body, dict) and body.get("id") is not None:
+        state["employee_ids"].append(body["id"])
+
+
+async def update_employee(client, state, params):
+    if not state["employee_ids"]:
+        return await create_employee(client, state, params)
+    emp_id = random.choice(state["employee_ids"])
+    await client.request("update_employee", "PUT", f"/employee/employees/{emp_id}",
+                         json=new_employee(), expected=(200, 404))
+
+
+async def delete_employee(client, state, params):
+    # Sólo borra empleados creados por el propio test
+    if not state["employee_ids"]:
+        return await create_employee(client, state, params)
+    emp_id = state["employee_ids"].pop(random.randrange(len(state["employee_ids"])))
+    await client.request("delete_employee", "DELETE", f"/employee/employees/{emp_id}", expected=(200, 404))
+
+
+# ----------------------------------------------------------------------
+# Stress
+# ----------------------------------------------------------------------
+async def heavy_task(client, state, params):
+    query = {k: v for k, v in params.items() if k in ("profile", "seconds", "cores", "mib", "hold", "ms")}
+    query.setdefault("seconds", 0.2)
+    # 503 es shedding del control de admisión: se reporta, pero como error
+    await client.request("heavy_task", "GET", "/stress/heavy_task", params=query)
+
+
+# escenario -> [(operación, peso)]
+SCENARIOS = {
+    "login": [(login, 9), (login_invalid, 1)],
+    "employees": [
+        (list_employees, 60),
+        (get_employee, 20),
+        (create_employee, 8),
+        (update_employee, 8),
+        (delete_employee, 4),
+    ],
+    "heavy_task": [(heavy_task, 1)],
+    "mixed": [
+        (login, 5),
+        (list_employees, 50),
+        (get_employee, 20),
+        (create_employee, 5),
+        (update_employee, 5),
+        (delete_employee, 3),
+        (heavy_task, 2),
+    ],
+}
+
+
+def picker(scenario):
+    operations, weights = zip(*SCENARIOS[scenario])
+    return lambda: random.choices(operations, weights)[0]
@@ -0,0 +1,99 @@
+"""
+Réplicas falsas (en memoria) de mscv-auth, mscv-employee y mscv-stress detrás
+de los mismos prefijos que NGINX, para ejecutar loadgen.py sin GKE ni MySQL.
+
+No miden el rendimiento de los servicios reales: sirven para probar el propio
+generador, los escenarios y el pipeline de resultados, y como línea base del
+coste del cliente. `latency_ms` añade una espera fija a cada respuesta.
+"""
+import asyncio
+import itertools
+import time
+
+from aiohttp import web
+
+from scenarios import SEED_USERS
+
+
+def build_app(latency_ms=0.0):
+    users = dict(SEED_USERS)
+    employees = {}
+    ids = itertools.count(1)
+    for _ in range(20):
+        emp_id = next(ids)
+        employees[emp_id] = {"id": emp_id, "name": f"Employee {emp_id}", "email": f"e{emp_id}@example.com",
+                             "role": "Engineer", "department": "Technology", "startDate": "2023-01-01",
+                             "status": "Active"}
+
+    async def delay():
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+
+    async def login(request):
+        await delay()
+        data = await request.json()
+        if users.get(data.get("email")) == (data.get("password") or data.get("pass")):
+            return web.json_response({"message": "Login successful", "user": {"email": data["email"]},
+                                      "accessToken": "stand-in", "tokenType": "Bearer"})
+        return web.json_response({"message": "Invalid email or password"}, status=401)
+
+    async def list_employees(request):
+        await delay()
+        limit = int(request.query.get("limit", 50))
+        return web.json_response(list(employees.values())[:limit])
+
+    async def get_employee(request):
+        await delay()
+        employee = employees.get(int(request.match_info["id"]))
+        if employee is None:
+            return web.json_response({"message": "not found"}, status=404)
+        return web.json_response(employee)
+
+    async def add_employee(request):
+        await delay()
+        emp_id = next(ids)
+        employees[emp_id] = {**(await request.json()), "id": emp_id}
+        return web.json_response({"message": "Employee added successfully", "id": emp_id}, status=201)
+
+    async def update_employee(request):
+        await delay()
+        emp_id = int(request.match_info["id"])
+        if emp_id not in employees:
+            return web.json_response({"message": "not found"}, status=404)
+        employees[emp_id] = {**(await request.json()), "id": emp_id}
+        return web.json_response({"message": f"Employee {emp_id} updated successfully"})
+
+    async def delete_employee(request):
+        await delay()
+        if employees.pop(int(request.match_info["id"]), None) is None:
+            return web.json_response({"message": "not found"}, status=404)
+        return web.json_response({"message": "deleted"})
+
+    async def heavy_task(request):
+        # Espera en lugar de quemar CPU: el stand-in no debe competir con el generador
+        seconds = float(request.query.get("seconds", 0.2))
+        start = time.perf_counter()
+        await asyncio.sleep(seconds)
+        return web.json_response({"message": "Task done: cpu", "wall_time": time.perf_counter() - start})
+
+    app = web.Application()
+    app.add_routes([
+        web.post("/auth/login", login),
+        web.get("/employee/employees", list_employees),
+        web.post("/employee/employees", add_employee),
+        web.get("/employee/employees/{id:\\d+}", get_employee),
+        web.put("/employee/employees/{id:\\d+}", update_employee),
+        web.delete("/employee/employees/{id:\\d+}", delete_employee),
+        web.get("/stress/heavy_task", heavy_task),
+    ])
+    return app
+
+
+async def start_stand_ins(latency_ms=0.0, host="127.0.0.1", port=0):
+    """Arranca los stand-ins en un puerto libre. Devuelve (runner, base_url)."""
+    runner = web.AppRunner(build_app(latency_ms), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{bound_port}"